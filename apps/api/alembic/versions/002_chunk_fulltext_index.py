@@ -0,0 +1,27 @@
+"""chunk full-text index
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "002"
+down_revision: str | None = "001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Expression must match CHUNK_TSVECTOR in app.rag.lexical for the planner to use it
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_chunks_content_fts ON document_chunks "
+        "USING GIN (to_tsvector('english'::regconfig, content))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_chunks_content_fts")
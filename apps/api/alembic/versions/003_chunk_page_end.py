@@ -0,0 +1,25 @@
+"""chunk page end
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "003"
+down_revision: str | None = "002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Set only for chunks that run across pages (RAG_CHUNK_ACROSS_PAGES)
+    op.add_column("document_chunks", sa.Column("page_end", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("document_chunks", "page_end")
@@ -0,0 +1,97 @@
+"""Bulk question throughput: POST /ask per question vs one POST /batch/ask.
+
+Uses the same simulated provider and Qdrant latency as ``load_test_ask.py``. Each
+``/ask`` pays for its own embedding call and Qdrant query; the batch shares one
+embedding call and one Qdrant batch request and overlaps generations up to
+RAG_BATCH_CONCURRENCY:
+
+    uv run python benchmarks/bench_batch_ask.py --questions 64 --llm-ms 300
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from types import SimpleNamespace
+
+from httpx import ASGITransport, AsyncClient
+from load_test_ask import LATENCY, SlowEmbedder, SlowLLM, SlowVectorStore
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.dependencies import get_db, get_resources
+from app.main import app
+from app.models import Base
+from app.rag.embedder import DocumentEmbedder
+from app.rag.generator import AnswerGenerator
+from app.rag.pipeline import RAGPipeline
+
+
+class SlowBatchVectorStore(SlowVectorStore):
+    async def asearch_many(self, query_vectors, top_k=5, score_threshold=0.7, document_filter=None):
+        await asyncio.sleep(LATENCY["search"])
+        return [[self._hit()] for _ in query_vectors]
+
+
+async def ask_loop(client: AsyncClient, questions: list[str]) -> float:
+    response = await client.post("/api/v1/conversations", json={"title": "bench"})
+    conversation_id = response.json()["id"]
+    start = time.perf_counter()
+    for question in questions:
+        response = await client.post(
+            f"/api/v1/conversations/{conversation_id}/ask", json={"question": question}
+        )
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def ask_batch(client: AsyncClient, questions: list[str]) -> float:
+    start = time.perf_counter()
+    response = await client.post("/api/v1/batch/ask", json={"questions": questions})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=64)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16])
+    args = parser.parse_args()
+    LATENCY["llm"] = args.llm_ms / 1000
+    questions = [f"question {i}" for i in range(args.questions)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_db():
+            async with session_maker() as session:
+                yield session
+
+        pipeline = RAGPipeline(
+            SlowBatchVectorStore(),
+            embedder=DocumentEmbedder(provider=SlowEmbedder()),
+            generator=AnswerGenerator(provider=SlowLLM()),
+        )
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_resources] = lambda: SimpleNamespace(pipeline=pipeline)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'mode':<20}{'seconds':>10}{'questions/s':>14}")
+            elapsed = await ask_loop(client, questions)
+            print(f"{'/ask loop':<20}{elapsed:>10.2f}{len(questions) / elapsed:>14.1f}")
+            for concurrency in args.concurrency:
+                settings.rag_batch_concurrency = concurrency
+                elapsed = await ask_batch(client, questions)
+                label = f"/batch/ask (c={concurrency})"
+                print(f"{label:<20}{elapsed:>10.2f}{len(questions) / elapsed:>14.1f}")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Chunking throughput: in-process DocumentChunker vs the shared process-pool mode.
+
+Chunks a synthetic corpus of --documents documents one after another, serially and
+with each requested number of pool workers (RAG_CHUNK_WORKERS). The pool is started
+and warmed before timing, as it is in a long-running API or worker process. Speedup
+is bounded by the available cores:
+
+    uv run python benchmarks/bench_chunk_pool.py --documents 8 --pages 500 --workers 2 4 8
+"""
+
+import argparse
+import os
+import random
+import time
+
+from app.rag.chunker import DocumentChunker, get_chunk_pool, shutdown_chunk_pools
+
+WORDS = [
+    "the", "supplier", "shall", "deliver", "goods", "within", "thirty", "days", "of", "the",
+    "order", "date", "and", "any", "late", "delivery", "incurs", "a", "penalty", "of", "one",
+    "percent", "per", "week", "capped", "at", "ten", "percent", "of", "the", "contract", "value",
+    "unless", "caused", "by", "force", "majeure", "as", "defined", "in", "clause",
+]
+
+
+def make_document(rng: random.Random, pages: int) -> list[dict]:
+    def paragraph() -> str:
+        return ". ".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+            for _ in range(rng.randint(2, 6))
+        )
+
+    return [
+        {"content": "\n\n".join(paragraph() for _ in range(8)), "page_number": number}
+        for number in range(1, pages + 1)
+    ]
+
+
+def run(chunker: DocumentChunker, documents: list[list[dict]]) -> tuple[float, list]:
+    start = time.perf_counter()
+    chunks = [
+        chunk
+        for i, pages in enumerate(documents)
+        for chunk in chunker.iter_chunks(pages, f"doc-{i}", f"doc-{i}.pdf")
+    ]
+    return time.perf_counter() - start, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--pages-per-task", type=int, default=32)
+    parser.add_argument("--across-pages", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    documents = [make_document(rng, args.pages) for _ in range(args.documents)]
+    chars = sum(len(page["content"]) for pages in documents for page in pages)
+    print(f"{args.documents} documents x {args.pages} pages, {chars / 1e6:.1f}M chars, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'seconds':>10}{'pages/s':>10}{'speedup':>10}")
+
+    total_pages = args.documents * args.pages
+    serial = DocumentChunker(across_pages=args.across_pages, workers=1)
+    serial.split_text(documents[0][0]["content"])
+    baseline, expected = run(serial, documents)
+    print(f"{1:>8}{baseline:>10.2f}{total_pages / baseline:>10.0f}{1:>10.2f}")
+
+    for workers in args.workers:
+        chunker = DocumentChunker(
+            across_pages=args.across_pages,
+            workers=workers,
+            pages_per_task=args.pages_per_task,
+        )
+        # Start every worker and load its encoder outside the timed run
+        pool = get_chunk_pool(workers)
+        list(pool.map(abs, range(workers * 4)))
+        elapsed, chunks = run(chunker, documents)
+        assert chunks == expected
+        print(
+            f"{workers:>8}{elapsed:>10.2f}{total_pages / elapsed:>10.0f}"
+            f"{baseline / elapsed:>10.2f}"
+        )
+    shutdown_chunk_pools()
+
+
+if __name__ == "__main__":
+    main()
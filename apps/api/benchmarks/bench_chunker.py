@@ -0,0 +1,118 @@
+"""Chunking throughput: token-native DocumentChunker vs the LangChain splitter it replaced.
+
+The legacy path is LangChain's RecursiveCharacterTextSplitter with a tiktoken length
+function, plus one more encode per chunk for its token count. Both chunk the same
+synthetic pages; the report includes how many chunks come out identical. The
+"spanning" row chunks across page boundaries (RAG_CHUNK_ACROSS_PAGES); short pages
+show how many fewer chunks, and so vectors, that produces:
+
+    uv run python benchmarks/bench_chunker.py --pages 500
+    uv run python benchmarks/bench_chunker.py --pages 500 --chunk-size 256 --overlap 32
+    uv run python benchmarks/bench_chunker.py --pages 1000 --paragraphs 1
+"""
+
+import argparse
+import random
+import time
+
+import tiktoken
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.rag.chunker import SEPARATORS, DocumentChunker
+
+WORDS = [
+    "the", "supplier", "shall", "deliver", "goods", "within", "thirty", "days", "of", "the",
+    "order", "date", "and", "any", "late", "delivery", "incurs", "a", "penalty", "of", "one",
+    "percent", "per", "week", "capped", "at", "ten", "percent", "of", "the", "contract", "value",
+    "unless", "caused", "by", "force", "majeure", "as", "defined", "in", "clause",
+]
+
+
+def make_pages(rng: random.Random, count: int, paragraphs: int) -> list[str]:
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+
+    def paragraph() -> str:
+        return ". ".join(sentence() for _ in range(rng.randint(2, 6))) + "."
+
+    return [
+        "\n\n".join(
+            "\n".join(paragraph() for _ in range(rng.randint(1, 3)))
+            for _ in range(rng.randint(min(4, paragraphs), paragraphs))
+        )
+        for _ in range(count)
+    ]
+
+
+def legacy_split(chunk_size: int, overlap: int):
+    encoding = tiktoken.get_encoding("cl100k_base")
+
+    def token_length(text: str) -> int:
+        return len(encoding.encode(text))
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+        separators=list(SEPARATORS),
+        length_function=token_length,
+    )
+    return lambda text: [
+        (content, token_length(content)) for content in splitter.split_text(text)
+    ]
+
+
+def run(split, pages: list[str]) -> tuple[float, list[tuple[str, int]]]:
+    start = time.perf_counter()
+    chunks = [chunk for page in pages for chunk in split(page)]
+    return time.perf_counter() - start, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=10, help="most paragraphs per page")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    pages = make_pages(random.Random(args.seed), args.pages, args.paragraphs)
+    native = DocumentChunker(chunk_size=args.chunk_size, chunk_overlap=args.overlap)
+    legacy = legacy_split(args.chunk_size, args.overlap)
+    # Warm the tokenizer and the chunker's token length table
+    native.split_text(pages[0])
+    legacy(pages[0])
+
+    spanning = DocumentChunker(
+        chunk_size=args.chunk_size, chunk_overlap=args.overlap, across_pages=True
+    )
+    page_dicts = [{"content": page, "page_number": n} for n, page in enumerate(pages, 1)]
+
+    legacy_time, legacy_chunks = run(legacy, pages)
+    native_time, native_chunks = run(native.split_text, pages)
+    start = time.perf_counter()
+    spanning_chunks = list(spanning.iter_chunks(page_dicts, "doc", "doc.pdf"))
+    spanning_time = time.perf_counter() - start
+
+    chars = sum(len(page) for page in pages)
+    tokens = sum(count for _, count in native_chunks)
+    print(f"{args.pages} pages, {chars / 1e6:.1f}M chars, ~{tokens // args.pages} tokens/page, "
+          f"chunk size {args.chunk_size}, overlap {args.overlap}")
+    print(f"{'chunker':<10}{'seconds':>10}{'pages/s':>10}{'chunks':>8}")
+    for name, elapsed, chunks in (
+        ("langchain", legacy_time, legacy_chunks),
+        ("native", native_time, native_chunks),
+        ("spanning", spanning_time, spanning_chunks),
+    ):
+        print(f"{name:<10}{elapsed:>10.2f}{args.pages / elapsed:>10.0f}{len(chunks):>8}")
+
+    legacy_texts = {content for content, _ in legacy_chunks}
+    same = sum(content in legacy_texts for content, _ in native_chunks)
+    counted = sum(count for _, count in native_chunks)
+    exact = sum(count for _, count in legacy_chunks)
+    print(f"speedup {legacy_time / native_time:.1f}x, {same}/{len(native_chunks)} chunks "
+          f"identical, token counts within {abs(counted - exact) / exact:.2%} of exact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Prompt tokens per question: plain chunk concatenation vs the token-budgeted packer.
+
+Chunks come from the real chunker (default size and overlap) over synthetic
+documents. Each question retrieves top_k chunks the way dense search tends to:
+the chunk holding the answer, its neighbours (which share the chunker overlap)
+and a few unrelated hits.
+
+    uv run python benchmarks/bench_context_packing.py --questions 50 --top-k 5
+    uv run python benchmarks/bench_context_packing.py --budget 3000
+"""
+
+import argparse
+import random
+import statistics
+
+from app.config import settings
+from app.rag.chunker import DocumentChunker
+from app.rag.prompts import QA_PROMPT_TEMPLATE, build_qa_prompt, count_tokens
+
+VOCABULARY = [
+    "invoice", "contract", "warranty", "clause", "supplier", "payment", "delivery", "schedule",
+    "liability", "termination", "renewal", "notice", "period", "penalty", "audit", "compliance",
+    "report", "revenue", "margin", "forecast", "quarter", "customer", "service", "level",
+    "agreement", "incident", "response", "escalation",
+]
+
+
+def make_document(rng: random.Random, pages: int) -> list[dict]:
+    result = []
+    for page in range(1, pages + 1):
+        paragraphs = []
+        for _ in range(rng.randint(20, 30)):
+            sentences = [
+                " ".join(rng.choices(VOCABULARY, k=rng.randint(8, 20))).capitalize() + "."
+                for _ in range(rng.randint(4, 8))
+            ]
+            paragraphs.append(" ".join(sentences))
+        result.append({"content": "\n\n".join(paragraphs), "page_number": page})
+    return result
+
+
+def legacy_prompt(question: str, chunks: list[dict], chat_history: list[dict]) -> str:
+    """The prompt as built before packing: every chunk, history cut at 500 characters."""
+    parts = []
+    for chunk in chunks:
+        source = f"[Source: {chunk['document_name']}"
+        if chunk.get("page_number"):
+            source += f", page {chunk['page_number']}"
+        parts.append(f"{source}]\n{chunk['content']}")
+    history = "\n".join(
+        f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content'][:500]}"
+        for m in chat_history[-10:]
+    ) or "No previous conversation."
+    return QA_PROMPT_TEMPLATE.format(
+        context="\n\n---\n\n".join(parts), chat_history=history, question=question
+    )
+
+
+def retrieve(rng: random.Random, documents: list[list], top_k: int) -> list[dict]:
+    """Answer chunk plus neighbours, then unrelated hits, with descending scores."""
+    doc = rng.choice(documents)
+    anchor = rng.randrange(1, len(doc) - 1)
+    picked = [doc[anchor], doc[anchor + 1], doc[anchor - 1]]
+    while len(picked) < top_k:
+        other = rng.choice(rng.choice(documents))
+        if other not in picked:
+            picked.append(other)
+    return [
+        {
+            "document_id": c.metadata["document_id"],
+            "document_name": c.metadata["document_name"],
+            "chunk_index": c.chunk_index,
+            "page_number": c.page_number,
+            "content": c.content,
+            "relevance_score": 0.9 - rank * 0.05,
+        }
+        for rank, c in enumerate(picked[:top_k])
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=settings.rag_context_budget_tokens)
+    args = parser.parse_args()
+
+    settings.rag_context_budget_tokens = args.budget
+    rng = random.Random(0)
+    chunker = DocumentChunker()
+    documents = [
+        chunker.chunk_pages(make_document(rng, args.pages), f"doc-{i}", f"report-{i}.pdf")
+        for i in range(args.documents)
+    ]
+    history = [
+        {"role": "user", "content": "Summarise the payment terms."},
+        {"role": "assistant", "content": " ".join(rng.choices(VOCABULARY, k=400))},
+    ]
+
+    legacy, packed = [], []
+    for i in range(args.questions):
+        question = f"What does the contract say about {rng.choice(VOCABULARY)}?"
+        chunks = retrieve(rng, documents, args.top_k)
+        chat_history = history if i % 2 else []
+        legacy.append(count_tokens(legacy_prompt(question, chunks, chat_history)))
+        packed.append(count_tokens(build_qa_prompt(question, chunks, chat_history)))
+
+    print(f"chunk size {chunker.chunk_size}, overlap {chunker.chunk_overlap}, "
+          f"top_k {args.top_k}, budget {args.budget}")
+    print(f"{'':<10}{'mean':>8}{'p50':>8}{'max':>8}")
+    for name, values in (("legacy", legacy), ("packed", packed)):
+        print(f"{name:<10}{statistics.mean(values):>8.0f}{statistics.median(values):>8.0f}"
+              f"{max(values):>8}")
+    saved = 1 - sum(packed) / sum(legacy)
+    print(f"prompt tokens saved: {saved:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Filtered search latency vs number of document IDs: should-list vs MatchAny filter.
+
+Uses the embedded Qdrant by default. Payload indexes only take effect on a server,
+so pass ``--host`` to measure against a real Qdrant, where the collection is
+created with the configured payload indexes:
+
+    uv run python benchmarks/bench_filtered_search.py --points 5000 --documents 500
+    uv run python benchmarks/bench_filtered_search.py --host localhost --points 200000
+"""
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+import warnings
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue, PointStruct
+
+from app.config import settings
+from app.db.vector_store import VectorStore
+
+DIMENSIONS = 128
+COLLECTION = "bench_filtered_search"
+
+
+def legacy_filter(document_ids: list[str]) -> Filter:
+    """The previous filter: one should-clause per document."""
+    return Filter(
+        should=[
+            FieldCondition(key="document_id", match=MatchValue(value=doc_id))
+            for doc_id in document_ids
+        ]
+    )
+
+
+def random_vector(rng: random.Random) -> list[float]:
+    return [rng.gauss(0, 1) for _ in range(DIMENSIONS)]
+
+
+def load(store: VectorStore, points: int, documents: int, rng: random.Random) -> list[str]:
+    document_ids = [str(uuid.uuid4()) for _ in range(documents)]
+    batch = []
+    for i in range(points):
+        batch.append(
+            PointStruct(
+                id=str(uuid.uuid4()),
+                vector=random_vector(rng),
+                payload={
+                    "document_id": document_ids[i % documents],
+                    "page_number": i % 50,
+                    "content": f"chunk {i}",
+                },
+            )
+        )
+        if len(batch) == 1000:
+            store.client.upsert(COLLECTION, points=batch)
+            batch = []
+    if batch:
+        store.client.upsert(COLLECTION, points=batch)
+    return document_ids
+
+
+def measure(store: VectorStore, query_filter: Filter, queries: list[list[float]]) -> float:
+    latencies = []
+    for vector in queries:
+        start = time.perf_counter()
+        store.client.query_points(COLLECTION, query=vector, limit=5, query_filter=query_filter)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", help="Qdrant server host (default: embedded)")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--filter-sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="Payload indexes have no effect")
+    settings.embedding_dimensions = DIMENSIONS
+    if args.host:
+        store = VectorStore(args.host, args.port, COLLECTION)
+    else:
+        store = VectorStore(
+            "", args.port, COLLECTION,
+            client=QdrantClient(":memory:"),
+            async_client=AsyncQdrantClient(":memory:"),
+        )
+    client = store.client
+
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    store.ensure_collection()
+
+    rng = random.Random(0)
+    print(f"Loading {args.points} points across {args.documents} documents...")
+    document_ids = load(store, args.points, args.documents, rng)
+    queries = [random_vector(rng) for _ in range(args.queries)]
+
+    print(f"{'ids':>6}{'should (ms)':>14}{'MatchAny (ms)':>16}")
+    for size in args.filter_sizes:
+        selected = rng.sample(document_ids, min(size, len(document_ids)))
+        legacy = measure(store, legacy_filter(selected), queries)
+        match_any = measure(store, store._document_filter(selected), queries)
+        print(f"{size:>6}{legacy:>14.2f}{match_any:>16.2f}")
+
+    client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
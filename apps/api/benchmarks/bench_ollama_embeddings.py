@@ -0,0 +1,105 @@
+"""Compare Ollama embedding throughput: legacy per-text loop vs pooled single vs batch mode.
+
+Runs against a local stub of the Ollama embedding endpoints, so no model is needed:
+
+    uv run python benchmarks/bench_ollama_embeddings.py --texts 2000 --latency-ms 5
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from app.config import settings
+from app.providers.ollama import OllamaEmbeddingProvider
+
+DIMENSIONS = 768
+
+
+def make_handler(latency: float, per_item_latency: float) -> type[BaseHTTPRequestHandler]:
+    class StubOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+            if self.path == "/api/embeddings":
+                time.sleep(latency + per_item_latency)
+                payload = {"embedding": [0.1] * DIMENSIONS}
+            elif self.path == "/api/embed":
+                inputs = body["input"]
+                time.sleep(latency + per_item_latency * len(inputs))
+                payload = {"embeddings": [[0.1] * DIMENSIONS for _ in inputs]}
+            else:
+                self.send_error(404)
+                return
+
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubOllamaHandler
+
+
+def legacy_embed(base_url: str, texts: list[str]) -> list[list[float]]:
+    """The pre-pooling implementation: one fresh connection per text."""
+    embeddings = []
+    for text in texts:
+        response = httpx.post(
+            f"{base_url}/api/embeddings",
+            json={"model": settings.ollama_embed_model, "prompt": text},
+            timeout=60.0,
+        )
+        response.raise_for_status()
+        embeddings.append(response.json()["embedding"])
+    return embeddings
+
+
+def measure(name: str, fn, texts: list[str]) -> None:
+    start = time.perf_counter()
+    embeddings = fn(texts)
+    elapsed = time.perf_counter() - start
+    assert len(embeddings) == len(texts)
+    print(f"{name:<24} {elapsed:8.2f}s  {len(texts) / elapsed:10.1f} texts/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Per-request overhead")
+    parser.add_argument("--item-ms", type=float, default=0.5, help="Per-text model time")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), make_handler(args.latency_ms / 1000, args.item_ms / 1000)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.ollama_host = base_url
+
+    texts = [f"chunk {i} " + "lorem ipsum " * 50 for i in range(args.texts)]
+    print(f"Embedding {len(texts)} texts against stub at {base_url}\n")
+
+    measure("legacy per-text loop", lambda t: legacy_embed(base_url, t), texts)
+
+    for mode in ("single", "batch"):
+        settings.ollama_embed_mode = mode
+        provider = OllamaEmbeddingProvider()
+        measure(f"pooled {mode}", provider.embed, texts)
+        provider.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""PDF text extraction throughput: serial PDFExtractor vs the process-pool mode.
+
+Generates a text-dense PDF with PyMuPDF, then extracts it with 1 (serial) and each
+requested number of worker processes. The shared pool is started before the timed
+run, as it is for every PDF after the first. Speedup is bounded by the available cores:
+
+    uv run python benchmarks/bench_pdf_extraction.py --pages 2000 --workers 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+from app.rag.extractors import PDFExtractor
+from app.rag.extractors.pdf import get_pdf_pool, shutdown_pdf_pools
+
+LINE = (
+    "Clause {n}: the supplier shall deliver within thirty days; "
+    "late delivery costs 1% per week. "
+)
+
+
+def make_pdf(path: Path, pages: int) -> None:
+    with fitz.open() as doc:
+        for number in range(pages):
+            page = doc.new_page()
+            text = "".join(LINE.format(n=f"{number}.{i}") for i in range(60))
+            page.insert_textbox(page.rect + (24, 24, -24, -24), text, fontsize=5)
+        doc.save(str(path))
+
+
+def run(extractor: PDFExtractor, path: Path) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    pages = list(extractor.iter_pages(path))
+    elapsed = time.perf_counter() - start
+    return elapsed, len(pages), sum(len(p.content) for p in pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "large.pdf"
+        make_pdf(path, args.pages)
+        print(f"{args.pages} pages, {path.stat().st_size / 2**20:.1f} MiB, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8}{'seconds':>10}{'pages/s':>10}{'speedup':>10}")
+
+        baseline, pages, chars = run(PDFExtractor(workers=1), path)
+        print(f"{1:>8}{baseline:>10.2f}{pages / baseline:>10.0f}{1:>10.2f}")
+        for workers in args.workers:
+            extractor = PDFExtractor(workers=workers, pages_per_task=args.pages_per_task)
+            # Start every worker outside the timed run
+            pool = get_pdf_pool(workers)
+            list(pool.map(abs, range(workers * 4)))
+            elapsed, parallel_pages, parallel_chars = run(extractor, path)
+            assert (parallel_pages, parallel_chars) == (pages, chars)
+            print(
+                f"{workers:>8}{elapsed:>10.2f}{pages / elapsed:>10.0f}"
+                f"{baseline / elapsed:>10.2f}"
+            )
+    shutdown_pdf_pools()
+
+
+if __name__ == "__main__":
+    main()
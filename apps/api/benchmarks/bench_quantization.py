@@ -0,0 +1,170 @@
+"""Recall@k vs latency and memory for float32, int8 scalar and binary quantized vectors.
+
+The embedded Qdrant ignores quantization and HNSW settings, so by default this runs
+a brute-force numpy stand-in that mirrors Qdrant's scheme: search the compressed
+vectors, over-fetch ``k * oversampling`` candidates and rescore them with the
+originals. Its recall and bytes/vector columns carry over; its latencies are numpy's,
+not Qdrant's SIMD kernels. Pass ``--host`` to measure the real collection settings on
+a Qdrant server, including ``hnsw_ef``:
+
+    uv run python benchmarks/bench_quantization.py --points 50000 --dimensions 1536
+    uv run python benchmarks/bench_quantization.py --host localhost --points 100000
+"""
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct, SearchParams
+
+from app.config import settings
+from app.db.vector_store import VectorStore
+
+COLLECTION = "bench_quantization"
+
+
+def make_data(points: int, queries: int, dimensions: int) -> tuple[np.ndarray, np.ndarray]:
+    """Clustered unit vectors; queries are perturbed copies of stored points."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(max(points // 200, 1), dimensions))
+    data = centers[rng.integers(len(centers), size=points)]
+    data += rng.normal(scale=0.6, size=data.shape)
+    data = (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+
+    picked = data[rng.integers(points, size=queries)]
+    picked = picked + rng.normal(scale=0.02, size=picked.shape).astype(np.float32)
+    return data, picked / np.linalg.norm(picked, axis=1, keepdims=True)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def recall(found: list[np.ndarray], truth: list[np.ndarray]) -> float:
+    hits = sum(len(set(f.tolist()) & set(t.tolist())) for f, t in zip(found, truth, strict=True))
+    return hits / sum(len(t) for t in truth)
+
+
+def run_standin(args) -> None:
+    data, queries = make_data(args.points, args.queries, args.dimensions)
+    k = args.top_k
+    truth = [top_k(data @ q, k) for q in queries]
+
+    # int8 scalar quantization over the 0.99 quantile range, as Qdrant does
+    low, high = np.quantile(data, [0.005, 0.995])
+    scale = (high - low) / 255
+    scalar = np.clip(np.round((data - low) / scale) - 128, -128, 127).astype(np.int8)
+    binary = np.packbits(data > 0, axis=1)
+    # numpy has no int8 GEMM; widen once so only the quantization error is measured
+    scalar_wide = scalar.astype(np.float32)
+
+    def approx_scalar(q: np.ndarray) -> np.ndarray:
+        return scalar_wide @ q
+
+    def approx_binary(q: np.ndarray) -> np.ndarray:
+        bits = np.packbits(q > 0)
+        return -np.unpackbits(binary ^ bits, axis=1).sum(axis=1, dtype=np.int32)
+
+    modes = {"scalar": (approx_scalar, scalar), "binary": (approx_binary, binary)}
+
+    print(f"{'mode':<8}{'oversample':>11}{'rescore':>9}{'recall@k':>10}"
+          f"{'ms/query':>10}{'bytes/vec':>11}")
+
+    start = time.perf_counter()
+    found = [top_k(data @ q, k) for q in queries]
+    elapsed = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"{'float32':<8}{'-':>11}{'-':>9}{recall(found, truth):>10.3f}"
+          f"{elapsed:>10.2f}{data[0].nbytes:>11}")
+
+    for mode, (approx, stored) in modes.items():
+        for oversampling in args.oversampling:
+            for rescore in (False, True):
+                if not rescore and oversampling != args.oversampling[0]:
+                    continue
+                start = time.perf_counter()
+                found = []
+                for q in queries:
+                    fetch = int(k * oversampling) if rescore else k
+                    candidates = top_k(approx(q), fetch)
+                    if rescore:
+                        candidates = candidates[top_k(data[candidates] @ q, k)]
+                    found.append(candidates)
+                elapsed = (time.perf_counter() - start) / len(queries) * 1000
+                print(f"{mode:<8}{oversampling if rescore else '-':>11}{str(rescore):>9}"
+                      f"{recall(found, truth):>10.3f}{elapsed:>10.2f}{stored[0].nbytes:>11}")
+
+
+def run_qdrant(args) -> None:
+    data, queries = make_data(args.points, args.queries, args.dimensions)
+    client = QdrantClient(host=args.host, port=args.port)
+    settings.embedding_dimensions = args.dimensions
+
+    print(f"{'mode':<8}{'oversample':>11}{'hnsw_ef':>9}{'recall@k':>10}{'ms/query':>10}")
+    for mode in ("none", "scalar", "binary"):
+        settings.qdrant_quantization = mode
+        settings.qdrant_on_disk = mode != "none"
+        if client.collection_exists(COLLECTION):
+            client.delete_collection(COLLECTION)
+        store = VectorStore(args.host, args.port, COLLECTION, client=client)
+        store.ensure_collection()
+
+        for offset in range(0, len(data), 1000):
+            client.upsert(
+                COLLECTION,
+                points=[
+                    PointStruct(id=str(uuid.uuid4()), vector=vector.tolist())
+                    for vector in data[offset : offset + 1000]
+                ],
+            )
+        while client.get_collection(COLLECTION).status != "green":
+            time.sleep(1)
+
+        truth = [
+            np.array([str(p.id) for p in client.query_points(
+                COLLECTION, query=q.tolist(), limit=args.top_k,
+                search_params=SearchParams(exact=True),
+            ).points])
+            for q in queries
+        ]
+
+        for oversampling in args.oversampling if mode != "none" else [1.0]:
+            for ef in args.hnsw_ef:
+                settings.qdrant_oversampling = oversampling
+                settings.qdrant_search_ef = ef
+                found = []
+                start = time.perf_counter()
+                for q in queries:
+                    results = store.search(q.tolist(), top_k=args.top_k, score_threshold=-1.0)
+                    found.append(np.array([r["id"] for r in results]))
+                elapsed = (time.perf_counter() - start) / len(queries) * 1000
+                print(f"{mode:<8}{oversampling:>11}{ef:>9}"
+                      f"{recall(found, truth):>10.3f}{elapsed:>10.2f}")
+
+    client.delete_collection(COLLECTION)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", help="Qdrant server host (default: numpy stand-in)")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--oversampling", type=float, nargs="+", default=[1.0, 2.0, 4.0])
+    parser.add_argument("--hnsw-ef", type=int, nargs="+", default=[64, 128, 256])
+    args = parser.parse_args()
+
+    if args.host:
+        run_qdrant(args)
+    else:
+        run_standin(args)
+
+
+if __name__ == "__main__":
+    main()
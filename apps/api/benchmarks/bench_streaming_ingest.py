@@ -0,0 +1,117 @@
+"""Peak Python memory and time to first searchable chunk: whole-document vs streaming ingestion.
+
+Builds synthetic PDFs with PyMuPDF and ingests them with a stub embedding provider
+and a vector store that only counts points, so the numbers reflect the pipeline's
+own buffering (extracted text, chunks, embeddings, payloads, rows):
+
+    uv run python benchmarks/bench_streaming_ingest.py --pages 100 1000
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import fitz
+
+from app.config import settings
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.rag.chunker import DocumentChunker
+from app.rag.embedder import DocumentEmbedder
+from app.rag.extractors import PDFExtractor
+from app.rag.generator import AnswerGenerator
+from app.rag.pipeline import RAGPipeline
+
+PARAGRAPH = (
+    "The supplier shall deliver the goods within thirty days of the purchase order. "
+    "Late delivery incurs a penalty of one percent of the order value per week. "
+)
+
+
+class StubEmbedder(BaseEmbeddingProvider):
+    def embed(self, texts):
+        return [[0.1] * settings.embedding_dimensions for _ in texts]
+
+
+class StubLLM(BaseLLMProvider):
+    def generate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        raise NotImplementedError
+
+
+class CountingVectorStore:
+    def __init__(self):
+        self.points = 0
+        self.first_upsert: float | None = None
+
+    def upsert_vectors(self, ids, vectors, payloads):
+        self.points += len(ids)
+        if self.first_upsert is None:
+            self.first_upsert = time.perf_counter()
+
+    def delete_by_document(self, document_id):
+        pass
+
+
+def make_pdf(path: Path, pages: int) -> None:
+    with fitz.open() as doc:
+        for _ in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (36, 36, -36, -36), PARAGRAPH * 30, fontsize=5)
+        doc.save(str(path))
+
+
+def legacy_ingest(pipeline: RAGPipeline, path: Path) -> None:
+    """Extract everything, chunk everything, embed everything, one upsert."""
+    result = PDFExtractor().extract(path)
+    pages = [{"content": p.content, "page_number": p.page_number} for p in result.pages]
+    chunks = pipeline.chunker.chunk_pages(pages, "doc", "doc.pdf")
+    embeddings = pipeline.embedder.embed_texts([c.content for c in chunks])
+    payloads = [{"content": c.content, "chunk_index": c.chunk_index} for c in chunks]
+    pipeline.vector_store.upsert_vectors([str(i) for i in range(len(chunks))], embeddings, payloads)
+    rows = [{"content": c.content, "metadata": c.metadata} for c in chunks]
+    assert len(rows) == len(chunks)
+
+
+def streaming_ingest(pipeline: RAGPipeline, path: Path) -> None:
+    pipeline.ingest_document(path, "pdf", "doc", "doc.pdf", store_batch=lambda batch: None)
+
+
+def measure(ingest, path: Path) -> tuple[float, float, float, int]:
+    pipeline = RAGPipeline(
+        CountingVectorStore(),
+        chunker=DocumentChunker(),
+        embedder=DocumentEmbedder(provider=StubEmbedder()),
+        generator=AnswerGenerator(provider=StubLLM()),
+    )
+    tracemalloc.start()
+    start = time.perf_counter()
+    ingest(pipeline, path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    first = pipeline.vector_store.first_upsert - start
+    return peak / 2**20, first, elapsed, pipeline.vector_store.points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    print(f"batch {settings.ingest_batch_size} chunks, queue {settings.ingest_queue_batches}")
+    print(
+        f"{'pages':>6}{'mode':>11}{'chunks':>8}{'peak MiB':>10}"
+        f"{'first (s)':>11}{'total (s)':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = Path(tmp) / f"doc-{pages}.pdf"
+            make_pdf(path, pages)
+            for name, ingest in (("legacy", legacy_ingest), ("streaming", streaming_ingest)):
+                peak, first, elapsed, points = measure(ingest, path)
+                print(f"{pages:>6}{name:>11}{points:>8}{peak:>10.1f}{first:>11.2f}{elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Load test: concurrent POST /conversations/{id}/ask throughput on one worker.
+
+Drives the real FastAPI app in-process (SQLite for persistence) with simulated
+provider and Qdrant latency, comparing the async pipeline against the old
+behaviour of calling the blocking ``RAGPipeline.query`` from the route:
+
+    uv run python benchmarks/load_test_ask.py --requests 64 --llm-ms 300
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from types import SimpleNamespace
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+
+settings.answer_cache_enabled = False
+settings.query_cache_enabled = False
+settings.embedding_cache_backend = "none"
+
+from app.db.vector_store import VectorStore  # noqa: E402
+from app.dependencies import get_db, get_resources  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider  # noqa: E402
+from app.rag.embedder import DocumentEmbedder  # noqa: E402
+from app.rag.generator import AnswerGenerator  # noqa: E402
+from app.rag.pipeline import RAGPipeline  # noqa: E402
+
+LATENCY = {"llm": 0.3, "embed": 0.05, "search": 0.01}
+
+
+class SlowLLM(BaseLLMProvider):
+    def generate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        time.sleep(LATENCY["llm"])
+        return {"content": "answer", "model": "stub", "usage": {}}
+
+    async def agenerate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        await asyncio.sleep(LATENCY["llm"])
+        return {"content": "answer", "model": "stub", "usage": {}}
+
+
+class SlowEmbedder(BaseEmbeddingProvider):
+    def embed(self, texts):
+        time.sleep(LATENCY["embed"])
+        return [[0.1] * 8 for _ in texts]
+
+    async def aembed(self, texts):
+        await asyncio.sleep(LATENCY["embed"])
+        return [[0.1] * 8 for _ in texts]
+
+
+class SlowVectorStore(VectorStore):
+    def __init__(self):
+        self.collection_name = "bench"
+
+    def search(self, query_vector, top_k=5, score_threshold=0.7, document_filter=None):
+        time.sleep(LATENCY["search"])
+        return [self._hit()]
+
+    async def asearch(self, query_vector, top_k=5, score_threshold=0.7, document_filter=None):
+        await asyncio.sleep(LATENCY["search"])
+        return [self._hit()]
+
+    @staticmethod
+    def _hit() -> dict:
+        return {
+            "id": "00000000-0000-0000-0000-000000000001",
+            "score": 0.9,
+            "document_id": "doc",
+            "document_name": "manual.pdf",
+            "chunk_index": 0,
+            "page_number": 1,
+            "content": "The answer is in the manual.",
+        }
+
+
+async def blocking_aquery(self, **kwargs):
+    """The pre-async route behaviour: a sync pipeline call inside the event loop."""
+    return self.query(**kwargs)
+
+
+async def run(requests: int, concurrency: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        conversations = []
+        for _ in range(concurrency):
+            response = await client.post("/api/v1/conversations", json={"title": "bench"})
+            conversations.append(response.json()["id"])
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def ask(i: int):
+            async with semaphore:
+                conversation_id = conversations[i % concurrency]
+                response = await client.post(
+                    f"/api/v1/conversations/{conversation_id}/ask",
+                    json={"question": f"question {i}"},
+                )
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(ask(i) for i in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    args = parser.parse_args()
+    LATENCY["llm"] = args.llm_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp}/bench.db", connect_args={"timeout": 30}
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_db():
+            async with session_maker() as session:
+                yield session
+
+        pipeline = RAGPipeline(
+            SlowVectorStore(),
+            embedder=DocumentEmbedder(provider=SlowEmbedder()),
+            generator=AnswerGenerator(provider=SlowLLM()),
+        )
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_resources] = lambda: SimpleNamespace(pipeline=pipeline)
+        async_aquery = RAGPipeline.aquery
+
+        print(f"{'mode':<10}{'concurrency':>12}{'req/s':>10}")
+        for mode in ("blocking", "async"):
+            RAGPipeline.aquery = blocking_aquery if mode == "blocking" else async_aquery
+            for concurrency in args.concurrency:
+                throughput = await run(args.requests, concurrency)
+                print(f"{mode:<10}{concurrency:>12}{throughput:>10.1f}")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
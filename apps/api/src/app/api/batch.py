@@ -0,0 +1,106 @@
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.rag.pipeline import RAGPipeline
+from app.rag.retriever import RetrievalOptions
+from app.resources import AppResources, get_resources
+from app.schemas import (
+    BatchAnswer,
+    BatchAskResponse,
+    BatchRequest,
+    BatchRetrieveResponse,
+    BatchRetrieveResult,
+    SourceResponse,
+)
+from app.schemas.conversation import TokenUsage
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _to_answer(index: int, question: str, response: dict[str, Any]) -> BatchAnswer:
+    if "error" in response:
+        return BatchAnswer(index=index, question=question, error=response["error"])
+    return BatchAnswer(
+        index=index,
+        question=question,
+        answer=response["answer"],
+        sources=[SourceResponse(**s) for s in response["sources"]],
+        model_used=response["model_used"],
+        tokens_used=TokenUsage(**response["tokens_used"]),
+        cached=response["cached"],
+    )
+
+
+@router.post("/retrieve", response_model=BatchRetrieveResponse)
+async def retrieve_batch(
+    body: BatchRequest,
+    resources: AppResources = Depends(get_resources),
+) -> BatchRetrieveResponse:
+    """Sources for many questions without generating answers."""
+    logger.info(f"[BATCH] Retrieving for {len(body.questions)} questions")
+    try:
+        chunk_lists = await resources.pipeline.retriever.aretrieve_many(
+            body.questions, RetrievalOptions.from_request(body.options)
+        )
+    except Exception as e:
+        logger.error(f"[BATCH] Retrieval error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"RAG pipeline error: {e}") from e
+
+    return BatchRetrieveResponse(
+        results=[
+            BatchRetrieveResult(
+                index=i,
+                question=question,
+                sources=[SourceResponse(**s) for s in RAGPipeline.sources(chunks)],
+            )
+            for i, (question, chunks) in enumerate(zip(body.questions, chunk_lists, strict=True))
+        ]
+    )
+
+
+@router.post("/ask", response_model=BatchAskResponse)
+async def ask_batch(
+    body: BatchRequest,
+    resources: AppResources = Depends(get_resources),
+) -> BatchAskResponse | StreamingResponse:
+    """Answer many independent questions outside any conversation.
+
+    Results come back in question order. With ``options.stream`` the response is
+    Server-Sent Events instead: one ``answer`` event per question as it finishes,
+    then ``done``. Questions that fail carry ``error`` rather than failing the batch.
+    """
+    logger.info(f"[BATCH] Answering {len(body.questions)} questions")
+    answers = resources.pipeline.aquery_many(
+        body.questions, RetrievalOptions.from_request(body.options)
+    )
+
+    if body.options.stream:
+
+        async def event_stream() -> AsyncIterator[str]:
+            try:
+                async for index, response in answers:
+                    answer = _to_answer(index, body.questions[index], response)
+                    yield f"event: answer\ndata: {answer.model_dump_json()}\n\n"
+                yield f"event: done\ndata: {json.dumps({'type': 'done'})}\n\n"
+            except Exception as e:
+                logger.error(f"[BATCH] RAG pipeline error: {e}", exc_info=True)
+                error = {"type": "error", "detail": f"RAG pipeline error: {e}"}
+                yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    results: list[BatchAnswer | None] = [None] * len(body.questions)
+    try:
+        async for index, response in answers:
+            results[index] = _to_answer(index, body.questions[index], response)
+    except Exception as e:
+        logger.error(f"[BATCH] RAG pipeline error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"RAG pipeline error: {e}") from e
+
+    return BatchAskResponse(results=results)
@@ -8,9 +8,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.dependencies import get_db, get_vector_store
 from app.db.vector_store import VectorStore
+from app.rag.answer_cache import get_answer_cache
+from app.rag.embedding_cache import get_embedding_cache, get_query_embedding_cache
+from app.resources import get_resources
 from app.schemas import (
     AppConfigResponse,
     AppConfigUpdate,
+    CacheStatsResponse,
     HealthResponse,
     StatsResponse,
 )
@@ -94,22 +98,14 @@ async def get_config():
 @router.put("/config", response_model=AppConfigResponse)
 async def update_config(body: AppConfigUpdate):
     # Note: Runtime config changes are in-memory only
-    if body.llm_provider:
-        settings.llm_provider = body.llm_provider
-    if body.llm_model:
-        settings.llm_model = body.llm_model
-    if body.llm_temperature is not None:
-        settings.llm_temperature = body.llm_temperature
-    if body.llm_max_tokens is not None:
-        settings.llm_max_tokens = body.llm_max_tokens
-    if body.rag_chunk_size is not None:
-        settings.rag_chunk_size = body.rag_chunk_size
-    if body.rag_chunk_overlap is not None:
-        settings.rag_chunk_overlap = body.rag_chunk_overlap
-    if body.rag_top_k is not None:
-        settings.rag_top_k = body.rag_top_k
-    if body.rag_score_threshold is not None:
-        settings.rag_score_threshold = body.rag_score_threshold
+    changed = set()
+    for field, value in body.model_dump(exclude_none=True).items():
+        if getattr(settings, field) != value:
+            setattr(settings, field, value)
+            changed.add(field)
+
+    if changed:
+        get_resources().reload(changed)
 
     return await get_config()
 
@@ -122,3 +118,15 @@ async def get_stats(
     service = StatsService(db, vector_store)
     stats = await service.get_stats()
     return StatsResponse(**stats)
+
+
+@router.get("/stats/cache", response_model=CacheStatsResponse)
+async def get_cache_stats() -> CacheStatsResponse:
+    embedding_cache = get_embedding_cache()
+    query_cache = get_query_embedding_cache()
+    answer_cache = get_answer_cache()
+    return CacheStatsResponse(
+        embedding=embedding_cache.stats().as_dict() if embedding_cache else None,
+        query_embedding=query_cache.stats().as_dict() if query_cache else None,
+        answer=answer_cache.stats().as_dict() if answer_cache else None,
+    )
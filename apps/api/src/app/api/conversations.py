@@ -1,12 +1,19 @@
+import json
 import logging
 import uuid
+from collections.abc import AsyncIterator
+from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.vector_store import VectorStore
-from app.dependencies import get_db, get_vector_store
+from app.api.websocket import send_chat_chunk, send_chat_done
+from app.db.session import async_session_maker
+from app.dependencies import get_db
 from app.rag.pipeline import RAGPipeline
+from app.rag.retriever import RetrievalOptions
+from app.resources import AppResources, get_resources
 from app.schemas import (
     AskRequest,
     AskResponse,
@@ -71,14 +78,9 @@ async def delete_conversation(
     return {"message": "Conversation deleted successfully"}
 
 
-@router.post("/{conversation_id}/ask", response_model=AskResponse)
-async def ask_question(
-    conversation_id: uuid.UUID,
-    body: AskRequest,
-    db: AsyncSession = Depends(get_db),
-    vector_store: VectorStore = Depends(get_vector_store),
-):
-    service = ConversationService(db)
+async def _start_question(
+    service: ConversationService, conversation_id: uuid.UUID, body: AskRequest
+) -> list[dict[str, Any]]:
     conversation = await service.get_conversation(conversation_id)
 
     if not conversation:
@@ -93,29 +95,23 @@ async def ask_question(
         content=body.question,
     )
 
+    if conversation.title == "New Conversation":
+        title = body.question[:80]
+        await service.update_title(conversation_id, title)
+
     chat_history = await service.get_chat_history(conversation_id)
     logger.info(f"[ASK] Chat history: {len(chat_history)} messages")
+    return chat_history
 
-    try:
-        pipeline = RAGPipeline(vector_store)
-        logger.info("[ASK] Running RAG query pipeline...")
-        result = pipeline.query(
-            question=body.question,
-            chat_history=chat_history,
-            top_k=body.options.get("top_k"),
-            score_threshold=body.options.get("score_threshold"),
-            document_filter=body.options.get("document_filter"),
-        )
-        logger.info(
-            f"[ASK] Got answer ({len(result['answer'])} chars), "
-            f"{len(result['sources'])} sources, model: {result['model_used']}"
-        )
-    except Exception as e:
-        logger.error(f"[ASK] RAG pipeline error: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"RAG pipeline error: {e}"
-        ) from e
 
+async def _save_answer(
+    service: ConversationService, conversation_id: uuid.UUID, result: dict[str, Any]
+) -> None:
+    logger.info(
+        f"[ASK] Got answer ({len(result['answer'])} chars), "
+        f"{len(result['sources'])} sources, model: {result['model_used']}, "
+        f"cached: {result['cached']}"
+    )
     await service.add_message(
         conversation_id=conversation_id,
         role="assistant",
@@ -125,13 +121,88 @@ async def ask_question(
         tokens_used=result["tokens_used"],
     )
 
-    if conversation.title == "New Conversation":
-        title = body.question[:80]
-        await service.update_title(conversation_id, title)
+
+def _stream_events(
+    pipeline: RAGPipeline, body: AskRequest, chat_history: list[dict[str, Any]]
+) -> AsyncIterator[dict[str, Any]]:
+    return pipeline.astream_query(
+        question=body.question,
+        chat_history=chat_history,
+        options=RetrievalOptions.from_request(body.options),
+    )
+
+
+@router.post("/{conversation_id}/ask", response_model=AskResponse)
+async def ask_question(
+    conversation_id: uuid.UUID,
+    body: AskRequest,
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources),
+) -> AskResponse:
+    """Answer a question. With ``options.stream`` the answer is also pushed token by
+    token to ``/ws/chat/{conversation_id}`` while it is generated."""
+    service = ConversationService(db)
+    chat_history = await _start_question(service, conversation_id, body)
+
+    try:
+        logger.info("[ASK] Running RAG query pipeline...")
+        pipeline = resources.pipeline
+        if body.options.stream:
+            result: dict[str, Any] = {}
+            async for event in _stream_events(pipeline, body, chat_history):
+                if event["type"] == "chunk":
+                    await send_chat_chunk(str(conversation_id), event["content"])
+                elif event["type"] == "done":
+                    result = {k: v for k, v in event.items() if k != "type"}
+        else:
+            result = await pipeline.aquery(
+                question=body.question,
+                chat_history=chat_history,
+                options=RetrievalOptions.from_request(body.options),
+            )
+    except Exception as e:
+        logger.error(f"[ASK] RAG pipeline error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500, detail=f"RAG pipeline error: {e}"
+        ) from e
+
+    await _save_answer(service, conversation_id, result)
+
+    if body.options.stream:
+        await send_chat_done(str(conversation_id), result)
 
     return AskResponse(
         answer=result["answer"],
         sources=[SourceResponse(**s) for s in result["sources"]],
         model_used=result["model_used"],
         tokens_used=TokenUsage(**result["tokens_used"]),
+        cached=result["cached"],
     )
+
+
+@router.post("/{conversation_id}/ask/stream")
+async def ask_question_stream(
+    conversation_id: uuid.UUID,
+    body: AskRequest,
+    db: AsyncSession = Depends(get_db),
+    resources: AppResources = Depends(get_resources),
+) -> StreamingResponse:
+    """Server-Sent Events variant of ``/ask``: ``sources``, ``chunk``... then ``done``."""
+    service = ConversationService(db)
+    chat_history = await _start_question(service, conversation_id, body)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in _stream_events(resources.pipeline, body, chat_history):
+                if event["type"] == "done":
+                    result = {k: v for k, v in event.items() if k != "type"}
+                    # The request-scoped session may already be closed once streaming starts
+                    async with async_session_maker() as session:
+                        await _save_answer(ConversationService(session), conversation_id, result)
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"[ASK] RAG pipeline error: {e}", exc_info=True)
+            error = {"type": "error", "detail": f"RAG pipeline error: {e}"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -1,16 +1,16 @@
 import logging
-import traceback
 import uuid
 from pathlib import Path
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.db.session import async_session_maker
 from app.db.vector_store import VectorStore
 from app.dependencies import get_db, get_vector_store
-from app.rag.pipeline import RAGPipeline
+from app.models.document import Document
+from app.rag.answer_cache import get_answer_cache
+from app.rag.windows import invalidate_chunk_text
 from app.schemas import (
     ChunkResponse,
     DocumentListResponse,
@@ -18,65 +18,32 @@ from app.schemas import (
     DocumentUploadResponse,
 )
 from app.services.document_service import DocumentService
+from app.services.ingestion_queue import IngestionJob, IngestionQueue, get_ingestion_queue
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-async def process_document_task(
-    document_id: uuid.UUID, file_path: Path, file_type: str, document_name: str,
-):
-    """Background task to process an uploaded document through the RAG pipeline."""
-    logger.info(f"[PROCESS] Starting processing for document {document_id} ({document_name})")
-
-    async with async_session_maker() as db:
-        service = DocumentService(db)
-        try:
-            await service.update_status(document_id, "processing")
-            logger.info(f"[PROCESS] Status set to 'processing' for {document_name}")
-
-            vector_store = get_vector_store()
-            pipeline = RAGPipeline(vector_store)
-
-            logger.info(f"[PROCESS] Running ingestion pipeline for {document_name}...")
-            result = pipeline.ingest_document(
-                file_path=file_path,
-                file_type=file_type,
-                document_id=str(document_id),
-                document_name=document_name,
-            )
-
-            logger.info(
-                f"[PROCESS] Ingestion complete: {result['chunk_count']} chunks, "
-                f"{result['page_count']} pages"
-            )
-
-            await service.store_chunks(document_id, result["chunks"])
-            logger.info(f"[PROCESS] Stored {result['chunk_count']} chunks in database")
-
-            await service.update_status(
-                document_id,
-                status="ready",
-                chunk_count=result["chunk_count"],
-                page_count=result["page_count"],
-            )
-            logger.info(f"[PROCESS] Document {document_name} is ready!")
-
-        except Exception as e:
-            logger.error(f"[PROCESS] Failed to process {document_name}: {e}")
-            logger.error(f"[PROCESS] Traceback: {traceback.format_exc()}")
-            await service.update_status(
-                document_id,
-                status="failed",
-                error_message=str(e),
-            )
+async def schedule_processing(
+    service: DocumentService, doc: Document, file_path: Path, queue: IngestionQueue
+) -> None:
+    await service.update_progress(doc.id, {"progress": 0, "current_step": "queued"})
+    await queue.enqueue(
+        IngestionJob(
+            document_id=doc.id,
+            file_path=file_path,
+            file_type=doc.file_type,
+            document_name=doc.name,
+            file_size=doc.file_size,
+        )
+    )
 
 
 @router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(
     file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     db: AsyncSession = Depends(get_db),
+    queue: IngestionQueue = Depends(get_ingestion_queue),
 ):
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
@@ -118,7 +85,7 @@ async def upload_document(
     )
 
     logger.info(f"[UPLOAD] Document saved: {doc.id} ({file.filename}), scheduling processing...")
-    background_tasks.add_task(process_document_task, doc.id, file_path, ext, file.filename)
+    await schedule_processing(service, doc, file_path, queue)
 
     return DocumentUploadResponse(
         id=doc.id,
@@ -132,8 +99,10 @@ async def upload_document(
 async def bulk_upload_documents(
     files: list[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db),
+    queue: IngestionQueue = Depends(get_ingestion_queue),
 ):
     results = []
+    scheduled: list[tuple[Document, Path]] = []
     service = DocumentService(db)
 
     for file in files:
@@ -186,6 +155,7 @@ async def bulk_upload_documents(
             file_size=file_size,
             file_hash=file_hash,
         )
+        scheduled.append((doc, file_path))
 
         results.append(
             DocumentUploadResponse(
@@ -196,6 +166,11 @@ async def bulk_upload_documents(
             )
         )
 
+    # Queued once every file is saved, so the queue can order the whole batch by size
+    for doc, file_path in scheduled:
+        await schedule_processing(service, doc, file_path, queue)
+    logger.info(f"[UPLOAD] Bulk upload scheduled {len(scheduled)} documents")
+
     return results
 
 
@@ -247,6 +222,11 @@ async def delete_document(
     except Exception as e:
         logger.warning(f"Failed to delete vectors for document {document_id}: {e}")
 
+    answer_cache = get_answer_cache()
+    if answer_cache:
+        answer_cache.invalidate_document(str(document_id))
+    invalidate_chunk_text(str(document_id))
+
     await service.delete_document(document_id)
 
     return {"message": "Document deleted successfully"}
@@ -255,8 +235,9 @@ async def delete_document(
 @router.post("/{document_id}/process")
 async def process_document(
     document_id: uuid.UUID,
-    background_tasks: BackgroundTasks = BackgroundTasks(),
+    force: bool = False,
     db: AsyncSession = Depends(get_db),
+    queue: IngestionQueue = Depends(get_ingestion_queue),
 ):
     service = DocumentService(db)
     doc = await service.get_document(document_id)
@@ -264,7 +245,8 @@ async def process_document(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    if doc.status == "ready":
+    # A ready document is only reprocessed on request, e.g. after changing chunking
+    if doc.status == "ready" and not force:
         return {"message": "Document is already processed", "status": doc.status}
 
     file_path = settings.upload_path / str(document_id) / doc.original_name
@@ -272,11 +254,9 @@ async def process_document(
         raise HTTPException(status_code=400, detail=f"File not found on disk: {file_path}")
 
     logger.info(f"[PROCESS] Manual trigger for document {document_id} ({doc.name})")
-    background_tasks.add_task(
-        process_document_task, document_id, file_path, doc.file_type, doc.name,
-    )
+    await schedule_processing(service, doc, file_path, queue)
 
-    return {"message": "Processing started", "status": "processing"}
+    return {"message": "Processing queued", "status": doc.status}
 
 
 @router.get("/{document_id}/chunks", response_model=list[ChunkResponse])
@@ -29,6 +29,15 @@ class Settings(BaseSettings):
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
     qdrant_collection: str = "documind_chunks"
+    qdrant_payload_indexes: str = "document_id:keyword,page_number:integer,tags:keyword"
+    qdrant_quantization: Literal["none", "scalar", "binary"] = "none"
+    qdrant_quantization_always_ram: bool = True
+    qdrant_on_disk: bool = False
+    qdrant_oversampling: float = 2.0
+    qdrant_rescore: bool = True
+    qdrant_hnsw_m: int = 16
+    qdrant_hnsw_ef_construct: int = 100
+    qdrant_search_ef: int = 128
 
     # LLM Provider
     llm_provider: Literal["openai", "anthropic", "ollama"] = "openai"
@@ -37,6 +46,7 @@ class Settings(BaseSettings):
     llm_base_url: str = ""
     llm_temperature: float = 0.1
     llm_max_tokens: int = 2000
+    llm_context_window: int = 128000
 
     # Embedding Provider
     embedding_provider: Literal["openai", "ollama", "local"] = "openai"
@@ -44,12 +54,58 @@ class Settings(BaseSettings):
     embedding_api_key: str = ""
     embedding_base_url: str = ""
     embedding_dimensions: int = 1536
+    embedding_batch_size: int = 100
+    embedding_batch_tokens: int = 50000
+    embedding_concurrency: int = 4
+    embedding_max_retries: int = 3
+    embedding_retry_backoff: float = 1.0
+    embedding_cache_backend: Literal["redis", "memory", "none"] = "redis"
+    embedding_cache_max_entries: int = 100000
 
     # RAG Settings
     rag_chunk_size: int = 1000
     rag_chunk_overlap: int = 200
+    rag_chunk_across_pages: bool = False
+    rag_chunk_workers: int = 1
+    rag_chunk_pages_per_task: int = 32
     rag_top_k: int = 5
     rag_score_threshold: float = 0.2
+    rag_hybrid_enabled: bool = False
+    rag_lexical_weight: float = 0.5
+    rag_hybrid_candidates: int = 20
+    rag_rrf_k: int = 60
+    rag_context_budget_tokens: int = 6000
+    rag_history_budget_tokens: int = 1000
+    rag_chunk_window: int = 0
+    rag_chunk_cache_max_entries: int = 5000
+    rag_chunk_cache_ttl_seconds: int = 600
+    rag_batch_concurrency: int = 4
+    rag_reranker: Literal["none", "lexical", "cross_encoder"] = "none"
+    rag_rerank_candidates: int = 20
+    rag_rerank_batch_size: int = 16
+    rag_rerank_budget_ms: float = 250.0
+    rag_rerank_model_path: str = ""
+
+    # Ingestion
+    ingest_backend: Literal["local", "celery"] = "local"
+    ingest_concurrency: int = 2
+    ingest_batch_size: int = 256
+    ingest_queue_batches: int = 2
+    ingest_incremental: bool = True
+    chunk_insert_batch_size: int = 1000
+    pdf_extract_workers: int = 1
+    pdf_extract_pages_per_task: int = 16
+
+    # Query Caching
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 10000
+    query_cache_ttl_seconds: int = 3600
+    query_cache_redis: bool = False
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 1000
+    answer_cache_ttl_seconds: int = 3600
+    answer_cache_similarity_enabled: bool = False
+    answer_cache_similarity_threshold: float = 0.95
 
     # Storage
     upload_dir: str = "/data/uploads"
@@ -60,6 +116,10 @@ class Settings(BaseSettings):
     ollama_host: str = "http://localhost:11434"
     ollama_llm_model: str = "llama3.1"
     ollama_embed_model: str = "nomic-embed-text"
+    ollama_embed_mode: Literal["batch", "single"] = "batch"
+    ollama_embed_batch_size: int = 32
+    ollama_embed_concurrency: int = 4
+    ollama_max_connections: int = 8
 
     @property
     def database_url(self) -> str:
@@ -76,6 +136,16 @@ class Settings(BaseSettings):
     def allowed_extensions(self) -> list[str]:
         return [ext.strip() for ext in self.allowed_file_types.split(",")]
 
+    @property
+    def payload_indexes(self) -> dict[str, str]:
+        """``field:schema`` pairs, e.g. ``{"document_id": "keyword"}``."""
+        indexes = {}
+        for entry in self.qdrant_payload_indexes.split(","):
+            if entry.strip():
+                field, _, schema = entry.partition(":")
+                indexes[field.strip()] = schema.strip() or "keyword"
+        return indexes
+
     @property
     def max_file_size_bytes(self) -> int:
         return self.max_file_size_mb * 1024 * 1024
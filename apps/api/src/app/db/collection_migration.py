@@ -0,0 +1,234 @@
+"""Move the chunk collection to a new vector size behind a stable alias.
+
+    uv run python -m app.db.collection_migration --dimensions 512
+    uv run python -m app.db.collection_migration --dimensions 512 --mode reembed
+
+``truncate`` shortens and re-normalizes the stored vectors, which is exact for
+Matryoshka models (OpenAI text-embedding-3, nomic-embed-text v1.5). ``reembed``
+embeds the stored chunk text again at the new size.
+
+The chunk collection is served through a ``QDRANT_COLLECTION`` alias (see
+``VectorStore.versioned_name``), so queries and ingestion keep working throughout:
+they hit the old collection until the alias is switched in one atomic update, after
+which API processes that still produce larger embeddings truncate them to the
+collection's size. Set EMBEDDING_DIMENSIONS to the new size afterwards.
+
+A collection created before aliases were used sits under the bare name and cannot be
+switched atomically; migrate it once with ``--offline`` while the API and workers
+are stopped.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Literal, cast
+
+from qdrant_client.http.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    PointIdsList,
+    PointStruct,
+    Record,
+    VectorParams,
+)
+
+from app.config import settings
+from app.db.vector_store import VectorStore
+from app.providers.base import truncate_embedding
+from app.rag.embedder import DocumentEmbedder
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionMigration:
+    """Build a shadow collection at ``dimensions``, fill it, then switch the alias.
+
+    The copy is kept in sync with writes made meanwhile by diffing the source by
+    point ID and payload on every pass: new and changed points are copied again and
+    deleted ones are removed from the target. Passes repeat until one finds nothing
+    to do, then the alias is switched and a last pass applies what reached the old
+    collection in between.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        dimensions: int,
+        mode: Literal["truncate", "reembed"] = "truncate",
+        embedder: DocumentEmbedder | None = None,
+        batch_size: int = 256,
+        max_sync_passes: int = 5,
+        offline: bool = False,
+    ):
+        if mode == "reembed" and embedder is None:
+            raise ValueError("reembed mode needs an embedder producing the new dimensions")
+        self.store = vector_store
+        self.client = vector_store.client
+        self.alias = vector_store.collection_name
+        self.dimensions = dimensions
+        self.mode = mode
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.max_sync_passes = max_sync_passes
+        self.offline = offline
+
+    def resolve(self) -> tuple[str, bool]:
+        """Return the physical collection behind the alias and whether it is aliased."""
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.alias:
+                return alias.collection_name, True
+        if self.client.collection_exists(self.alias):
+            return self.alias, False
+        raise ValueError(f"Qdrant collection {self.alias} not found")
+
+    def run(self) -> str:
+        source, aliased = self.resolve()
+        if not aliased and not self.offline:
+            raise ValueError(
+                f"Qdrant collection {self.alias} predates aliases and cannot be switched "
+                "while in use; stop the API and workers and migrate with --offline"
+            )
+        vectors = self.client.get_collection(source).config.params.vectors
+        if (
+            isinstance(vectors, VectorParams)
+            and self.mode == "truncate"
+            and self.dimensions >= vectors.size
+        ):
+            raise ValueError(
+                f"Cannot truncate {vectors.size}-dimensional vectors to {self.dimensions}"
+            )
+
+        target = f"{self.alias}_{self.dimensions}d_{int(time.time())}"
+        logger.info(f"Migrating {source} -> {target} ({self.mode}, {self.dimensions} dims)")
+        self.client.create_collection(target, **self.store.collection_config(self.dimensions))
+        for field_name, schema in self.store.payload_indexes().items():
+            self.client.create_payload_index(target, field_name, schema)
+
+        # Point ID -> payload digest of what the target holds from the source
+        synced: dict[str, bytes] = {}
+        changed = self.sync(source, target, synced)
+        for _ in range(self.max_sync_passes):
+            if not changed:
+                break
+            changed = self.sync(source, target, synced)
+
+        create = CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=target, alias_name=self.alias)
+        )
+        if aliased:
+            self.client.update_collection_aliases(
+                change_aliases_operations=[
+                    DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.alias)),
+                    create,
+                ]
+            )
+            # Writes that reached the old collection after the last pass
+            self.sync(source, target, synced)
+            self.client.delete_collection(source)
+        else:
+            self.client.delete_collection(source)
+            self.client.update_collection_aliases(change_aliases_operations=[create])
+
+        logger.info(f"Alias {self.alias} now points to {target} ({len(synced)} points)")
+        return target
+
+    def sync(self, source: str, target: str, synced: dict[str, bytes]) -> int:
+        """Apply the source's changes since the last pass to the target.
+
+        ``synced`` maps each point the target holds from the source to its payload
+        digest and is updated in place. Returns the number of points written or deleted.
+        """
+        changed = 0
+        seen: set[str] = set()
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                source, limit=self.batch_size, offset=offset, with_payload=True
+            )
+            digests = {str(p.id): _digest(p.payload) for p in points}
+            seen.update(digests)
+            stale = [p for p in points if synced.get(str(p.id)) != digests[str(p.id)]]
+            if stale:
+                if self.mode == "truncate":
+                    stale = self.client.retrieve(
+                        source, ids=[p.id for p in stale], with_payload=True, with_vectors=True
+                    )
+                self.client.upsert(target, points=self._convert(stale))
+                synced.update((str(p.id), _digest(p.payload)) for p in stale)
+                changed += len(stale)
+                logger.info(f"Copied {len(stale)} points to {target}")
+
+            if offset is None:
+                break
+
+        deleted = [point_id for point_id in synced if point_id not in seen]
+        for start in range(0, len(deleted), self.batch_size):
+            batch = deleted[start : start + self.batch_size]
+            self.client.delete(target, points_selector=PointIdsList(points=list(batch)))
+        for point_id in deleted:
+            del synced[point_id]
+        if deleted:
+            logger.info(f"Deleted {len(deleted)} points from {target}")
+        return changed + len(deleted)
+
+    def _convert(self, points: list[Record]) -> list[PointStruct]:
+        if self.mode == "truncate":
+            # The chunk collection holds a single unnamed dense vector per point
+            vectors = [
+                truncate_embedding(cast(list[float], p.vector), self.dimensions) for p in points
+            ]
+        else:
+            assert self.embedder is not None
+            vectors = self.embedder.embed_texts(
+                [(p.payload or {}).get("content", "") for p in points]
+            )
+        return [
+            PointStruct(id=p.id, vector=vector, payload=p.payload)
+            for p, vector in zip(points, vectors, strict=True)
+        ]
+
+
+def _digest(payload: dict[str, Any] | None) -> bytes:
+    encoded = json.dumps(payload or {}, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).digest()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dimensions", type=int, required=True)
+    parser.add_argument("--mode", choices=["truncate", "reembed"], default="truncate")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="allow migrating a collection created before aliases (stop the API and workers)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    vector_store = VectorStore(
+        host=settings.qdrant_host,
+        port=settings.qdrant_port,
+        collection_name=settings.qdrant_collection,
+    )
+    embedder = None
+    if args.mode == "reembed":
+        settings.embedding_dimensions = args.dimensions
+        embedder = DocumentEmbedder()
+
+    CollectionMigration(
+        vector_store,
+        dimensions=args.dimensions,
+        mode=args.mode,
+        embedder=embedder,
+        batch_size=args.batch_size,
+        offline=args.offline,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,309 @@
 import logging
+import threading
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionInfo,
+    CreateAlias,
+    CreateAliasOperation,
+    Disabled,
     Distance,
     FieldCondition,
     Filter,
+    HnswConfigDiff,
+    MatchAny,
     MatchValue,
+    PayloadSchemaType,
+    PointIdsList,
     PointStruct,
+    QuantizationSearchParams,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    ScoredPoint,
+    SearchParams,
+    SetPayload,
+    SetPayloadOperation,
     VectorParams,
+    VectorParamsDiff,
 )
 
 from app.config import settings
+from app.providers.base import truncate_embedding
 
 logger = logging.getLogger(__name__)
 
+# Points per scroll request when listing a document's points
+_SCROLL_PAGE_SIZE = 1000
+
 
 class VectorStore:
-    def __init__(self, host: str, port: int, collection_name: str):
-        self.client = QdrantClient(host=host, port=port)
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        collection_name: str,
+        client: QdrantClient | None = None,
+        async_client: AsyncQdrantClient | None = None,
+    ):
+        self.client = client or QdrantClient(host=host, port=port)
+        self.async_client = async_client or AsyncQdrantClient(host=host, port=port)
         self.collection_name = collection_name
+        # Vector size of the collection behind ``collection_name``; may be smaller than
+        # EMBEDDING_DIMENSIONS after a Matryoshka migration (see ``_fit``)
+        self.dimensions: int | None = None
+        # Collection setup is verified once per process instead of before every call
+        self._collection_ready = False
+        self._lock = threading.Lock()
 
-    def ensure_collection(self):
-        collections = self.client.get_collections().collections
-        exists = any(c.name == self.collection_name for c in collections)
+    def ensure_collection(self) -> None:
+        if self._collection_ready:
+            return
 
-        if not exists:
-            logger.info(f"Creating Qdrant collection: {self.collection_name}")
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=settings.embedding_dimensions,
-                    distance=Distance.COSINE,
-                ),
+        with self._lock:
+            if self._collection_ready:
+                return
+
+            if self.client.collection_exists(self.collection_name):
+                info = self.client.get_collection(self.collection_name)
+                self._check_dimensions(info)
+                update = self._config_update(info)
+                if update:
+                    logger.info(f"Updating Qdrant collection config: {', '.join(update)}")
+                    self.client.update_collection(self.collection_name, **update)
+            else:
+                physical = self.versioned_name()
+                logger.info(
+                    f"Creating Qdrant collection {physical} behind alias {self.collection_name}"
+                )
+                try:
+                    self.client.create_collection(physical, **self.collection_config())
+                except Exception:
+                    # Another process may have created it between the check and the create
+                    if not self.client.collection_exists(physical):
+                        raise
+                self.client.update_collection_aliases(
+                    change_aliases_operations=[self._create_alias(physical)]
+                )
+                self.dimensions = settings.embedding_dimensions
+
+            for field_name, schema in self.payload_indexes().items():
+                self.client.create_payload_index(self.collection_name, field_name, schema)
+
+            self._collection_ready = True
+
+    async def aensure_collection(self) -> None:
+        if self._collection_ready:
+            return
+
+        if await self.async_client.collection_exists(self.collection_name):
+            info = await self.async_client.get_collection(self.collection_name)
+            self._check_dimensions(info)
+            update = self._config_update(info)
+            if update:
+                logger.info(f"Updating Qdrant collection config: {', '.join(update)}")
+                await self.async_client.update_collection(self.collection_name, **update)
+        else:
+            physical = self.versioned_name()
+            logger.info(
+                f"Creating Qdrant collection {physical} behind alias {self.collection_name}"
+            )
+            try:
+                await self.async_client.create_collection(physical, **self.collection_config())
+            except Exception:
+                if not await self.async_client.collection_exists(physical):
+                    raise
+            await self.async_client.update_collection_aliases(
+                change_aliases_operations=[self._create_alias(physical)]
+            )
+            self.dimensions = settings.embedding_dimensions
+
+        for field_name, schema in self.payload_indexes().items():
+            await self.async_client.create_payload_index(
+                self.collection_name, field_name, schema
+            )
+
+        self._collection_ready = True
+
+    @staticmethod
+    def payload_indexes() -> dict[str, PayloadSchemaType]:
+        """Indexed payload fields, so filtered searches and deletes don't scan the collection.
+
+        Indexes are created with the collection and added to an existing one at startup;
+        fields missing from a point (e.g. ``tags`` before tagging exists) cost nothing.
+        """
+        return {
+            field_name: PayloadSchemaType(schema)
+            for field_name, schema in settings.payload_indexes.items()
+        }
+
+    def _check_dimensions(self, info: CollectionInfo) -> None:
+        vectors = info.config.params.vectors
+        if not isinstance(vectors, VectorParams):
+            return
+        if vectors.size > settings.embedding_dimensions:
+            raise ValueError(
+                f"Qdrant collection {self.collection_name} stores {vectors.size}-dimensional "
+                f"vectors but EMBEDDING_DIMENSIONS is {settings.embedding_dimensions}"
+            )
+        if vectors.size < settings.embedding_dimensions:
+            logger.warning(
+                f"Qdrant collection {self.collection_name} stores {vectors.size}-dimensional "
+                f"vectors; truncating {settings.embedding_dimensions}-dimensional embeddings"
+            )
+        self.dimensions = vectors.size
+
+    def _fit(self, vector: list[float]) -> list[float]:
+        if self.dimensions is None:
+            return vector
+        return truncate_embedding(vector, self.dimensions)
+
+    @staticmethod
+    def _vectors_config(dimensions: int | None = None) -> VectorParams:
+        return VectorParams(
+            size=dimensions or settings.embedding_dimensions,
+            distance=Distance.COSINE,
+            on_disk=settings.qdrant_on_disk,
+        )
+
+    def versioned_name(self) -> str:
+        """Physical name of the first collection; ``collection_name`` is an alias for it.
+
+        Serving through an alias from the start lets a migration switch collections in
+        one atomic alias update (see ``app.db.collection_migration``).
+        """
+        return f"{self.collection_name}_v1"
+
+    def _create_alias(self, collection: str) -> CreateAliasOperation:
+        # Creating an alias that already points to ``collection`` is a no-op
+        return CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=collection, alias_name=self.collection_name)
+        )
+
+    def collection_config(self, dimensions: int | None = None) -> dict[str, Any]:
+        """``create_collection`` keyword arguments for the configured vectors and indexing."""
+        return {
+            "vectors_config": self._vectors_config(dimensions),
+            "hnsw_config": self._hnsw_config(),
+            "quantization_config": self._quantization_config(),
+        }
+
+    @staticmethod
+    def _hnsw_config() -> HnswConfigDiff:
+        return HnswConfigDiff(
+            m=settings.qdrant_hnsw_m,
+            ef_construct=settings.qdrant_hnsw_ef_construct,
+        )
+
+    @staticmethod
+    def _quantization_config() -> ScalarQuantization | BinaryQuantization | None:
+        """Compressed vectors kept in RAM for the HNSW search; originals serve rescoring."""
+        if settings.qdrant_quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=settings.qdrant_quantization_always_ram,
+                )
+            )
+        if settings.qdrant_quantization == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=settings.qdrant_quantization_always_ram)
+            )
+        return None
+
+    def _config_update(self, info: CollectionInfo) -> dict[str, Any]:
+        """Collection settings that differ from the configured ones, as update kwargs."""
+        update: dict[str, Any] = {}
+        config = info.config
+
+        hnsw = config.hnsw_config
+        if (hnsw.m, hnsw.ef_construct) != (
+            settings.qdrant_hnsw_m,
+            settings.qdrant_hnsw_ef_construct,
+        ):
+            update["hnsw_config"] = self._hnsw_config()
+
+        vectors = config.params.vectors
+        if isinstance(vectors, VectorParams) and bool(vectors.on_disk) != settings.qdrant_on_disk:
+            update["vectors_config"] = {"": VectorParamsDiff(on_disk=settings.qdrant_on_disk)}
+
+        current = self._quantization_fields(config.quantization_config)
+        wanted_config = self._quantization_config()
+        wanted = self._quantization_fields(wanted_config)
+        if current != wanted:
+            logger.info(f"Qdrant quantization changes from {current} to {wanted}")
+            update["quantization_config"] = wanted_config or Disabled.DISABLED
+
+        return update
+
+    @staticmethod
+    def _quantization_fields(config: Any) -> tuple[Any, ...] | None:
+        """The quantization settings we manage, comparable across server responses."""
+        if config is None:
+            return None
+        if isinstance(config, ScalarQuantization):
+            scalar = config.scalar
+            return ("scalar", scalar.type, scalar.quantile, bool(scalar.always_ram))
+        if isinstance(config, BinaryQuantization):
+            return ("binary", bool(config.binary.always_ram))
+        # Product quantization is never configured here, so it always differs
+        return (type(config).__name__,)
+
+    @staticmethod
+    def _search_params() -> SearchParams:
+        quantization = None
+        if settings.qdrant_quantization != "none":
+            # Over-fetch on the compressed vectors, then rescore with the originals
+            quantization = QuantizationSearchParams(
+                rescore=settings.qdrant_rescore,
+                oversampling=settings.qdrant_oversampling,
             )
+        return SearchParams(hnsw_ef=settings.qdrant_search_ef, quantization=quantization)
+
+    @staticmethod
+    def _is_stale(error: Exception) -> bool:
+        """Whether ``error`` may mean the collection changed since it was last checked.
+
+        A 404 means the alias was dropped; a 400 covers vectors of the wrong size after
+        another process moved the alias to a smaller collection. The embedded (local)
+        client has no status codes and raises ``ValueError`` for both. Anything else
+        matched here fails again on the single retry and is raised from there.
+        """
+        if isinstance(error, UnexpectedResponse):
+            return error.status_code in (400, 404)
+        return isinstance(error, ValueError)
+
+    def _with_collection[T](self, operation: Callable[[], T]) -> T:
+        self.ensure_collection()
+        try:
+            return operation()
+        except Exception as e:
+            if not self._is_stale(e):
+                raise
+            logger.warning(f"Qdrant collection {self.collection_name} changed, re-checking")
+            self._collection_ready = False
+            self.ensure_collection()
+            return operation()
+
+    async def _awith_collection[T](self, operation: Callable[[], Awaitable[T]]) -> T:
+        await self.aensure_collection()
+        try:
+            return await operation()
+        except Exception as e:
+            if not self._is_stale(e):
+                raise
+            logger.warning(f"Qdrant collection {self.collection_name} changed, re-checking")
+            self._collection_ready = False
+            await self.aensure_collection()
+            return await operation()
 
     def upsert_vectors(
         self,
@@ -40,13 +311,15 @@ class VectorStore:
         vectors: list[list[float]],
         payloads: list[dict],
     ):
-        self.ensure_collection()
-        points = [
-            PointStruct(id=id_, vector=vector, payload=payload)
-            for id_, vector, payload in zip(ids, vectors, payloads, strict=True)
-        ]
-        self.client.upsert(collection_name=self.collection_name, points=points)
-        logger.info(f"Upserted {len(points)} vectors to {self.collection_name}")
+        def upsert() -> None:
+            points = [
+                PointStruct(id=id_, vector=self._fit(vector), payload=payload)
+                for id_, vector, payload in zip(ids, vectors, payloads, strict=True)
+            ]
+            self.client.upsert(collection_name=self.collection_name, points=points)
+
+        self._with_collection(upsert)
+        logger.info(f"Upserted {len(ids)} vectors to {self.collection_name}")
 
     def search(
         self,
@@ -55,36 +328,129 @@ class VectorStore:
         score_threshold: float = 0.7,
         document_filter: list[str] | None = None,
     ) -> list[dict]:
-        self.ensure_collection()
+        logger.info(
+            f"Querying Qdrant: top_k={top_k}, threshold={score_threshold}, "
+            f"filter={document_filter}"
+        )
 
-        query_filter = None
-        if document_filter:
-            query_filter = Filter(
-                should=[
-                    FieldCondition(
-                        key="document_id",
-                        match=MatchValue(value=doc_id),
-                    )
-                    for doc_id in document_filter
-                ]
+        response = self._with_collection(
+            lambda: self.client.query_points(
+                collection_name=self.collection_name,
+                query=self._fit(query_vector),
+                limit=top_k,
+                score_threshold=score_threshold,
+                query_filter=self._document_filter(document_filter),
+                search_params=self._search_params(),
+                with_payload=True,
             )
+        )
+
+        return self._to_results(response.points)
 
+    async def asearch(
+        self,
+        query_vector: list[float],
+        top_k: int = 5,
+        score_threshold: float = 0.7,
+        document_filter: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
         logger.info(
-            f"Querying Qdrant: top_k={top_k}, threshold={score_threshold}, "
+            f"Querying Qdrant (async): top_k={top_k}, threshold={score_threshold}, "
             f"filter={document_filter}"
         )
 
-        response = self.client.query_points(
-            collection_name=self.collection_name,
-            query=query_vector,
-            limit=top_k,
-            score_threshold=score_threshold,
-            query_filter=query_filter,
-            with_payload=True,
+        response = await self._awith_collection(
+            lambda: self.async_client.query_points(
+                collection_name=self.collection_name,
+                query=self._fit(query_vector),
+                limit=top_k,
+                score_threshold=score_threshold,
+                query_filter=self._document_filter(document_filter),
+                search_params=self._search_params(),
+                with_payload=True,
+            )
+        )
+
+        return self._to_results(response.points)
+
+    def search_many(
+        self,
+        query_vectors: list[list[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.7,
+        document_filter: list[str] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Run one search per vector in a single Qdrant batch request."""
+        if not query_vectors:
+            return []
+        logger.info(f"Querying Qdrant: batch of {len(query_vectors)}, top_k={top_k}")
+
+        requests = self._batch_requests(query_vectors, top_k, score_threshold, document_filter)
+        responses = self._with_collection(
+            lambda: self.client.query_batch_points(
+                collection_name=self.collection_name, requests=requests
+            )
         )
+        return [self._to_results(response.points) for response in responses]
 
+    async def asearch_many(
+        self,
+        query_vectors: list[list[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.7,
+        document_filter: list[str] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        if not query_vectors:
+            return []
+        logger.info(f"Querying Qdrant (async): batch of {len(query_vectors)}, top_k={top_k}")
+
+        requests = self._batch_requests(query_vectors, top_k, score_threshold, document_filter)
+        responses = await self._awith_collection(
+            lambda: self.async_client.query_batch_points(
+                collection_name=self.collection_name, requests=requests
+            )
+        )
+        return [self._to_results(response.points) for response in responses]
+
+    def _batch_requests(
+        self,
+        query_vectors: list[list[float]],
+        top_k: int,
+        score_threshold: float,
+        document_filter: list[str] | None,
+    ) -> list[QueryRequest]:
+        query_filter = self._document_filter(document_filter)
+        search_params = self._search_params()
+        return [
+            QueryRequest(
+                query=self._fit(vector),
+                limit=top_k,
+                score_threshold=score_threshold,
+                filter=query_filter,
+                params=search_params,
+                with_payload=True,
+            )
+            for vector in query_vectors
+        ]
+
+    @staticmethod
+    def _document_filter(document_filter: list[str] | None) -> Filter | None:
+        if not document_filter:
+            return None
+        # One indexed MatchAny condition instead of a should-clause per document
+        return Filter(
+            must=[
+                FieldCondition(
+                    key="document_id",
+                    match=MatchAny(any=list(document_filter)),
+                )
+            ]
+        )
+
+    @staticmethod
+    def _to_results(points: list[ScoredPoint]) -> list[dict[str, Any]]:
         results = []
-        for point in response.points:
+        for point in points:
             payload = point.payload or {}
             results.append({
                 "id": str(point.id),
@@ -93,6 +459,7 @@ class VectorStore:
                 "document_name": payload.get("document_name", ""),
                 "chunk_index": payload.get("chunk_index", 0),
                 "page_number": payload.get("page_number"),
+                "page_end": payload.get("page_end"),
                 "content": payload.get("content", ""),
             })
 
@@ -100,17 +467,68 @@ class VectorStore:
         return results
 
     def delete_by_document(self, document_id: str):
-        self.client.delete(
-            collection_name=self.collection_name,
-            points_selector=Filter(
-                must=[
-                    FieldCondition(
-                        key="document_id",
-                        match=MatchValue(value=document_id),
-                    )
-                ]
-            ),
+        self._with_collection(
+            lambda: self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=Filter(
+                    must=[
+                        FieldCondition(
+                            key="document_id",
+                            match=MatchValue(value=document_id),
+                        )
+                    ]
+                ),
+            )
+        )
+
+    def document_points(self, document_id: str, fields: list[str]) -> dict[str, dict[str, Any]]:
+        """ID -> the given payload fields, for every point of a document (no vectors)."""
+        points: dict[str, dict[str, Any]] = {}
+        offset = None
+        while True:
+            records, offset = self._with_collection(
+                partial(
+                    self.client.scroll,
+                    collection_name=self.collection_name,
+                    scroll_filter=self._document_filter([document_id]),
+                    limit=_SCROLL_PAGE_SIZE,
+                    offset=offset,
+                    with_payload=fields,
+                    with_vectors=False,
+                )
+            )
+            points.update((str(record.id), record.payload or {}) for record in records)
+            if offset is None:
+                return points
+
+    def set_payloads(self, payloads: dict[str, dict[str, Any]]) -> None:
+        """Update payload fields of existing points in one request, keeping their vectors."""
+        if not payloads:
+            return
+        operations = [
+            SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[id_]))
+            for id_, payload in payloads.items()
+        ]
+        self._with_collection(
+            lambda: self.client.batch_update_points(
+                collection_name=self.collection_name, update_operations=operations
+            )
+        )
+
+    def delete_points(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        self._with_collection(
+            lambda: self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=ids),
+            )
         )
+        logger.info(f"Deleted {len(ids)} vectors from {self.collection_name}")
+
+    async def aclose(self) -> None:
+        self.client.close()
+        await self.async_client.close()
 
     def count(self) -> int:
         try:
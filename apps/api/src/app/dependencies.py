@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import async_session_maker
 from app.db.vector_store import VectorStore
-from app.config import settings
+from app.resources import get_resources
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -16,8 +16,4 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 def get_vector_store() -> VectorStore:
-    return VectorStore(
-        host=settings.qdrant_host,
-        port=settings.qdrant_port,
-        collection_name=settings.qdrant_collection,
-    )
+    return get_resources().vector_store
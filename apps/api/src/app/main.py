@@ -8,6 +8,8 @@ from app.api.router import api_router
 from app.api.websocket import websocket_router
 from app.config import settings
 from app.db.session import init_db
+from app.resources import close_resources, get_resources
+from app.services.ingestion_queue import get_ingestion_queue
 
 # Configure app-level logging
 logging.basicConfig(
@@ -28,8 +30,29 @@ async def lifespan(app: FastAPI):
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.warning(f"Database init failed: {e}")
+
+    resources = get_resources()
+    try:
+        resources.warm_up()
+        logger.info("Application resources initialized")
+    except Exception as e:
+        logger.warning(f"Resource init failed, retrying on first request: {e}")
+
+    try:
+        await resources.vector_store.aensure_collection()
+        logger.info("Qdrant collection verified")
+    except ValueError:
+        # Embedding dimension mismatch: every search would fail, so refuse to start
+        raise
+    except Exception as e:
+        logger.warning(f"Qdrant collection check failed, retrying on first use: {e}")
+
     yield
 
+    # Documents still queued stay "pending"; POST /documents/{id}/process requeues them
+    await get_ingestion_queue().aclose()
+    await close_resources()
+
 
 app = FastAPI(
     title=settings.app_name,
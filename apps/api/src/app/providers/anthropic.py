@@ -1,7 +1,11 @@
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
 from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import BaseMessage
 
 from app.config import settings
-from app.providers.base import BaseLLMProvider
+from app.providers.base import BaseLLMProvider, usage_from_metadata
 
 
 class AnthropicLLMProvider(BaseLLMProvider):
@@ -18,19 +22,70 @@ class AnthropicLLMProvider(BaseLLMProvider):
         temperature: float = 0.1,
         max_tokens: int = 2000,
     ) -> dict:
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-
         response = self.client.invoke(
-            messages,
+            _messages(system_prompt, user_prompt),
             temperature=temperature,
             max_tokens=max_tokens,
         )
+        return self._to_result(response)
 
-        usage = response.response_metadata.get("usage", {})
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> dict[str, Any]:
+        response = await self.client.ainvoke(
+            _messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return self._to_result(response)
+
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> Iterator[dict[str, Any]]:
+        usage = None
+        for chunk in self.client.stream(
+            _messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            if chunk.usage_metadata:
+                usage = chunk.usage_metadata
+            if chunk.content:
+                yield {"content": chunk.content}
+
+        yield {"content": "", "model": settings.llm_model, "usage": usage_from_metadata(usage)}
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> AsyncIterator[dict[str, Any]]:
+        usage = None
+        async for chunk in self.client.astream(
+            _messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            if chunk.usage_metadata:
+                usage = chunk.usage_metadata
+            if chunk.content:
+                yield {"content": chunk.content}
 
+        yield {"content": "", "model": settings.llm_model, "usage": usage_from_metadata(usage)}
+
+    @staticmethod
+    def _to_result(response: BaseMessage) -> dict[str, Any]:
+        usage = response.response_metadata.get("usage", {})
         return {
             "content": response.content,
             "model": settings.llm_model,
@@ -40,3 +95,10 @@ class AnthropicLLMProvider(BaseLLMProvider):
                 "total": usage.get("input_tokens", 0) + usage.get("output_tokens", 0),
             },
         }
+
+
+def _messages(system_prompt: str, user_prompt: str) -> list[dict[str, Any]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
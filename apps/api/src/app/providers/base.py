@@ -1,4 +1,31 @@
+import asyncio
+import math
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterator, Mapping
+from typing import Any
+
+
+def usage_from_metadata(usage_metadata: Mapping[str, Any] | None) -> dict[str, int]:
+    """Convert LangChain ``usage_metadata`` to the provider usage dict."""
+    usage_metadata = usage_metadata or {}
+    return {
+        "prompt": usage_metadata.get("input_tokens", 0),
+        "completion": usage_metadata.get("output_tokens", 0),
+        "total": usage_metadata.get("total_tokens", 0),
+    }
+
+
+def truncate_embedding(vector: list[float], dimensions: int) -> list[float]:
+    """Shorten a Matryoshka-style embedding to ``dimensions`` and re-normalize it.
+
+    For models trained this way (OpenAI text-embedding-3, nomic-embed-text v1.5) this
+    matches asking the model for the smaller size directly.
+    """
+    if len(vector) <= dimensions:
+        return vector
+    head = vector[:dimensions]
+    norm = math.sqrt(sum(x * x for x in head))
+    return [x / norm for x in head] if norm else head
 
 
 class BaseLLMProvider(ABC):
@@ -12,8 +39,67 @@ class BaseLLMProvider(ABC):
     ) -> dict:
         pass
 
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield ``{"content": delta}`` dicts; the last one also carries usage and model.
+
+        Providers without native streaming fall back to a single chunk.
+        """
+        yield self.generate(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> dict[str, Any]:
+        """Async ``generate``; defaults to running the sync call in a worker thread."""
+        return await asyncio.to_thread(
+            self.generate,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> AsyncIterator[dict[str, Any]]:
+        yield await self.agenerate(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+    async def aclose(self) -> None:
+        """Release pooled connections; no-op for providers without their own clients."""
+        return None
+
 
 class BaseEmbeddingProvider(ABC):
     @abstractmethod
     def embed(self, texts: list[str]) -> list[list[float]]:
         pass
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.to_thread(self.embed, texts)
+
+    async def aclose(self) -> None:
+        """Release pooled connections; no-op for providers without their own clients."""
+        return None
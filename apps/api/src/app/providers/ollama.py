@@ -1,13 +1,20 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
 import httpx
 
 from app.config import settings
-from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider, truncate_embedding
 
 
 class OllamaLLMProvider(BaseLLMProvider):
     def __init__(self):
         self.base_url = settings.ollama_host
         self.model = settings.ollama_llm_model
+        self._async_client: httpx.AsyncClient | None = None
 
     def generate(
         self,
@@ -18,50 +25,211 @@ class OllamaLLMProvider(BaseLLMProvider):
     ) -> dict:
         response = httpx.post(
             f"{self.base_url}/api/chat",
-            json={
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "options": {
-                    "temperature": temperature,
-                    "num_predict": max_tokens,
-                },
-                "stream": False,
-            },
+            json=self._payload(system_prompt, user_prompt, temperature, max_tokens, False),
             timeout=120.0,
         )
         response.raise_for_status()
-        data = response.json()
+        return self._to_result(response.json())
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> dict[str, Any]:
+        response = await self._get_async_client().post(
+            "/api/chat",
+            json=self._payload(system_prompt, user_prompt, temperature, max_tokens, False),
+        )
+        response.raise_for_status()
+        return self._to_result(response.json())
 
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> Iterator[dict[str, Any]]:
+        with httpx.stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            json=self._payload(system_prompt, user_prompt, temperature, max_tokens, True),
+            timeout=120.0,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                yield from self._stream_line(line)
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> AsyncIterator[dict[str, Any]]:
+        async with self._get_async_client().stream(
+            "POST",
+            "/api/chat",
+            json=self._payload(system_prompt, user_prompt, temperature, max_tokens, True),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                for chunk in self._stream_line(line):
+                    yield chunk
+
+    def _payload(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool,
+    ) -> dict[str, Any]:
         return {
-            "content": data["message"]["content"],
             "model": self.model,
-            "usage": {
-                "prompt": data.get("prompt_eval_count", 0),
-                "completion": data.get("eval_count", 0),
-                "total": data.get("prompt_eval_count", 0) + data.get("eval_count", 0),
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
             },
+            "stream": stream,
+        }
+
+    def _to_result(self, data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "content": data["message"]["content"],
+            "model": self.model,
+            "usage": self._usage(data),
+        }
+
+    def _stream_line(self, line: str) -> Iterator[dict[str, Any]]:
+        if not line:
+            return
+        data = json.loads(line)
+        content = data.get("message", {}).get("content", "")
+        if content:
+            yield {"content": content}
+        if data.get("done"):
+            yield {"content": "", "model": self.model, "usage": self._usage(data)}
+
+    @staticmethod
+    def _usage(data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "prompt": data.get("prompt_eval_count", 0),
+            "completion": data.get("eval_count", 0),
+            "total": data.get("prompt_eval_count", 0) + data.get("eval_count", 0),
         }
 
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=120.0)
+        return self._async_client
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
 
 class OllamaEmbeddingProvider(BaseEmbeddingProvider):
     def __init__(self):
         self.base_url = settings.ollama_host
         self.model = settings.ollama_embed_model
+        self.mode = settings.ollama_embed_mode
+        self.batch_size = settings.ollama_embed_batch_size
+        self.concurrency = settings.ollama_embed_concurrency
+        # Matryoshka models (e.g. nomic-embed-text v1.5) are truncated client-side
+        self.dimensions = settings.embedding_dimensions
+        self.limits = httpx.Limits(
+            max_connections=settings.ollama_max_connections,
+            max_keepalive_connections=settings.ollama_max_connections,
+        )
+        self.client = httpx.Client(base_url=self.base_url, limits=self.limits, timeout=60.0)
+        # Created lazily: an AsyncClient is bound to the event loop it first runs on
+        self._async_client: httpx.AsyncClient | None = None
 
     def embed(self, texts: list[str]) -> list[list[float]]:
-        embeddings = []
+        if not texts:
+            return []
 
-        for text in texts:
-            response = httpx.post(
-                f"{self.base_url}/api/embeddings",
-                json={"model": self.model, "prompt": text},
-                timeout=60.0,
-            )
+        if self.mode == "single":
+            return [self._embed_single(text) for text in texts]
+
+        batches = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as pool:
+            results = pool.map(self._embed_batch, batches)
+            return [embedding for batch in results for embedding in batch]
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        client = self._get_async_client()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        if self.mode == "single":
+
+            async def embed_single(text: str) -> list[float]:
+                async with semaphore:
+                    response = await client.post(
+                        "/api/embeddings", json={"model": self.model, "prompt": text}
+                    )
+                response.raise_for_status()
+                return self._fit(response.json()["embedding"])
+
+            return list(await asyncio.gather(*(embed_single(text) for text in texts)))
+
+        async def embed_batch(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                response = await client.post(
+                    "/api/embed", json={"model": self.model, "input": batch}
+                )
             response.raise_for_status()
-            data = response.json()
-            embeddings.append(data["embedding"])
+            return [self._fit(e) for e in response.json()["embeddings"]]
 
-        return embeddings
+        batches = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch]
+
+    def close(self) -> None:
+        self.client.close()
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _embed_single(self, text: str) -> list[float]:
+        response = self.client.post(
+            "/api/embeddings",
+            json={"model": self.model, "prompt": text},
+        )
+        response.raise_for_status()
+        return self._fit(response.json()["embedding"])
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        response = self.client.post(
+            "/api/embed",
+            json={"model": self.model, "input": texts},
+        )
+        response.raise_for_status()
+        return [self._fit(e) for e in response.json()["embeddings"]]
+
+    def _fit(self, embedding: list[float]) -> list[float]:
+        return truncate_embedding(embedding, self.dimensions)
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, limits=self.limits, timeout=60.0
+            )
+        return self._async_client
@@ -1,7 +1,11 @@
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.messages import BaseMessage
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 from app.config import settings
-from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider, usage_from_metadata
 
 
 class OpenAILLMProvider(BaseLLMProvider):
@@ -19,30 +23,79 @@ class OpenAILLMProvider(BaseLLMProvider):
         temperature: float = 0.1,
         max_tokens: int = 2000,
     ) -> dict:
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-
         response = self.client.invoke(
-            messages,
+            _messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return self._to_result(response)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> dict[str, Any]:
+        response = await self.client.ainvoke(
+            _messages(system_prompt, user_prompt),
             temperature=temperature,
             max_tokens=max_tokens,
         )
+        return self._to_result(response)
+
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> Iterator[dict[str, Any]]:
+        usage = None
+        for chunk in self.client.stream(
+            _messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream_usage=True,
+        ):
+            if chunk.usage_metadata:
+                usage = chunk.usage_metadata
+            if chunk.content:
+                yield {"content": chunk.content}
+
+        yield {"content": "", "model": settings.llm_model, "usage": usage_from_metadata(usage)}
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> AsyncIterator[dict[str, Any]]:
+        usage = None
+        async for chunk in self.client.astream(
+            _messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream_usage=True,
+        ):
+            if chunk.usage_metadata:
+                usage = chunk.usage_metadata
+            if chunk.content:
+                yield {"content": chunk.content}
 
+        yield {"content": "", "model": settings.llm_model, "usage": usage_from_metadata(usage)}
+
+    @staticmethod
+    def _to_result(response: BaseMessage) -> dict[str, Any]:
+        token_usage = response.response_metadata.get("token_usage", {})
         return {
             "content": response.content,
             "model": settings.llm_model,
             "usage": {
-                "prompt": response.response_metadata.get("token_usage", {}).get(
-                    "prompt_tokens", 0
-                ),
-                "completion": response.response_metadata.get("token_usage", {}).get(
-                    "completion_tokens", 0
-                ),
-                "total": response.response_metadata.get("token_usage", {}).get(
-                    "total_tokens", 0
-                ),
+                "prompt": token_usage.get("prompt_tokens", 0),
+                "completion": token_usage.get("completion_tokens", 0),
+                "total": token_usage.get("total_tokens", 0),
             },
         }
 
@@ -57,3 +110,13 @@ class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
 
     def embed(self, texts: list[str]) -> list[list[float]]:
         return self.client.embed_documents(texts)
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        return await self.client.aembed_documents(texts)
+
+
+def _messages(system_prompt: str, user_prompt: str) -> list[dict[str, Any]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
@@ -1,3 +1,16 @@
-from app.rag.pipeline import RAGPipeline
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.rag.pipeline import RAGPipeline
 
 __all__ = ["RAGPipeline"]
+
+
+def __getattr__(name: str) -> "type[RAGPipeline]":
+    # Imported lazily so extraction pool workers can import app.rag.extractors
+    # without loading the whole query stack
+    if name == "RAGPipeline":
+        from app.rag.pipeline import RAGPipeline
+
+        return RAGPipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
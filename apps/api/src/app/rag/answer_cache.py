@@ -0,0 +1,303 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import redis
+
+from app.config import settings
+from app.rag.cache import CacheStats
+
+logger = logging.getLogger(__name__)
+
+
+def llm_model_name() -> str:
+    if settings.llm_provider == "ollama":
+        return settings.ollama_llm_model
+    return settings.llm_model
+
+
+@dataclass
+class CachedAnswer:
+    response: dict[str, Any]
+    document_ids: set[str]
+    scope: str
+    query_vector: np.ndarray | None = None
+    epochs: dict[str, int] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+
+class _VectorIndex:
+    """Normalized question vectors of one scope, kept stacked for a single matmul.
+
+    Rows live in a buffer that doubles when full; removing a key moves the last row
+    into its slot, so adds and evictions never re-stack the whole matrix.
+    """
+
+    def __init__(self, dimensions: int):
+        self.keys: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.matrix = np.empty((16, dimensions), dtype=np.float32)
+
+    @property
+    def dimensions(self) -> int:
+        return int(self.matrix.shape[1])
+
+    def add(self, key: str, vector: np.ndarray) -> None:
+        if key in self.rows:
+            self.matrix[self.rows[key]] = vector
+            return
+        size = len(self.keys)
+        if size == len(self.matrix):
+            grown = np.empty((size * 2, self.dimensions), dtype=np.float32)
+            grown[:size] = self.matrix
+            self.matrix = grown
+        self.matrix[size] = vector
+        self.rows[key] = size
+        self.keys.append(key)
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        last = self.keys.pop()
+        if last != key:
+            self.matrix[row] = self.matrix[len(self.keys)]
+            self.keys[row] = last
+            self.rows[last] = row
+
+    def search(self, vector: np.ndarray, threshold: float) -> list[str]:
+        """Keys whose similarity to ``vector`` reaches ``threshold``, best first."""
+        if vector.shape != (self.dimensions,):
+            return []
+        similarities = self.matrix[: len(self.keys)] @ vector
+        matches = np.flatnonzero(similarities >= threshold)
+        return [self.keys[i] for i in matches[np.argsort(-similarities[matches])]]
+
+
+class AnswerCache:
+    """Cache of generated answers, matched exactly or by question similarity.
+
+    Exact keys cover (retrieved chunk ids, prompt hash, model, temperature). With
+    ``similarity_enabled``, entries also remember the normalized question vector so
+    a near-duplicate question in the same scope (model, temperature, retrieval
+    options) can be answered without retrieval or generation.
+
+    Entries are dropped locally when a contributing document is invalidated. Each
+    entry also records the per-document epoch counters kept in Redis, so an
+    invalidation issued by another process (e.g. a Celery worker re-ingesting a
+    document) is honoured on the next lookup.
+    """
+
+    epoch_prefix = "documind:doc-epoch:"
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        similarity_threshold: float,
+        redis_url: str | None = None,
+        similarity_enabled: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.similarity_enabled = similarity_enabled
+        self.client = (
+            redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+            if redis_url
+            else None
+        )
+        self._entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        self._by_document: dict[str, set[str]] = {}
+        self._vectors: dict[str, _VectorIndex] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def scope(retrieval: dict[str, Any]) -> str:
+        """Identify answers comparable by question similarity: same model and retrieval."""
+        return json.dumps(
+            [llm_model_name(), settings.llm_temperature, retrieval],
+            sort_keys=True,
+        )
+
+    @staticmethod
+    def key(chunk_ids: list[str], prompt: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(llm_model_name().encode())
+        digest.update(str(settings.llm_temperature).encode())
+        digest.update(",".join(chunk_ids).encode())
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or not self._is_fresh(key, entry):
+            self._record(hit=False)
+            return None
+
+        with self._lock:
+            self._entries.move_to_end(key)
+        self._record(hit=True)
+        return entry.response
+
+    def find_similar(self, query_vector: list[float], scope: str) -> dict[str, Any] | None:
+        if not self.similarity_enabled:
+            return None
+
+        vector = self._normalize(query_vector)
+        with self._lock:
+            index = self._vectors.get(scope)
+            matches = index.search(vector, self.similarity_threshold) if index else []
+            candidates = [(key, self._entries[key]) for key in matches]
+
+        for key, entry in candidates:
+            if self._is_fresh(key, entry):
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                self._record(hit=True)
+                return entry.response
+        self._record(hit=False)
+        return None
+
+    def put(
+        self,
+        key: str,
+        response: dict[str, Any],
+        document_ids: set[str],
+        scope: str,
+        query_vector: list[float] | None = None,
+    ) -> None:
+        entry = CachedAnswer(
+            response=response,
+            document_ids=document_ids,
+            scope=scope,
+            query_vector=(
+                self._normalize(query_vector)
+                if query_vector and self.similarity_enabled
+                else None
+            ),
+            epochs=self._epochs(document_ids),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for document_id in document_ids:
+                self._by_document.setdefault(document_id, set()).add(key)
+            if entry.query_vector is not None:
+                self._index_vector(key, entry.scope, entry.query_vector)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate_document(self, document_id: str) -> None:
+        with self._lock:
+            for key in list(self._by_document.get(document_id, ())):
+                self._remove(key)
+        if self.client is not None:
+            try:
+                self.client.incr(self.epoch_prefix + document_id)
+            except redis.RedisError as e:
+                logger.warning(f"Answer cache invalidation broadcast failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_document.clear()
+            self._vectors.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+            )
+
+    def _is_fresh(self, key: str, entry: CachedAnswer) -> bool:
+        stale = entry.expires_at < time.monotonic() or (
+            entry.epochs and self._epochs(entry.document_ids) != entry.epochs
+        )
+        if stale:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._remove(key)
+        return not stale
+
+    def _epochs(self, document_ids: set[str]) -> dict[str, int]:
+        if self.client is None or not document_ids:
+            return {}
+        ordered = sorted(document_ids)
+        try:
+            values = self.client.mget([self.epoch_prefix + doc_id for doc_id in ordered])
+        except redis.RedisError as e:
+            logger.warning(f"Answer cache epoch lookup failed: {e}")
+            return {}
+        return {doc_id: int(value or 0) for doc_id, value in zip(ordered, values, strict=True)}
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for document_id in entry.document_ids:
+            keys = self._by_document.get(document_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_document[document_id]
+        index = self._vectors.get(entry.scope)
+        if index is not None:
+            index.remove(key)
+            if not index.keys:
+                del self._vectors[entry.scope]
+
+    def _index_vector(self, key: str, scope: str, vector: np.ndarray) -> None:
+        index = self._vectors.get(scope)
+        if index is None or index.dimensions != len(vector):
+            # A new embedding size makes the scope's older vectors incomparable
+            if index is not None:
+                for stale in list(index.keys):
+                    self._remove(stale)
+            index = self._vectors[scope] = _VectorIndex(len(vector))
+        index.add(key, vector)
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    @staticmethod
+    def _normalize(vector: list[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache | None:
+    if not settings.answer_cache_enabled:
+        return None
+    return AnswerCache(
+        max_entries=settings.answer_cache_max_entries,
+        ttl_seconds=settings.answer_cache_ttl_seconds,
+        similarity_threshold=settings.answer_cache_similarity_threshold,
+        redis_url=settings.redis_url,
+        similarity_enabled=settings.answer_cache_similarity_enabled,
+    )
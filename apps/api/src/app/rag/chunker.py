@@ -1,9 +1,30 @@
+import logging
+import multiprocessing
+import threading
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any
 
 import tiktoken
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from app.config import settings
+from app.rag.streaming import batched
+
+logger = logging.getLogger(__name__)
+
+SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+# Joins the text of consecutive pages when chunks flow across page boundaries
+PAGE_BREAK = "\n\n"
+
+# Bytes ``str.strip()`` removes from the ends of a chunk (its ASCII whitespace)
+_WHITESPACE = frozenset(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f")
 
 
 @dataclass
@@ -13,27 +34,45 @@ class Chunk:
     page_number: int | None
     token_count: int
     metadata: dict
+    # Last page the chunk covers when it runs past ``page_number``
+    page_end: int | None = None
 
 
 class DocumentChunker:
+    """Recursive separator splitting measured in tokens, encoding each text once.
+
+    Splits and merges like LangChain's ``RecursiveCharacterTextSplitter`` with a token
+    length function: pieces are cut at the first of ``SEPARATORS`` the text contains
+    (separators stay at the start of the following piece), pieces still too long are
+    split again at the next separator, and neighbouring pieces are merged into chunks
+    of up to ``chunk_size`` tokens that repeat up to ``chunk_overlap`` tokens of the
+    previous chunk. Instead of re-encoding every candidate piece, the text is encoded
+    once and a piece's length is the number of tokens starting inside it.
+
+    With ``across_pages`` the pieces of consecutive pages are merged as one stream, so
+    chunks fill up across page boundaries and record the pages they span.
+
+    With ``workers`` above 1, ``iter_chunks`` encodes and splits batches of
+    ``pages_per_task`` pages in a process pool shared by every chunker, and numbers
+    the results in page order.
+    """
+
     def __init__(
         self,
         chunk_size: int | None = None,
         chunk_overlap: int | None = None,
+        across_pages: bool | None = None,
+        workers: int | None = None,
+        pages_per_task: int | None = None,
     ):
         self.chunk_size = chunk_size or settings.rag_chunk_size
         self.chunk_overlap = chunk_overlap or settings.rag_chunk_overlap
-        self.encoding = tiktoken.get_encoding("cl100k_base")
-
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            separators=["\n\n", "\n", ". ", " "],
-            length_function=self._token_length,
+        self.across_pages = (
+            across_pages if across_pages is not None else settings.rag_chunk_across_pages
         )
-
-    def _token_length(self, text: str) -> int:
-        return len(self.encoding.encode(text))
+        self.workers = workers if workers is not None else settings.rag_chunk_workers
+        self.pages_per_task = pages_per_task or settings.rag_chunk_pages_per_task
+        self.encoding = tiktoken.get_encoding("cl100k_base")
 
     def chunk_text(
         self,
@@ -42,11 +81,10 @@ class DocumentChunker:
         document_name: str,
         page_number: int | None = None,
     ) -> list[Chunk]:
-        splits = self.splitter.split_text(text)
+        splits = self.split_text(text)
         chunks = []
 
-        for i, content in enumerate(splits):
-            token_count = self._token_length(content)
+        for i, (content, token_count) in enumerate(splits):
             chunks.append(
                 Chunk(
                     content=content,
@@ -65,31 +103,346 @@ class DocumentChunker:
 
         return chunks
 
+    def split_text(self, text: str) -> list[tuple[str, int]]:
+        """``(content, token_count)`` of each chunk of ``text``, in order."""
+        data, count = self._measure(text)
+        # Spans always end at ASCII separators or whitespace, so they decode cleanly
+        return [
+            (data[start:end].decode(), count(start, end))
+            for start, end in self._split(data, 0, len(data), SEPARATORS, count)
+        ]
+
+    def _measure(self, text: str) -> tuple[bytes, Callable[[int, int], int]]:
+        """``text`` as UTF-8 and a token counter for its byte spans, encoding it once."""
+        # Offsets are in UTF-8 bytes, where token boundaries are exact
+        data = text.encode()
+        tokens = self.encoding.encode_ordinary(text)
+        lengths = _token_byte_lengths(self.encoding.name)
+        starts = list(accumulate(map(lengths.__getitem__, tokens), initial=0))[:-1]
+
+        def count(start: int, end: int) -> int:
+            return bisect_left(starts, end) - bisect_left(starts, start)
+
+        return data, count
+
+    def _split(
+        self,
+        data: bytes,
+        start: int,
+        end: int,
+        separators: tuple[str, ...],
+        count: Callable[[int, int], int],
+    ) -> list[tuple[int, int]]:
+        """Chunk spans of ``data[start:end]``, splitting at ``separators[0]`` first."""
+        separator, remaining = _separator(data, start, end, separators)
+        chunks: list[tuple[int, int]] = []
+        fitting: list[tuple[int, int, int]] = []
+        for piece_start, piece_end in _pieces(data, start, end, separator):
+            tokens = count(piece_start, piece_end)
+            if tokens < self.chunk_size:
+                fitting.append((piece_start, piece_end, tokens))
+                continue
+            if fitting:
+                chunks.extend(self._merge(data, fitting))
+                fitting = []
+            if remaining:
+                chunks.extend(self._split(data, piece_start, piece_end, remaining, count))
+            else:
+                # Nothing left to split on; kept whole, as the piece came
+                chunks.append((piece_start, piece_end))
+        if fitting:
+            chunks.extend(self._merge(data, fitting))
+        return chunks
+
+    def _merge(self, data: bytes, pieces: list[tuple[int, int, int]]) -> list[tuple[int, int]]:
+        """Merge consecutive ``(start, end, tokens)`` pieces into overlapping chunk spans."""
+        spans = (_strip(data, window[0][0], window[-1][1]) for window in self._windows(pieces))
+        return [span for span in spans if span[0] < span[1]]
+
+    def _windows[P: tuple[Any, ...]](self, pieces: Iterable[P]) -> Iterator[list[P]]:
+        """Group consecutive pieces, whose last field is their token count, into chunks.
+
+        Each window holds up to ``chunk_size`` tokens and starts with up to
+        ``chunk_overlap`` tokens of the previous one.
+        """
+        window: deque[P] = deque()
+        total = 0
+        for piece in pieces:
+            tokens = piece[-1]
+            if total + tokens > self.chunk_size and window:
+                if total > self.chunk_size:
+                    logger.warning(
+                        f"Created a chunk of {total} tokens, longer than {self.chunk_size}"
+                    )
+                yield list(window)
+                # Keep at most chunk_overlap tokens, and room for the new piece
+                while total > self.chunk_overlap or (
+                    total + tokens > self.chunk_size and total > 0
+                ):
+                    total -= window.popleft()[-1]
+            window.append(piece)
+            total += tokens
+        if window:
+            yield list(window)
+
+    def _atoms(
+        self,
+        data: bytes,
+        start: int,
+        end: int,
+        separators: tuple[str, ...],
+        count: Callable[[int, int], int],
+    ) -> Iterator[tuple[int, int, int]]:
+        """``(start, end, tokens)`` pieces of ``data[start:end]`` that each fit a chunk.
+
+        Pieces are cut at the coarsest separator that makes them small enough, as in
+        ``_split``; a piece with nothing left to split on is kept whole.
+        """
+        separator, remaining = _separator(data, start, end, separators)
+        for piece_start, piece_end in _pieces(data, start, end, separator):
+            tokens = count(piece_start, piece_end)
+            if tokens < self.chunk_size or not remaining:
+                yield piece_start, piece_end, tokens
+            else:
+                yield from self._atoms(data, piece_start, piece_end, remaining, count)
+
     def chunk_pages(
         self,
         pages: list[dict],
         document_id: str,
         document_name: str,
     ) -> list[Chunk]:
-        all_chunks: list[Chunk] = []
+        all_chunks = list(self.iter_chunks(pages, document_id, document_name))
+
+        for chunk in all_chunks:
+            chunk.metadata["total_chunks"] = len(all_chunks)
+
+        return all_chunks
+
+    def iter_chunks(
+        self,
+        pages: Iterable[dict[str, Any]],
+        document_id: str,
+        document_name: str,
+    ) -> Iterator[Chunk]:
+        """Chunk pages as they arrive, numbering chunks across the whole document.
+
+        The document's chunk total is unknown until the last page, so chunks carry
+        no ``total_chunks``.
+        """
+        if self.across_pages:
+            yield from self._iter_spanning_chunks(pages, document_id, document_name)
+            return
+
         global_index = 0
 
+        for page, splits in self._iter_page_splits(pages):
+            page_number = page.get("page_number")
+            for content, token_count in splits:
+                yield Chunk(
+                    content=content,
+                    chunk_index=global_index,
+                    page_number=page_number,
+                    token_count=token_count,
+                    metadata={
+                        "document_id": document_id,
+                        "document_name": document_name,
+                        "chunk_index": global_index,
+                        "page_number": page_number,
+                    },
+                )
+                global_index += 1
+
+    def split_page(self, text: str) -> list[tuple[str, int]]:
+        """``(text, tokens)`` of a page's chunks, or of its pieces when chunking across
+        pages (those are merged with the neighbouring pages' pieces afterwards)."""
+        if not self.across_pages:
+            return self.split_text(text)
+        data, count = self._measure(text)
+        return [
+            (data[start:end].decode(), tokens)
+            for start, end, tokens in self._atoms(data, 0, len(data), SEPARATORS, count)
+        ]
+
+    def _iter_page_splits(
+        self, pages: Iterable[dict[str, Any]]
+    ) -> Iterator[tuple[dict[str, Any], list[tuple[str, int]]]]:
+        """Each page with its ``split_page`` result, in page order."""
+        workers = self._pool_size()
+        if workers > 1:
+            yield from self._iter_parallel(pages, workers)
+            return
         for page in pages:
-            page_chunks = self.chunk_text(
-                text=page["content"],
-                document_id=document_id,
-                document_name=document_name,
-                page_number=page.get("page_number"),
+            yield page, self.split_page(page["content"])
+
+    def _pool_size(self) -> int:
+        # Daemonic processes (Celery prefork workers) may not start children
+        if self.workers <= 1 or multiprocessing.current_process().daemon:
+            return 1
+        return self.workers
+
+    def _iter_parallel(
+        self, pages: Iterable[dict[str, Any]], workers: int
+    ) -> Iterator[tuple[dict[str, Any], list[tuple[str, int]]]]:
+        """Split batches of pages in the shared pool, yielding them in page order.
+
+        At most two batches per worker are in flight, so pages read ahead of the
+        consumer stay bounded.
+        """
+        pool = get_chunk_pool(workers)
+        page_batches = batched(pages, self.pages_per_task)
+        pending: deque[tuple[list[dict[str, Any]], Future[list[list[tuple[str, int]]]]]] = deque()
+
+        def submit() -> None:
+            batch = next(page_batches, None)
+            if batch is not None:
+                texts = [page["content"] for page in batch]
+                future = pool.submit(
+                    _split_pages, texts, self.chunk_size, self.chunk_overlap, self.across_pages
+                )
+                pending.append((batch, future))
+
+        try:
+            for _ in range(workers * 2):
+                submit()
+            while pending:
+                batch, future = pending.popleft()
+                splits = future.result()
+                submit()
+                yield from zip(batch, splits, strict=True)
+        except BrokenProcessPool:
+            # A worker died; the next document gets a fresh pool
+            _discard_chunk_pool(workers, pool)
+            raise
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _iter_spanning_chunks(
+        self,
+        pages: Iterable[dict[str, Any]],
+        document_id: str,
+        document_name: str,
+    ) -> Iterator[Chunk]:
+        """Chunks filled from consecutive pages, holding at most one chunk of text."""
+        chunk_index = 0
+        for window in self._windows(self._page_atoms(pages)):
+            content = "".join(text for text, _, _ in window).strip()
+            if not content:
+                continue
+            page_numbers = [number for text, number, _ in window if not text.isspace()]
+            page_number, page_end = page_numbers[0], page_numbers[-1]
+            yield Chunk(
+                content=content,
+                chunk_index=chunk_index,
+                page_number=page_number,
+                token_count=sum(tokens for _, _, tokens in window),
+                metadata={
+                    "document_id": document_id,
+                    "document_name": document_name,
+                    "chunk_index": chunk_index,
+                    "page_number": page_number,
+                },
+                page_end=page_end if page_end != page_number else None,
             )
+            chunk_index += 1
 
-            for chunk in page_chunks:
-                chunk.chunk_index = global_index
-                chunk.metadata["chunk_index"] = global_index
-                global_index += 1
+    def _page_atoms(self, pages: Iterable[dict[str, Any]]) -> Iterator[tuple[str, int | None, int]]:
+        """``(text, page_number, tokens)`` pieces of every page, in document order."""
+        started = False
+        for page, atoms in self._iter_page_splits(pages):
+            for position, (text, tokens) in enumerate(atoms):
+                if position == 0 and started:
+                    # The page break belongs to the page's first piece, like separators
+                    text, tokens = PAGE_BREAK + text, tokens + 1
+                started = True
+                yield text, page.get("page_number"), tokens
 
-            all_chunks.extend(page_chunks)
 
-        for chunk in all_chunks:
-            chunk.metadata["total_chunks"] = len(all_chunks)
+def _pieces(data: bytes, start: int, end: int, separator: bytes) -> Iterator[tuple[int, int]]:
+    """Non-empty spans between occurrences of ``separator``, each starting with it."""
+    piece_start = start
+    position = data.find(separator, start, end)
+    while position != -1:
+        if position > piece_start:
+            yield piece_start, position
+        piece_start = position
+        position = data.find(separator, position + len(separator), end)
+    if end > piece_start:
+        yield piece_start, end
 
-        return all_chunks
+
+def _separator(
+    data: bytes, start: int, end: int, separators: tuple[str, ...]
+) -> tuple[bytes, tuple[str, ...]]:
+    """The first separator found in ``data[start:end]``, and the finer ones after it."""
+    for i, candidate in enumerate(separators):
+        if data.find(candidate.encode(), start, end) != -1:
+            return candidate.encode(), separators[i + 1 :]
+    return separators[-1].encode(), ()
+
+
+def _strip(data: bytes, start: int, end: int) -> tuple[int, int]:
+    while start < end and data[start] in _WHITESPACE:
+        start += 1
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    return start, end
+
+
+# Chunking pools by worker count, shared by every chunker in the process
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_chunk_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        if workers not in _pools:
+            # spawn, not fork: the API and ingestion threads may hold locks at fork time
+            _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+            )
+        return _pools[workers]
+
+
+def shutdown_chunk_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def _discard_chunk_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_chunk_worker() -> None:
+    """Load the encoder and its token length table once per worker process."""
+    _token_byte_lengths(tiktoken.get_encoding("cl100k_base").name)
+
+
+def _split_pages(
+    texts: list[str], chunk_size: int, chunk_overlap: int, across_pages: bool
+) -> list[list[tuple[str, int]]]:
+    """``DocumentChunker.split_page`` of each text, run in a pool worker."""
+    chunker = DocumentChunker(chunk_size, chunk_overlap, across_pages, workers=1)
+    return [chunker.split_page(text) for text in texts]
+
+
+@lru_cache(maxsize=4)
+def _token_byte_lengths(encoding_name: str) -> list[int]:
+    """UTF-8 byte length of every token, indexed by token ID."""
+    encoding = tiktoken.get_encoding(encoding_name)
+    lengths = []
+    for token in range(encoding.max_token_value + 1):
+        try:
+            lengths.append(len(encoding.decode_single_token_bytes(token)))
+        except KeyError:
+            lengths.append(0)
+    return lengths
@@ -1,29 +1,199 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from app.config import settings
 from app.providers import get_embedding_provider
+from app.providers.base import BaseEmbeddingProvider
+from app.rag.embedding_cache import EmbeddingCache, QueryEmbeddingCache
 
 logger = logging.getLogger(__name__)
 
 
+def estimate_tokens(text: str) -> int:
+    # Rough cl100k ratio, used only when the caller has no real token counts
+    return len(text) // 4 + 1
+
+
 class DocumentEmbedder:
-    def __init__(self):
-        self.provider = get_embedding_provider()
+    def __init__(
+        self,
+        provider: BaseEmbeddingProvider | None = None,
+        batch_size: int | None = None,
+        batch_tokens: int | None = None,
+        concurrency: int | None = None,
+        max_retries: int | None = None,
+        retry_backoff: float | None = None,
+        cache: EmbeddingCache | None = None,
+        query_cache: QueryEmbeddingCache | None = None,
+    ):
+        self.provider = provider or get_embedding_provider()
+        self.cache = cache
+        self.query_cache = query_cache
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.batch_tokens = batch_tokens or settings.embedding_batch_tokens
+        self.concurrency = concurrency or settings.embedding_concurrency
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.embedding_max_retries
+        )
+        self.retry_backoff = (
+            retry_backoff if retry_backoff is not None else settings.embedding_retry_backoff
+        )
+
+    def plan_batches(self, token_counts: list[int]) -> list[tuple[int, int]]:
+        """Split inputs into contiguous [start, end) ranges bounded by items and tokens."""
+        batches: list[tuple[int, int]] = []
+        start = 0
+        batch_tokens = 0
+
+        for i, tokens in enumerate(token_counts):
+            full = i - start >= self.batch_size or batch_tokens + tokens > self.batch_tokens
+            if i > start and full:
+                batches.append((start, i))
+                start = i
+                batch_tokens = 0
+            batch_tokens += tokens
+
+        if start < len(token_counts):
+            batches.append((start, len(token_counts)))
+
+        return batches
 
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    def embed_texts(
+        self,
+        texts: list[str],
+        token_counts: list[int] | None = None,
+    ) -> list[list[float]]:
         if not texts:
             return []
 
-        batch_size = 100
-        all_embeddings: list[list[float]] = []
+        if token_counts is None:
+            token_counts = [estimate_tokens(text) for text in texts]
+
+        if self.cache is None:
+            return self._embed_uncached(texts, token_counts)
+
+        cached = self.cache.get_many(texts)
+        misses = [i for i in range(len(texts)) if i not in cached]
+        logger.info(f"Embedding cache: {len(cached)} hits, {len(misses)} misses")
+
+        if misses:
+            miss_texts = [texts[i] for i in misses]
+            fresh = self._embed_uncached(miss_texts, [token_counts[i] for i in misses])
+            self.cache.set_many(miss_texts, fresh)
+            cached.update(zip(misses, fresh, strict=True))
+
+        return [cached[i] for i in range(len(texts))]
+
+    def _embed_uncached(
+        self,
+        texts: list[str],
+        token_counts: list[int],
+    ) -> list[list[float]]:
+        batches = self.plan_batches(token_counts)
+        all_embeddings: list[list[float]] = [[] for _ in texts]
+
+        def run(batch: tuple[int, int]) -> None:
+            start, end = batch
+            all_embeddings[start:end] = self._embed_batch(texts[start:end])
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            embeddings = self.provider.embed(batch)
-            all_embeddings.extend(embeddings)
+        workers = min(self.concurrency, len(batches))
+        if workers <= 1:
+            for batch in batches:
+                run(batch)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # list() re-raises the first batch failure once retries are exhausted
+                list(pool.map(run, batches))
 
+        logger.info(
+            f"Embedded {len(texts)} texts in {len(batches)} batches "
+            f"(concurrency={workers})"
+        )
         return all_embeddings
 
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            try:
+                embeddings = self.provider.embed(batch)
+                if len(embeddings) != len(batch):
+                    raise ValueError(
+                        f"Embedding provider returned {len(embeddings)} vectors "
+                        f"for {len(batch)} texts"
+                    )
+                return embeddings
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * 2**attempt
+                attempt += 1
+                logger.warning(
+                    f"Embedding batch of {len(batch)} failed ({e}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
     def embed_query(self, query: str) -> list[float]:
-        embeddings = self.provider.embed([query])
-        return embeddings[0]
+        if self.query_cache is not None:
+            cached = self.query_cache.get(query)
+            if cached is not None:
+                return cached
+
+        embedding = self.provider.embed([query])[0]
+
+        if self.query_cache is not None:
+            self.query_cache.set(query, embedding)
+        return embedding
+
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Embed many queries with one provider call per ``batch_size`` uncached queries."""
+        vectors: dict[int, list[float]] = {}
+        if self.query_cache is not None:
+            for i, query in enumerate(queries):
+                cached = self.query_cache.get(query)
+                if cached is not None:
+                    vectors[i] = cached
+
+        misses = [i for i in range(len(queries)) if i not in vectors]
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start : start + self.batch_size]
+            embeddings = self._embed_batch([queries[i] for i in batch])
+            for i, embedding in zip(batch, embeddings, strict=True):
+                vectors[i] = embedding
+                if self.query_cache is not None:
+                    self.query_cache.set(queries[i], embedding)
+
+        return [vectors[i] for i in range(len(queries))]
+
+    async def aembed_queries(self, queries: list[str]) -> list[list[float]]:
+        vectors: dict[int, list[float]] = {}
+        if self.query_cache is not None:
+            for i, query in enumerate(queries):
+                cached = await self.query_cache.aget(query)
+                if cached is not None:
+                    vectors[i] = cached
+
+        misses = [i for i in range(len(queries)) if i not in vectors]
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start : start + self.batch_size]
+            embeddings = await self.provider.aembed([queries[i] for i in batch])
+            for i, embedding in zip(batch, embeddings, strict=True):
+                vectors[i] = embedding
+                if self.query_cache is not None:
+                    await self.query_cache.aset(queries[i], embedding)
+
+        logger.info(f"Embedded {len(misses)} of {len(queries)} queries, rest from cache")
+        return [vectors[i] for i in range(len(queries))]
+
+    async def aembed_query(self, query: str) -> list[float]:
+        if self.query_cache is not None:
+            cached = await self.query_cache.aget(query)
+            if cached is not None:
+                return cached
+
+        embedding = (await self.provider.aembed([query]))[0]
+
+        if self.query_cache is not None:
+            await self.query_cache.aset(query, embedding)
+        return embedding
@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from functools import lru_cache
+from typing import cast
+
+import redis
+
+from app.config import settings
+from app.rag.cache import CacheStats, LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_namespace() -> str:
+    """Identify the vector space: the same text embeds differently per provider/model/size."""
+    model = (
+        settings.ollama_embed_model
+        if settings.embedding_provider == "ollama"
+        else settings.embedding_model
+    )
+    return f"{settings.embedding_provider}:{model}:{settings.embedding_dimensions}"
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(data: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class EmbeddingCache(ABC):
+    """Content-addressed store of document embeddings, keyed by namespace + text hash."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_many(self, texts: list[str]) -> dict[int, list[float]]:
+        """Return cached vectors keyed by position in ``texts``."""
+        if not texts:
+            return {}
+
+        namespace = embedding_namespace()
+        keys = [f"{namespace}:{text_hash(text)}" for text in texts]
+        found = self._get_many(keys)
+
+        with self._lock:
+            self._hits += len(found)
+            self._misses += len(texts) - len(found)
+
+        return found
+
+    def set_many(self, texts: list[str], vectors: list[list[float]]) -> None:
+        if not texts:
+            return
+
+        namespace = embedding_namespace()
+        keys = [f"{namespace}:{text_hash(text)}" for text in texts]
+        self._set_many(keys, vectors)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._eviction_count(),
+                entries=self._size(),
+                max_entries=self.max_entries,
+            )
+
+    def _eviction_count(self) -> int:
+        return self._evictions
+
+    @abstractmethod
+    def _get_many(self, keys: list[str]) -> dict[int, list[float]]:
+        pass
+
+    @abstractmethod
+    def _set_many(self, keys: list[str], vectors: list[list[float]]) -> None:
+        pass
+
+    @abstractmethod
+    def _size(self) -> int:
+        pass
+
+
+class MemoryEmbeddingCache(EmbeddingCache):
+    def __init__(self, max_entries: int):
+        super().__init__(max_entries)
+        self._cache = LRUCache(max_entries=max_entries)
+
+    def _get_many(self, keys: list[str]) -> dict[int, list[float]]:
+        found = {}
+        for i, key in enumerate(keys):
+            data = self._cache.get(key)
+            if data is not None:
+                found[i] = _unpack(data)
+        return found
+
+    def _set_many(self, keys: list[str], vectors: list[list[float]]) -> None:
+        for key, vector in zip(keys, vectors, strict=True):
+            self._cache.set(key, _pack(vector))
+
+    def _size(self) -> int:
+        return len(self._cache)
+
+    def _eviction_count(self) -> int:
+        return self._cache.stats().evictions
+
+
+class RedisEmbeddingCache(EmbeddingCache):
+    """Shared cache for API and Celery processes.
+
+    Vectors are stored as packed float32 strings; a sorted set of last-use times
+    drives LRU eviction once ``max_entries`` is exceeded. Redis errors degrade to
+    cache misses so ingestion never fails because the cache is unavailable.
+    """
+
+    prefix = "documind:emb:"
+    lru_key = "documind:emb-lru"
+
+    def __init__(self, url: str, max_entries: int):
+        super().__init__(max_entries)
+        self.client = redis.from_url(url, socket_connect_timeout=1, socket_timeout=2)
+
+    def _get_many(self, keys: list[str]) -> dict[int, list[float]]:
+        full_keys = [self.prefix + key for key in keys]
+        try:
+            values = self.client.mget(full_keys)
+            hits = {k: time.time() for k, v in zip(full_keys, values, strict=True) if v}
+            if hits:
+                self.client.zadd(self.lru_key, hits)
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+
+        # The client is created without decode_responses, so values are raw bytes
+        return {i: _unpack(cast(bytes, value)) for i, value in enumerate(values) if value}
+
+    def _set_many(self, keys: list[str], vectors: list[list[float]]) -> None:
+        now = time.time()
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, vector in zip(keys, vectors, strict=True):
+                pipe.set(self.prefix + key, _pack(vector))
+            pipe.zadd(self.lru_key, {self.prefix + key: now for key in keys})
+            pipe.zcard(self.lru_key)
+            size = pipe.execute()[-1]
+
+            excess = size - self.max_entries
+            if excess > 0:
+                popped = cast(list[tuple[bytes, float]], self.client.zpopmin(self.lru_key, excess))
+                evicted = [key for key, _ in popped]
+                if evicted:
+                    self.client.delete(*evicted)
+                    with self._lock:
+                        self._evictions += len(evicted)
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache store failed: {e}")
+
+    def _size(self) -> int:
+        try:
+            return int(self.client.zcard(self.lru_key))
+        except redis.RedisError:
+            return 0
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache for question embeddings: in-process LRU, then optionally Redis."""
+
+    prefix = "documind:qemb:"
+
+    def __init__(self, max_entries: int, ttl_seconds: float, redis_url: str | None = None):
+        self.ttl_seconds = ttl_seconds
+        self.local = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.client = (
+            redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+            if redis_url
+            else None
+        )
+        self._lock = threading.Lock()
+        self._remote_hits = 0
+
+    def key(self, query: str) -> str:
+        return f"{embedding_namespace()}:{text_hash(normalize_query(query))}"
+
+    def get(self, query: str) -> list[float] | None:
+        key = self.key(query)
+        vector = self.local.get(key)
+        if vector is not None or self.client is None:
+            return vector
+
+        try:
+            data = self.client.get(self.prefix + key)
+        except redis.RedisError as e:
+            logger.warning(f"Query embedding cache lookup failed: {e}")
+            return None
+
+        if not data:
+            return None
+
+        with self._lock:
+            self._remote_hits += 1
+        vector = _unpack(cast(bytes, data))
+        self.local.set(key, vector)
+        return vector
+
+    def set(self, query: str, vector: list[float]) -> None:
+        key = self.key(query)
+        self.local.set(key, vector)
+        if self.client is None:
+            return
+
+        try:
+            self.client.set(self.prefix + key, _pack(vector), ex=int(self.ttl_seconds))
+        except redis.RedisError as e:
+            logger.warning(f"Query embedding cache store failed: {e}")
+
+    async def aget(self, query: str) -> list[float] | None:
+        # Only the Redis tier does I/O; keep pure in-process hits on the event loop
+        if self.client is None:
+            return self.local.get(self.key(query))
+        return await asyncio.to_thread(self.get, query)
+
+    async def aset(self, query: str, vector: list[float]) -> None:
+        if self.client is None:
+            self.local.set(self.key(query), vector)
+        else:
+            await asyncio.to_thread(self.set, query, vector)
+
+    def stats(self) -> CacheStats:
+        stats = self.local.stats()
+        with self._lock:
+            # A local miss answered by Redis still skipped the provider call
+            stats.hits += self._remote_hits
+            stats.misses -= self._remote_hits
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_query_embedding_cache() -> QueryEmbeddingCache | None:
+    if not settings.query_cache_enabled:
+        return None
+    return QueryEmbeddingCache(
+        max_entries=settings.query_cache_max_entries,
+        ttl_seconds=settings.query_cache_ttl_seconds,
+        redis_url=settings.redis_url if settings.query_cache_redis else None,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+    if settings.embedding_cache_backend == "redis":
+        return RedisEmbeddingCache(settings.redis_url, settings.embedding_cache_max_entries)
+    if settings.embedding_cache_backend == "memory":
+        return MemoryEmbeddingCache(settings.embedding_cache_max_entries)
+    return None
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Generator
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -26,6 +27,14 @@ class BaseExtractor(ABC):
     def extract(self, file_path: Path) -> ExtractionResult:
         pass
 
+    def iter_pages(self, file_path: Path) -> Generator[ExtractedPage, None, None]:
+        """Yield non-empty pages in order; formats read incrementally override this."""
+        yield from self.extract(file_path).pages
+
+    def count_pages(self, file_path: Path) -> int:
+        """Total pages without extracting any text."""
+        return 1
+
     def _clean_text(self, text: str) -> str:
         lines = text.split("\n")
         cleaned = []
@@ -1,34 +1,151 @@
+import multiprocessing
+import threading
+from collections import deque
+from collections.abc import Generator, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 import fitz
 
+from app.config import settings
 from app.rag.extractors.base import BaseExtractor, ExtractedPage, ExtractionResult
 
 
 class PDFExtractor(BaseExtractor):
-    def extract(self, file_path: Path) -> ExtractionResult:
-        doc = fitz.open(str(file_path))
-        pages = []
-
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text("text")
-            cleaned = self._clean_text(text)
-
-            if cleaned:
-                pages.append(
-                    ExtractedPage(
-                        page_number=page_num + 1,
-                        content=cleaned,
-                        metadata={"width": page.rect.width, "height": page.rect.height},
-                    )
-                )
-
-        total_pages = len(doc)
-        doc.close()
+    def __init__(self, workers: int | None = None, pages_per_task: int | None = None):
+        self.workers = workers if workers is not None else settings.pdf_extract_workers
+        self.pages_per_task = pages_per_task or settings.pdf_extract_pages_per_task
 
+    def extract(self, file_path: Path) -> ExtractionResult:
         return ExtractionResult(
-            pages=pages,
-            total_pages=total_pages,
+            pages=list(self.iter_pages(file_path)),
+            total_pages=self.count_pages(file_path),
             metadata={"format": "pdf"},
         )
+
+    def iter_pages(self, file_path: Path) -> Generator[ExtractedPage, None, None]:
+        total_pages = self.count_pages(file_path)
+        workers = self._pool_size(total_pages)
+        if workers > 1:
+            yield from self._iter_parallel(file_path, total_pages, workers)
+            return
+
+        # Only the page being parsed is held in memory
+        with fitz.open(str(file_path)) as doc:
+            for page_num, page in enumerate(doc):
+                extracted = self._extract_page(page, page_num)
+                if extracted:
+                    yield extracted
+
+    def count_pages(self, file_path: Path) -> int:
+        with fitz.open(str(file_path)) as doc:
+            return int(doc.page_count)
+
+    def _pool_size(self, total_pages: int) -> int:
+        # Daemonic processes (Celery prefork workers) may not start children
+        if self.workers <= 1 or multiprocessing.current_process().daemon:
+            return 1
+        return min(self.workers, -(-total_pages // self.pages_per_task))
+
+    def _iter_parallel(
+        self, file_path: Path, total_pages: int, workers: int
+    ) -> Iterator[ExtractedPage]:
+        """Extract page ranges in the shared pool, yielding pages in document order.
+
+        At most two ranges per worker are in flight, so finished ranges waiting on a
+        slower earlier one stay bounded.
+        """
+        pool = get_pdf_pool(workers)
+        # Identifies this version of the file to the documents cached in the workers
+        stat = file_path.stat()
+        source = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        ranges = iter(
+            (start, min(start + self.pages_per_task, total_pages))
+            for start in range(0, total_pages, self.pages_per_task)
+        )
+        pending: deque[Future[list[ExtractedPage]]] = deque()
+
+        def submit() -> None:
+            page_range = next(ranges, None)
+            if page_range is not None:
+                pending.append(pool.submit(_extract_range, source, *page_range))
+
+        try:
+            for _ in range(workers * 2):
+                submit()
+            while pending:
+                pages = pending.popleft().result()
+                submit()
+                yield from pages
+        except BrokenProcessPool:
+            # A worker died; the next document gets a fresh pool
+            _discard_pdf_pool(workers, pool)
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _extract_page(self, page: fitz.Page, page_num: int) -> ExtractedPage | None:
+        cleaned = self._clean_text(page.get_text("text"))
+        if not cleaned:
+            return None
+        return ExtractedPage(
+            page_number=page_num + 1,
+            content=cleaned,
+            metadata={"width": page.rect.width, "height": page.rect.height},
+        )
+
+
+# Extraction pools by worker count, shared by every extractor in the process
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pdf_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        if workers not in _pools:
+            # spawn, not fork: the API and ingestion threads may hold locks at fork time
+            _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pools[workers]
+
+
+def shutdown_pdf_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def _discard_pdf_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# The PDF a pool worker last extracted from, kept open for the document's next range
+_worker_source: tuple[str, int, int] | None = None
+_worker_doc: fitz.Document | None = None
+
+
+def _worker_document(source: tuple[str, int, int]) -> fitz.Document:
+    global _worker_source, _worker_doc
+    if _worker_source != source or _worker_doc is None:
+        if _worker_doc is not None:
+            _worker_doc.close()
+        _worker_doc = fitz.open(source[0])
+        _worker_source = source
+    return _worker_doc
+
+
+def _extract_range(source: tuple[str, int, int], start: int, end: int) -> list[ExtractedPage]:
+    """Pages ``[start, end)`` of the PDF at ``source[0]``, cleaned in a pool worker."""
+    extractor = PDFExtractor(workers=1)
+    doc = _worker_document(source)
+    pages = (extractor._extract_page(doc[n], n) for n in range(start, end))
+    return [page for page in pages if page]
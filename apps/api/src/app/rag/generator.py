@@ -1,8 +1,11 @@
 import logging
+from collections.abc import AsyncIterator, Iterator
 from dataclasses import dataclass
+from typing import Any
 
 from app.config import settings
 from app.providers import get_llm_provider
+from app.providers.base import BaseLLMProvider
 from app.rag.prompts import SYSTEM_PROMPT, build_qa_prompt
 from app.rag.retriever import RetrievedChunk
 
@@ -17,8 +20,8 @@ class GenerationResult:
 
 
 class AnswerGenerator:
-    def __init__(self):
-        self.provider = get_llm_provider()
+    def __init__(self, provider: BaseLLMProvider | None = None):
+        self.provider = provider or get_llm_provider()
 
     def generate(
         self,
@@ -26,31 +29,72 @@ class AnswerGenerator:
         chunks: list[RetrievedChunk],
         chat_history: list[dict] | None = None,
     ) -> GenerationResult:
+        prompt = self.build_prompt(question, chunks, chat_history)
+        return self.generate_from_prompt(prompt)
+
+    def build_prompt(
+        self,
+        question: str,
+        chunks: list[RetrievedChunk],
+        chat_history: list[dict[str, Any]] | None = None,
+    ) -> str:
         chunk_dicts = [
             {
                 "document_id": c.document_id,
                 "document_name": c.document_name,
                 "page_number": c.page_number,
+                "page_end": c.page_end,
+                "chunk_index": c.chunk_index,
                 "content": c.content,
+                "relevance_score": c.relevance_score,
             }
             for c in chunks
         ]
 
-        prompt = build_qa_prompt(
+        return build_qa_prompt(
             question=question,
             chunks=chunk_dicts,
             chat_history=chat_history or [],
         )
 
+    def generate_from_prompt(self, prompt: str) -> GenerationResult:
         response = self.provider.generate(
             system_prompt=SYSTEM_PROMPT,
             user_prompt=prompt,
             temperature=settings.llm_temperature,
             max_tokens=settings.llm_max_tokens,
         )
+        return self._to_result(response)
 
+    async def agenerate_from_prompt(self, prompt: str) -> GenerationResult:
+        response = await self.provider.agenerate(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=prompt,
+            temperature=settings.llm_temperature,
+            max_tokens=settings.llm_max_tokens,
+        )
+        return self._to_result(response)
+
+    @staticmethod
+    def _to_result(response: dict[str, Any]) -> GenerationResult:
         return GenerationResult(
             answer=response["content"],
             model_used=response.get("model", settings.llm_model),
             tokens_used=response.get("usage", {}),
         )
+
+    def stream_from_prompt(self, prompt: str) -> Iterator[dict[str, Any]]:
+        return self.provider.stream(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=prompt,
+            temperature=settings.llm_temperature,
+            max_tokens=settings.llm_max_tokens,
+        )
+
+    def astream_from_prompt(self, prompt: str) -> AsyncIterator[dict[str, Any]]:
+        return self.provider.astream(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=prompt,
+            temperature=settings.llm_temperature,
+            max_tokens=settings.llm_max_tokens,
+        )
@@ -0,0 +1,81 @@
+import logging
+import uuid
+from typing import Any
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.session import async_session_maker
+from app.models.chunk import DocumentChunk
+from app.models.document import Document
+
+logger = logging.getLogger(__name__)
+
+# Must match the expression of the idx_chunks_content_fts index exactly
+CHUNK_TSVECTOR = func.to_tsvector(literal_column("'english'::regconfig"), DocumentChunk.content)
+
+
+class LexicalSearcher:
+    """Keyword search over ``document_chunks`` using Postgres full-text search.
+
+    Catches exact identifiers, part numbers and error codes that dense embeddings
+    blur. Results use the same dict shape as ``VectorStore.search``. Other database
+    backends (SQLite in tests) and query errors return no results, leaving dense
+    retrieval on its own.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession] = async_session_maker):
+        self.session_maker = session_maker
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int,
+        document_filter: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        tsquery = func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+        score = func.ts_rank_cd(CHUNK_TSVECTOR, tsquery).label("score")
+        stmt = (
+            select(
+                DocumentChunk.id,
+                DocumentChunk.document_id,
+                Document.original_name,
+                DocumentChunk.chunk_index,
+                DocumentChunk.page_number,
+                DocumentChunk.page_end,
+                DocumentChunk.content,
+                score,
+            )
+            .join(Document, Document.id == DocumentChunk.document_id)
+            .where(CHUNK_TSVECTOR.op("@@")(tsquery))
+            .order_by(score.desc())
+            .limit(top_k)
+        )
+
+        try:
+            if document_filter:
+                stmt = stmt.where(
+                    DocumentChunk.document_id.in_([uuid.UUID(doc_id) for doc_id in document_filter])
+                )
+            async with self.session_maker() as session:
+                if session.get_bind().dialect.name != "postgresql":
+                    return []
+                rows = (await session.execute(stmt)).all()
+        except Exception as e:
+            logger.warning(f"Lexical search failed, using dense results only: {e}")
+            return []
+
+        logger.info(f"Lexical search returned {len(rows)} results")
+        return [
+            {
+                "id": str(row.id),
+                "score": float(row.score),
+                "document_id": str(row.document_id),
+                "document_name": row.original_name,
+                "chunk_index": row.chunk_index,
+                "page_number": row.page_number,
+                "page_end": row.page_end,
+                "content": row.content,
+            }
+            for row in rows
+        ]
@@ -1,26 +1,84 @@
+import asyncio
 import hashlib
 import logging
+import time
 import uuid
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Generator, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 from app.config import settings
 from app.db.vector_store import VectorStore
-from app.rag.chunker import DocumentChunker
+from app.rag.answer_cache import AnswerCache, get_answer_cache
+from app.rag.chunker import Chunk, DocumentChunker
 from app.rag.embedder import DocumentEmbedder
+from app.rag.embedding_cache import get_embedding_cache, get_query_embedding_cache
 from app.rag.extractors import get_extractor
-from app.rag.generator import AnswerGenerator
-from app.rag.retriever import DocumentRetriever
+from app.rag.extractors.base import ExtractedPage
+from app.rag.generator import AnswerGenerator, GenerationResult
+from app.rag.lexical import LexicalSearcher
+from app.rag.reranker import RerankStage, build_reranker
+from app.rag.retriever import DocumentRetriever, RetrievalOptions, RetrievedChunk
+from app.rag.streaming import batched, prefetch
+from app.rag.windows import ChunkWindowExpander, get_chunk_text_cache, invalidate_chunk_text
 
 logger = logging.getLogger(__name__)
 
+# Namespace of chunk point IDs; changing it orphans every stored vector
+_POINT_ID_NAMESPACE = uuid.UUID("b4cd7c64-ea02-4462-b221-8c5023c391ee")
+
+# Payload fields of a point that can change while the chunk's text stays the same
+_POSITION_FIELDS = ("document_name", "chunk_index", "page_number", "page_end")
+
+
+def chunk_point_id(document_id: str, content: str, occurrence: int = 0) -> str:
+    """Qdrant point ID of a chunk, stable for as long as its text is unchanged.
+
+    ``occurrence`` numbers repeats of the same text within a document (running
+    headers, boilerplate clauses) so that each keeps its own point.
+    """
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    suffix = f":{occurrence}" if occurrence else ""
+    return str(uuid.uuid5(_POINT_ID_NAMESPACE, f"{document_id}:{digest}{suffix}"))
+
+
+@dataclass
+class IngestedBatch:
+    """Chunks of a document whose vectors are stored, as ``document_chunks`` rows."""
+
+    rows: list[dict[str, Any]]
+    pages_done: int
+    total_pages: int
+    # Rows that needed a new embedding; the others were already in the vector store
+    embedded: int = 0
+
 
 class RAGPipeline:
-    def __init__(self, vector_store: VectorStore):
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        chunker: DocumentChunker | None = None,
+        embedder: DocumentEmbedder | None = None,
+        generator: AnswerGenerator | None = None,
+        reranker: RerankStage | None = None,
+    ):
         self.vector_store = vector_store
-        self.chunker = DocumentChunker()
-        self.embedder = DocumentEmbedder()
-        self.retriever = DocumentRetriever(vector_store, self.embedder)
-        self.generator = AnswerGenerator()
+        self.chunker = chunker or DocumentChunker()
+        self.embedder = embedder or DocumentEmbedder(
+            cache=get_embedding_cache(),
+            query_cache=get_query_embedding_cache(),
+        )
+        self.retriever = DocumentRetriever(
+            vector_store,
+            self.embedder,
+            LexicalSearcher(),
+            reranker=reranker or build_reranker(),
+            expander=ChunkWindowExpander(cache=get_chunk_text_cache()),
+        )
+        self.generator = generator or AnswerGenerator()
+        self.answer_cache = get_answer_cache()
 
     def ingest_document(
         self,
@@ -28,110 +86,536 @@ class RAGPipeline:
         file_type: str,
         document_id: str,
         document_name: str,
+        store_batch: Callable[[IngestedBatch], None] | None = None,
     ) -> dict:
+        """Stream a document into the vector store one batch of chunks at a time.
+
+        ``store_batch`` receives each batch once its vectors are searchable, to persist
+        the chunk rows. Memory is bounded by ``INGEST_BATCH_SIZE`` and
+        ``INGEST_QUEUE_BATCHES``, not by document size. On failure the vectors upserted
+        by this run are removed again and the error is re-raised.
+
+        With ``INGEST_INCREMENTAL`` a re-ingested document is diffed against its stored
+        points: only chunks with new text are embedded and upserted, moved ones get
+        their payload updated and chunks that no longer exist are deleted at the end.
+        Each row carries its chunk's point ID as ``id``, so callers can diff
+        ``document_chunks`` the same way.
+        """
+        upserted: list[str] = []
+        total_pages, batches = self._start_ingest(
+            file_path, file_type, document_id, document_name, upserted
+        )
+        chunk_count = embedded = 0
+        try:
+            for batch in batches:
+                if store_batch is not None:
+                    store_batch(batch)
+                chunk_count += len(batch.rows)
+                embedded += batch.embedded
+        except Exception:
+            self._discard_points(document_id, upserted)
+            raise
+        finally:
+            batches.close()
+
+        return self._finish_ingest(document_id, document_name, chunk_count, embedded, total_pages)
+
+    async def aingest_document(
+        self,
+        file_path: Path,
+        file_type: str,
+        document_id: str,
+        document_name: str,
+        store_batch: Callable[[IngestedBatch], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
+        """``ingest_document`` for the event loop: extraction, embedding and upserts run
+        in worker threads, ``store_batch`` is awaited between batches."""
+        upserted: list[str] = []
+        total_pages, batches = await asyncio.to_thread(
+            self._start_ingest, file_path, file_type, document_id, document_name, upserted
+        )
+        chunk_count = embedded = 0
+        try:
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                if store_batch is not None:
+                    await store_batch(batch)
+                chunk_count += len(batch.rows)
+                embedded += batch.embedded
+        except Exception:
+            await asyncio.to_thread(self._discard_points, document_id, upserted)
+            raise
+        finally:
+            # Closing may join the prefetch producer thread; keep that off the loop
+            await asyncio.to_thread(batches.close)
+
+        return self._finish_ingest(document_id, document_name, chunk_count, embedded, total_pages)
+
+    def _start_ingest(
+        self,
+        file_path: Path,
+        file_type: str,
+        document_id: str,
+        document_name: str,
+        upserted: list[str],
+    ) -> tuple[int, Generator[IngestedBatch, None, None]]:
         logger.info(f"Starting ingestion for {document_name} ({file_type})")
 
+        self._invalidate_document(document_id)
+        if settings.ingest_incremental:
+            # The previous version's points; those whose text is unchanged are kept
+            stored = self._stored_points(document_id)
+        else:
+            # Vectors left behind by an earlier, interrupted run of this document
+            self._discard_vectors(document_id)
+            stored = {}
+
         extractor = get_extractor(file_type)
-        result = extractor.extract(file_path)
+        total_pages = extractor.count_pages(file_path)
+        extracted = extractor.iter_pages(file_path)
+        pages = (
+            {"content": page.content, "page_number": page.page_number} for page in extracted
+        )
+        chunks = self.chunker.iter_chunks(pages, document_id, document_name)
+        # Extraction and chunking run ahead on their own thread, at most
+        # INGEST_QUEUE_BATCHES batches in front of embedding and storage
+        chunk_batches = prefetch(
+            batched(chunks, settings.ingest_batch_size), settings.ingest_queue_batches
+        )
+        return total_pages, self._ingest_batches(
+            chunk_batches, extracted, document_id, document_name, total_pages, stored, upserted
+        )
 
-        logger.info(f"Extracted {result.total_pages} pages from {document_name}")
+    def _ingest_batches(
+        self,
+        chunk_batches: Generator[list[Chunk], None, None],
+        extracted: Generator[ExtractedPage, None, None],
+        document_id: str,
+        document_name: str,
+        total_pages: int,
+        stored: dict[str, dict[str, Any]],
+        upserted: list[str],
+    ) -> Generator[IngestedBatch, None, None]:
+        """Embed and store each batch of chunks, recording new point IDs in ``upserted``."""
+        occurrences: Counter[str] = Counter()
+        try:
+            for chunks in chunk_batches:
+                point_ids: list[str] = []
+                fresh: list[tuple[str, Chunk, dict[str, Any]]] = []
+                moved: dict[str, dict[str, Any]] = {}
+                for chunk in chunks:
+                    point_id = chunk_point_id(document_id, chunk.content)
+                    # Counted by ID rather than text, so memory stays small per chunk
+                    occurrences[point_id] += 1
+                    if occurrences[point_id] > 1:
+                        point_id = chunk_point_id(
+                            document_id, chunk.content, occurrences[point_id] - 1
+                        )
+                    point_ids.append(point_id)
+                    payload = {
+                        "document_id": document_id,
+                        "document_name": document_name,
+                        "chunk_index": chunk.chunk_index,
+                        "page_number": chunk.page_number,
+                        "page_end": chunk.page_end,
+                        "content": chunk.content,
+                    }
+                    previous = stored.pop(point_id, None)
+                    if previous is None:
+                        fresh.append((point_id, chunk, payload))
+                    elif any(previous.get(f) != payload[f] for f in _POSITION_FIELDS):
+                        moved[point_id] = {f: payload[f] for f in _POSITION_FIELDS}
 
-        pages = [
-            {"content": page.content, "page_number": page.page_number}
-            for page in result.pages
-        ]
-        chunks = self.chunker.chunk_pages(
-            pages=pages,
-            document_id=document_id,
-            document_name=document_name,
-        )
+                if fresh:
+                    embeddings = self.embedder.embed_texts(
+                        [chunk.content for _, chunk, _ in fresh],
+                        token_counts=[chunk.token_count for _, chunk, _ in fresh],
+                    )
+                    ids = [point_id for point_id, _, _ in fresh]
+                    # Recorded first: a failed upsert may still have written some points
+                    upserted.extend(ids)
+                    self.vector_store.upsert_vectors(
+                        ids=ids,
+                        vectors=embeddings,
+                        payloads=[payload for _, _, payload in fresh],
+                    )
+                self.vector_store.set_payloads(moved)
+                logger.info(
+                    f"Stored chunks {chunks[0].chunk_index}-{chunks[-1].chunk_index} "
+                    f"of {document_name} ({len(fresh)} embedded, "
+                    f"{len(chunks) - len(fresh)} unchanged)"
+                )
+                yield IngestedBatch(
+                    rows=[
+                        {
+                            "id": uuid.UUID(point_id),
+                            "content": c.content,
+                            "chunk_index": c.chunk_index,
+                            "page_number": c.page_number,
+                            "page_end": c.page_end,
+                            "token_count": c.token_count,
+                            "metadata": c.metadata,
+                        }
+                        for point_id, c in zip(point_ids, chunks, strict=True)
+                    ],
+                    pages_done=chunks[-1].page_end or chunks[-1].page_number or total_pages,
+                    total_pages=total_pages,
+                    embedded=len(fresh),
+                )
 
-        logger.info(f"Created {len(chunks)} chunks for {document_name}")
+            # Chunks of the previous version that the new one no longer has
+            self.vector_store.delete_points(list(stored))
+        finally:
+            # Stops the extraction thread first, then releases the open file
+            chunk_batches.close()
+            extracted.close()
 
-        texts = [chunk.content for chunk in chunks]
-        embeddings = self.embedder.embed_texts(texts)
+    def _finish_ingest(
+        self,
+        document_id: str,
+        document_name: str,
+        chunk_count: int,
+        embedded: int,
+        total_pages: int,
+    ) -> dict[str, Any]:
+        logger.info(
+            f"Ingested {document_name}: {chunk_count} chunks ({embedded} embedded) "
+            f"from {total_pages} pages"
+        )
 
-        logger.info(f"Generated {len(embeddings)} embeddings for {document_name}")
+        # Answers cached while the old vectors were still searchable are stale now too
+        self._invalidate_document(document_id)
 
-        ids = [str(uuid.uuid4()) for _ in chunks]
-        payloads = [
-            {
-                "document_id": document_id,
-                "document_name": document_name,
-                "chunk_index": chunk.chunk_index,
-                "page_number": chunk.page_number,
-                "content": chunk.content,
-            }
-            for chunk in chunks
-        ]
+        return {"chunk_count": chunk_count, "page_count": total_pages, "embedded_count": embedded}
 
-        self.vector_store.upsert_vectors(ids=ids, vectors=embeddings, payloads=payloads)
+    def _stored_points(self, document_id: str) -> dict[str, dict[str, Any]]:
+        try:
+            return self.vector_store.document_points(document_id, list(_POSITION_FIELDS))
+        except Exception as e:
+            logger.warning(f"Failed to list vectors of document {document_id}, re-embedding: {e}")
+            self._discard_vectors(document_id)
+            return {}
 
-        logger.info(f"Stored {len(chunks)} vectors for {document_name}")
+    def _discard_points(self, document_id: str, point_ids: list[str]) -> None:
+        try:
+            self.vector_store.delete_points(point_ids)
+        except Exception as e:
+            logger.warning(f"Failed to delete new vectors for document {document_id}: {e}")
 
-        return {
-            "chunk_count": len(chunks),
-            "page_count": result.total_pages,
-            "chunks": [
-                {
-                    "content": c.content,
-                    "chunk_index": c.chunk_index,
-                    "page_number": c.page_number,
-                    "token_count": c.token_count,
-                    "metadata": c.metadata,
-                }
-                for c in chunks
-            ],
-        }
+    def _discard_vectors(self, document_id: str) -> None:
+        try:
+            self.vector_store.delete_by_document(document_id)
+        except Exception as e:
+            logger.warning(f"Failed to delete vectors for document {document_id}: {e}")
 
     def query(
         self,
         question: str,
         chat_history: list[dict] | None = None,
-        top_k: int | None = None,
-        score_threshold: float | None = None,
-        document_filter: list[str] | None = None,
+        options: RetrievalOptions | None = None,
     ) -> dict:
-        chunks = self.retriever.retrieve(
-            query=question,
-            top_k=top_k,
-            score_threshold=score_threshold,
-            document_filter=document_filter,
-        )
+        plan = self._plan_query(question, chat_history, options)
+        if plan.response is not None:
+            return plan.response
 
-        if not chunks:
-            return {
-                "answer": "I don't have enough information in the uploaded "
-                "documents to answer this.",
-                "sources": [],
-                "model_used": settings.llm_model,
-                "tokens_used": {"prompt": 0, "completion": 0, "total": 0},
-            }
+        start = time.perf_counter()
+        result = self.generator.generate_from_prompt(plan.prompt)
+        plan.timings["generate"] = (time.perf_counter() - start) * 1000
+        return self._finish_query(plan, result)
 
-        result = self.generator.generate(
-            question=question,
-            chunks=chunks,
-            chat_history=chat_history,
+    async def aquery(
+        self,
+        question: str,
+        chat_history: list[dict[str, Any]] | None = None,
+        options: RetrievalOptions | None = None,
+    ) -> dict[str, Any]:
+        """Non-blocking ``query`` for the API; the sync path stays for Celery and scripts."""
+        plan = await self._aplan_query(question, chat_history, options)
+        if plan.response is not None:
+            return plan.response
+
+        start = time.perf_counter()
+        result = await self.generator.agenerate_from_prompt(plan.prompt)
+        plan.timings["generate"] = (time.perf_counter() - start) * 1000
+        return await asyncio.to_thread(self._finish_query, plan, result)
+
+    def stream_query(
+        self,
+        question: str,
+        chat_history: list[dict[str, Any]] | None = None,
+        options: RetrievalOptions | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield ``sources`` and ``chunk`` events as the answer is generated, then ``done``."""
+        plan = self._plan_query(question, chat_history, options)
+        if plan.response is not None:
+            yield from self._cached_events(plan.response)
+            return
+
+        yield {"type": "sources", "sources": plan.sources}
+
+        accumulator = _StreamAccumulator()
+        start = time.perf_counter()
+        for chunk in self.generator.stream_from_prompt(plan.prompt):
+            delta = accumulator.add(chunk)
+            if delta:
+                yield delta
+        plan.timings["generate"] = (time.perf_counter() - start) * 1000
+
+        yield {"type": "done", **self._finish_query(plan, accumulator.result())}
+
+    async def astream_query(
+        self,
+        question: str,
+        chat_history: list[dict[str, Any]] | None = None,
+        options: RetrievalOptions | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        plan = await self._aplan_query(question, chat_history, options)
+        if plan.response is not None:
+            for event in self._cached_events(plan.response):
+                yield event
+            return
+
+        yield {"type": "sources", "sources": plan.sources}
+
+        accumulator = _StreamAccumulator()
+        start = time.perf_counter()
+        async for chunk in self.generator.astream_from_prompt(plan.prompt):
+            delta = accumulator.add(chunk)
+            if delta:
+                yield delta
+        plan.timings["generate"] = (time.perf_counter() - start) * 1000
+
+        response = await asyncio.to_thread(self._finish_query, plan, accumulator.result())
+        yield {"type": "done", **response}
+
+    async def aquery_many(
+        self,
+        questions: list[str],
+        options: RetrievalOptions | None = None,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+        """Answer independent questions, yielding ``(index, response)`` as each finishes.
+
+        Retrieval for the whole batch shares one embedding batch and one Qdrant batch
+        request; at most ``concurrency`` generations run at once. A question whose
+        generation fails yields ``{"error": ...}`` instead of ending the batch.
+        """
+        options = (options or RetrievalOptions()).resolve()
+        scope = AnswerCache.scope(options.as_dict())
+        query_vectors = await self.embedder.aembed_queries(questions)
+
+        def find_cached() -> dict[int, _QueryPlan]:
+            plans = {}
+            for i, (question, vector) in enumerate(zip(questions, query_vectors, strict=True)):
+                plan = self._find_similar_answer(question, None, vector, scope)
+                if plan is not None:
+                    plans[i] = plan
+            return plans
+
+        plans = await asyncio.to_thread(find_cached)
+        pending = [i for i in range(len(questions)) if i not in plans]
+        chunk_lists = await self.retriever.aretrieve_many(
+            [questions[i] for i in pending], options, [query_vectors[i] for i in pending]
         )
 
-        sources = [
+        def plan_generations() -> None:
+            for i, chunks in zip(pending, chunk_lists, strict=True):
+                plans[i] = self._plan_generation(
+                    questions[i], None, chunks, query_vectors[i], scope
+                )
+
+        await asyncio.to_thread(plan_generations)
+        semaphore = asyncio.Semaphore(concurrency or settings.rag_batch_concurrency)
+
+        async def answer(i: int) -> tuple[int, dict[str, Any]]:
+            plan = plans[i]
+            if plan.response is not None:
+                return i, plan.response
+            try:
+                async with semaphore:
+                    result = await self.generator.agenerate_from_prompt(plan.prompt)
+                return i, await asyncio.to_thread(self._finish_query, plan, result)
+            except Exception as e:
+                logger.error(f"Batch question {i} failed: {e}")
+                return i, {"error": str(e)}
+
+        tasks = [asyncio.ensure_future(answer(i)) for i in range(len(questions))]
+        try:
+            for next_answer in asyncio.as_completed(tasks):
+                yield await next_answer
+        finally:
+            # A consumer that stops early (client disconnect) shouldn't leave generations running
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def sources(chunks: list[RetrievedChunk]) -> list[dict[str, Any]]:
+        return [
             {
                 "document_id": c.document_id,
                 "document_name": c.document_name,
                 "page_number": c.page_number,
+                "page_end": c.page_end,
                 "chunk_text": c.content[:300],
                 "relevance_score": c.relevance_score,
             }
             for c in chunks
         ]
 
-        return {
+    @staticmethod
+    def _cached_events(response: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        yield {"type": "sources", "sources": response["sources"]}
+        yield {"type": "chunk", "content": response["answer"]}
+        yield {"type": "done", **response}
+
+    def _plan_query(
+        self,
+        question: str,
+        chat_history: list[dict[str, Any]] | None,
+        options: RetrievalOptions | None,
+    ) -> "_QueryPlan":
+        options = (options or RetrievalOptions()).resolve()
+        scope = AnswerCache.scope(options.as_dict())
+        timings: dict[str, float] = {}
+        start = time.perf_counter()
+        query_vector = self.embedder.embed_query(question)
+        timings["embed"] = (time.perf_counter() - start) * 1000
+
+        plan = self._find_similar_answer(question, chat_history, query_vector, scope)
+        if plan is not None:
+            return plan
+
+        chunks = self.retriever.retrieve(question, options, query_vector, timings)
+        plan = self._plan_generation(question, chat_history, chunks, query_vector, scope)
+        plan.timings.update(timings)
+        return plan
+
+    async def _aplan_query(
+        self,
+        question: str,
+        chat_history: list[dict[str, Any]] | None,
+        options: RetrievalOptions | None,
+    ) -> "_QueryPlan":
+        options = (options or RetrievalOptions()).resolve()
+        scope = AnswerCache.scope(options.as_dict())
+        timings: dict[str, float] = {}
+        start = time.perf_counter()
+        query_vector = await self.embedder.aembed_query(question)
+        timings["embed"] = (time.perf_counter() - start) * 1000
+
+        # Cache lookups and prompt building touch Redis and tokenizers; keep them off the loop
+        plan = await asyncio.to_thread(
+            self._find_similar_answer, question, chat_history, query_vector, scope
+        )
+        if plan is not None:
+            return plan
+
+        chunks = await self.retriever.aretrieve(question, options, query_vector, timings)
+        plan = await asyncio.to_thread(
+            self._plan_generation, question, chat_history, chunks, query_vector, scope
+        )
+        plan.timings.update(timings)
+        return plan
+
+    def _find_similar_answer(
+        self,
+        question: str,
+        chat_history: list[dict[str, Any]] | None,
+        query_vector: list[float],
+        scope: str,
+    ) -> "_QueryPlan | None":
+        # Near-duplicate matching ignores history, so only use it for opening questions
+        if not self.answer_cache or not self.answer_cache.similarity_enabled:
+            return None
+        if self._has_prior_turns(question, chat_history):
+            return None
+
+        cached = self.answer_cache.find_similar(query_vector, scope)
+        if not cached:
+            return None
+
+        logger.info(f"Answer cache hit (similar question): {question[:50]}...")
+        return _QueryPlan(response={**cached, "cached": True})
+
+    def _plan_generation(
+        self,
+        question: str,
+        chat_history: list[dict[str, Any]] | None,
+        chunks: list[RetrievedChunk],
+        query_vector: list[float],
+        scope: str,
+    ) -> "_QueryPlan":
+        if not chunks:
+            return _QueryPlan(
+                response={
+                    "answer": "I don't have enough information in the uploaded "
+                    "documents to answer this.",
+                    "sources": [],
+                    "model_used": settings.llm_model,
+                    "tokens_used": {"prompt": 0, "completion": 0, "total": 0},
+                    "cached": False,
+                }
+            )
+
+        prompt = self.generator.build_prompt(
+            question=question,
+            chunks=chunks,
+            chat_history=chat_history,
+        )
+
+        cache_key = AnswerCache.key([c.chunk_id for c in chunks], prompt)
+        if self.answer_cache:
+            cached = self.answer_cache.get(cache_key)
+            if cached:
+                logger.info(f"Answer cache hit (same context): {question[:50]}...")
+                return _QueryPlan(response={**cached, "cached": True})
+
+        sources = self.sources(chunks)
+
+        opening_question = not self._has_prior_turns(question, chat_history)
+        return _QueryPlan(
+            prompt=prompt,
+            sources=sources,
+            cache_key=cache_key,
+            scope=scope,
+            document_ids={c.document_id for c in chunks},
+            query_vector=query_vector if opening_question else None,
+        )
+
+    def _finish_query(self, plan: "_QueryPlan", result: GenerationResult) -> dict[str, Any]:
+        logger.info(
+            "Query stage timings: "
+            + ", ".join(f"{stage}={ms:.1f}ms" for stage, ms in plan.timings.items())
+        )
+        response = {
             "answer": result.answer,
-            "sources": sources,
+            "sources": plan.sources,
             "model_used": result.model_used,
             "tokens_used": result.tokens_used,
         }
 
+        if self.answer_cache:
+            self.answer_cache.put(
+                plan.cache_key,
+                response,
+                document_ids=plan.document_ids,
+                scope=plan.scope,
+                query_vector=plan.query_vector,
+            )
+
+        return {**response, "cached": False}
+
+    def _invalidate_document(self, document_id: str) -> None:
+        if self.answer_cache:
+            self.answer_cache.invalidate_document(document_id)
+        invalidate_chunk_text(document_id)
+
+    @staticmethod
+    def _has_prior_turns(question: str, chat_history: list[dict[str, Any]] | None) -> bool:
+        history = list(chat_history or [])
+        if history and history[-1]["role"] == "user" and history[-1]["content"] == question:
+            history.pop()
+        return bool(history)
+
     @staticmethod
     def compute_file_hash(file_path: Path) -> str:
         sha256 = hashlib.sha256()
@@ -139,3 +623,41 @@ class RAGPipeline:
             for block in iter(lambda: f.read(8192), b""):
                 sha256.update(block)
         return sha256.hexdigest()
+
+
+@dataclass
+class _QueryPlan:
+    """Outcome of the retrieval half of a query: a finished response or a prompt to run."""
+
+    response: dict[str, Any] | None = None
+    prompt: str = ""
+    sources: list[dict[str, Any]] = field(default_factory=list)
+    cache_key: str = ""
+    scope: str = ""
+    document_ids: set[str] = field(default_factory=set)
+    query_vector: list[float] | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+class _StreamAccumulator:
+    """Collects provider stream chunks into the final ``GenerationResult``."""
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self.model_used = settings.llm_model
+        self.tokens_used: dict[str, Any] = {}
+
+    def add(self, chunk: dict[str, Any]) -> dict[str, Any] | None:
+        self.model_used = chunk.get("model", self.model_used)
+        self.tokens_used = chunk.get("usage", self.tokens_used)
+        if not chunk.get("content"):
+            return None
+        self.parts.append(chunk["content"])
+        return {"type": "chunk", "content": chunk["content"]}
+
+    def result(self) -> GenerationResult:
+        return GenerationResult(
+            answer="".join(self.parts),
+            model_used=self.model_used,
+            tokens_used=self.tokens_used,
+        )
@@ -1,3 +1,11 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import tiktoken
+
+from app.config import settings
+
 SYSTEM_PROMPT = """You are DocuMind, a document Q&A assistant. Answer questions based ONLY on
 the provided context. If the answer is not in the context, say
 "I don't have enough information in the uploaded documents to answer this."
@@ -21,30 +29,218 @@ QA_PROMPT_TEMPLATE = """## Context
 - If unsure, say so — never fabricate information"""
 
 
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+HISTORY_MAX_MESSAGES = 10
+# Per-message cap, about the 500 characters history used to be cut to
+HISTORY_MESSAGE_TOKENS = 150
+# Prefix of a chunk searched for in its predecessor when detecting chunker overlap
+OVERLAP_PROBE_CHARS = 32
+# Shorter matches are more likely coincidence than overlap
+OVERLAP_MIN_CHARS = 8
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> tiktoken.Encoding:
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    tokens = get_encoding().encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return get_encoding().decode(tokens[: max(max_tokens, 0)])
+
+
+def find_overlap(previous: str, following: str) -> int:
+    """Length of the longest suffix of ``previous`` that ``following`` starts with."""
+    if not previous or not following:
+        return 0
+    probe = following[:OVERLAP_PROBE_CHARS]
+    start = previous.find(probe, max(0, len(previous) - len(following)))
+    while start != -1:
+        if following.startswith(previous[start:]):
+            return len(previous) - start
+        start = previous.find(probe, start + 1)
+
+    for length in range(min(len(probe) - 1, len(previous)), OVERLAP_MIN_CHARS - 1, -1):
+        if previous.endswith(following[:length]):
+            return length
+    return 0
+
+
+@dataclass
+class _Passage:
+    """Consecutive chunks of one document merged into a single context entry."""
+
+    document_id: str
+    document_name: str
+    first_index: int | None
+    last_index: int | None
+    first_page: int | None
+    last_page: int | None
+    content: str
+    rank: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "document_id": self.document_id,
+            "document_name": self.document_name,
+            "page_number": self.first_page,
+            "page_end": self.last_page if self.last_page != self.first_page else None,
+            "content": self.content,
+        }
+
+
+def _source_header(document_name: str, page_number: int | None, page_end: int | None) -> str:
+    source = f"[Source: {document_name}"
+    if page_number and page_end:
+        source += f", pages {page_number}-{page_end}"
+    elif page_number:
+        source += f", page {page_number}"
+    return source + "]"
+
+
+def pack_context(chunks: list[dict[str, Any]], budget_tokens: int) -> list[dict[str, Any]]:
+    """Fit retrieved chunks into ``budget_tokens`` of context, best first.
+
+    ``chunks`` are ordered best first (or carry ``relevance_score``). Chunks repeating
+    text already selected are skipped, the overlap between consecutive chunks of a
+    document is counted once, and once the budget is spent every lower-scoring chunk
+    is dropped. Consecutive survivors are merged into one passage under one header.
+    """
+    order = sorted(
+        range(len(chunks)),
+        key=lambda i: chunks[i].get("relevance_score", 0.0),
+        reverse=True,
+    )
+    separator_tokens = count_tokens(CONTEXT_SEPARATOR)
+    selected: dict[tuple[str, int | None], tuple[int, dict[str, Any]]] = {}
+    used = 0
+
+    for rank, i in enumerate(order):
+        chunk = chunks[i]
+        doc_id, index = chunk["document_id"], chunk.get("chunk_index")
+        if (doc_id, index) in selected and index is not None:
+            continue
+        if any(
+            chunk["content"] in other["content"]
+            for (other_doc, _), (_, other) in selected.items()
+            if other_doc == doc_id
+        ):
+            continue
+
+        header = _source_header(
+            chunk["document_name"], chunk.get("page_number"), chunk.get("page_end")
+        )
+        cost = count_tokens(chunk["content"]) + count_tokens(header) + separator_tokens
+        if index is not None:
+            for neighbour in (index - 1, index + 1):
+                if (doc_id, neighbour) not in selected:
+                    continue
+                # Merging into the neighbour saves a header and the shared text
+                other = selected[(doc_id, neighbour)][1]["content"]
+                if neighbour < index:
+                    first, second = other, chunk["content"]
+                else:
+                    first, second = chunk["content"], other
+                overlap = find_overlap(first, second)
+                cost -= count_tokens(second[:overlap]) + count_tokens(header) + separator_tokens
+
+        if used + cost > budget_tokens:
+            if not selected and budget_tokens > 0:
+                # Never send an empty context when even the best chunk is too large
+                overhead = cost - count_tokens(chunk["content"])
+                content = truncate_tokens(chunk["content"], budget_tokens - overhead)
+                selected[(doc_id, index)] = (rank, {**chunk, "content": content})
+            break
+
+        selected[(doc_id, index)] = (rank, chunk)
+        used += cost
+
+    return [passage.as_dict() for passage in _merge(selected)]
+
+
+def _merge(selected: dict[tuple[str, int | None], tuple[int, dict[str, Any]]]) -> list[_Passage]:
+    passages: list[_Passage] = []
+    ordered = sorted(
+        selected.items(),
+        key=lambda item: (item[0][0], item[0][1] is None, item[0][1] or 0),
+    )
+
+    for (doc_id, index), (rank, chunk) in ordered:
+        last = passages[-1] if passages else None
+        if (
+            last is not None
+            and index is not None
+            and last.document_id == doc_id
+            and last.last_index == index - 1
+        ):
+            overlap = find_overlap(last.content, chunk["content"])
+            joiner = "" if overlap else "\n"
+            last.content += joiner + chunk["content"][overlap:]
+            last.last_index = index
+            last.last_page = chunk.get("page_end") or chunk.get("page_number") or last.last_page
+            last.rank = min(last.rank, rank)
+            continue
+
+        passages.append(
+            _Passage(
+                document_id=doc_id,
+                document_name=chunk["document_name"],
+                first_index=index,
+                last_index=index,
+                first_page=chunk.get("page_number"),
+                last_page=chunk.get("page_end") or chunk.get("page_number"),
+                content=chunk["content"],
+                rank=rank,
+            )
+        )
+
+    passages.sort(key=lambda p: p.rank)
+    return passages
+
+
 def build_context(chunks: list[dict]) -> str:
     context_parts = []
     for chunk in chunks:
-        source = f"[Source: {chunk['document_name']}"
-        if chunk.get("page_number"):
-            source += f", page {chunk['page_number']}"
-        source += "]"
-
+        source = _source_header(
+            chunk["document_name"], chunk.get("page_number"), chunk.get("page_end")
+        )
         context_parts.append(f"{source}\n{chunk['content']}")
 
-    return "\n\n---\n\n".join(context_parts)
+    return CONTEXT_SEPARATOR.join(context_parts)
 
 
-def build_chat_history(messages: list[dict]) -> str:
+def build_chat_history(messages: list[dict[str, Any]], budget_tokens: int | None = None) -> str:
+    """Most recent messages that fit ``budget_tokens``; the oldest one kept may be cut."""
     if not messages:
         return "No previous conversation."
 
+    remaining = settings.rag_history_budget_tokens if budget_tokens is None else budget_tokens
     history_parts = []
-    for msg in messages[-10:]:
+    for msg in reversed(messages[-HISTORY_MAX_MESSAGES:]):
         role = "User" if msg["role"] == "user" else "Assistant"
-        content = msg["content"][:500]
-        history_parts.append(f"{role}: {content}")
+        line = f"{role}: {truncate_tokens(msg['content'], HISTORY_MESSAGE_TOKENS)}"
+        tokens = count_tokens(line) + 1
+        if tokens > remaining:
+            if remaining > 0:
+                history_parts.append(truncate_tokens(line, remaining - 1))
+            break
+        history_parts.append(line)
+        remaining -= tokens
+
+    return "\n".join(reversed(history_parts)) or "No previous conversation."
+
 
-    return "\n".join(history_parts)
+def prompt_budget(question: str) -> int:
+    """Tokens left for context and history after the fixed prompt and the answer."""
+    fixed = count_tokens(SYSTEM_PROMPT) + count_tokens(QA_PROMPT_TEMPLATE) + count_tokens(question)
+    available = settings.llm_context_window - settings.llm_max_tokens - fixed
+    return max(0, min(settings.rag_context_budget_tokens, available))
 
 
 def build_qa_prompt(
@@ -52,8 +248,9 @@ def build_qa_prompt(
     chunks: list[dict],
     chat_history: list[dict],
 ) -> str:
-    context = build_context(chunks)
-    history = build_chat_history(chat_history)
+    budget = prompt_budget(question)
+    history = build_chat_history(chat_history, min(settings.rag_history_budget_tokens, budget))
+    context = build_context(pack_context(chunks, budget - count_tokens(history)))
 
     return QA_PROMPT_TEMPLATE.format(
         context=context,
@@ -0,0 +1,148 @@
+import logging
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from itertools import pairwise
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from", "how",
+    "in", "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when",
+    "where", "which", "who", "why", "with",
+})
+
+
+class BaseReranker(ABC):
+    @abstractmethod
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        """Relevance of each text to the query in [0, 1], for one batch."""
+        ...
+
+
+class LexicalOverlapReranker(BaseReranker):
+    """Scores by how many query terms and adjacent term pairs a chunk contains.
+
+    Costs microseconds per chunk and needs no model, so it is always available. Ties
+    keep the order they arrived in, so chunks with equal coverage stay in dense order.
+    """
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        terms = [t for t in self._tokens(query) if t not in STOPWORDS] or self._tokens(query)
+        if not terms:
+            return [0.0] * len(texts)
+        unigrams = set(terms)
+        bigrams = set(pairwise(terms))
+
+        scores = []
+        for text in texts:
+            tokens = self._tokens(text)
+            present = unigrams & set(tokens)
+            coverage = len(present) / len(unigrams)
+            if bigrams:
+                phrase = len(bigrams & set(pairwise(tokens))) / len(bigrams)
+                coverage = (coverage + phrase) / 2
+            scores.append(coverage)
+        return scores
+
+    @staticmethod
+    def _tokens(text: str) -> list[str]:
+        return WORD_PATTERN.findall(text.lower())
+
+
+class CrossEncoderReranker(BaseReranker):
+    """Local ONNX cross-encoder, e.g. an export of ``cross-encoder/ms-marco-MiniLM-L-6-v2``.
+
+    ``model_path`` is a directory holding ``model.onnx`` and ``tokenizer.json``. Needs the
+    ``rerank`` extra (onnxruntime, tokenizers).
+    """
+
+    def __init__(self, model_path: str, max_length: int = 512):
+        try:
+            import numpy as np
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The cross-encoder reranker needs onnxruntime and tokenizers: "
+                "uv sync --extra rerank"
+            ) from e
+
+        path = Path(model_path)
+        self._np = np
+        self.session = onnxruntime.InferenceSession(
+            str(path / "model.onnx"), providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(str(path / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length, strategy="only_second")
+        self.tokenizer.enable_padding()
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        np = self._np
+        encodings = self.tokenizer.encode_batch([(query, text) for text in texts])
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        logits = self.session.run(
+            None, {name: value for name, value in inputs.items() if name in self.input_names}
+        )[0]
+        return [1 / (1 + math.exp(-float(row[0]))) for row in logits]
+
+
+class RerankStage:
+    """Scores candidates in batches under a latency budget.
+
+    When the budget runs out before every candidate is scored, or the reranker fails,
+    ``rerank`` returns None and the caller keeps the retrieval order.
+    """
+
+    def __init__(self, reranker: BaseReranker, batch_size: int, budget_ms: float):
+        self.reranker = reranker
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+
+    def rerank(self, query: str, texts: list[str], top_k: int) -> list[tuple[int, float]] | None:
+        """Return ``(index, score)`` of the best ``top_k`` texts, best first."""
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000
+        scores: list[float] = []
+
+        try:
+            for offset in range(0, len(texts), self.batch_size):
+                if offset and time.perf_counter() > deadline:
+                    logger.warning(
+                        f"Rerank budget of {self.budget_ms}ms exhausted after {offset}/"
+                        f"{len(texts)} candidates, keeping retrieval order"
+                    )
+                    return None
+                scores.extend(self.reranker.score(query, texts[offset : offset + self.batch_size]))
+        except Exception as e:
+            logger.warning(f"Reranking failed, keeping retrieval order: {e}")
+            return None
+
+        ranked = sorted(enumerate(scores), key=lambda item: item[1], reverse=True)[:top_k]
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"Reranked {len(texts)} candidates in {elapsed:.1f}ms")
+        return ranked
+
+
+def build_reranker() -> RerankStage | None:
+    if settings.rag_reranker == "none":
+        return None
+    if settings.rag_reranker == "cross_encoder":
+        reranker: BaseReranker = CrossEncoderReranker(settings.rag_rerank_model_path)
+    else:
+        reranker = LexicalOverlapReranker()
+    return RerankStage(
+        reranker,
+        batch_size=settings.rag_rerank_batch_size,
+        budget_ms=settings.rag_rerank_budget_ms,
+    )
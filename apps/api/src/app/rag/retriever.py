@@ -1,9 +1,16 @@
+import asyncio
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any
 
 from app.config import settings
 from app.db.vector_store import VectorStore
 from app.rag.embedder import DocumentEmbedder
+from app.rag.lexical import LexicalSearcher
+from app.rag.reranker import RerankStage
+from app.rag.windows import ChunkWindowExpander
+from app.schemas.conversation import AskOptions
 
 logger = logging.getLogger(__name__)
 
@@ -16,32 +23,313 @@ class RetrievedChunk:
     page_number: int | None
     content: str
     relevance_score: float
+    chunk_id: str = ""
+    page_end: int | None = None
+
+
+@dataclass
+class RetrievalOptions:
+    """Per-request retrieval settings; unset fields fall back to ``settings``."""
+
+    top_k: int | None = None
+    score_threshold: float | None = None
+    document_filter: list[str] | None = None
+    hybrid: bool | None = None
+    lexical_weight: float | None = None
+    rerank: bool | None = None
+    window: int | None = None
+
+    @classmethod
+    def from_request(cls, options: AskOptions) -> "RetrievalOptions":
+        """Build from validated ``AskRequest.options``, leaving out ``stream``."""
+        return cls(**options.model_dump(include=set(cls.__dataclass_fields__)))
+
+    def resolve(self) -> "ResolvedOptions":
+        lexical_weight = (
+            settings.rag_lexical_weight if self.lexical_weight is None else self.lexical_weight
+        )
+        return ResolvedOptions(
+            top_k=self.top_k or settings.rag_top_k,
+            score_threshold=self.score_threshold or settings.rag_score_threshold,
+            document_filter=sorted(self.document_filter) if self.document_filter else None,
+            hybrid=settings.rag_hybrid_enabled if self.hybrid is None else self.hybrid,
+            lexical_weight=min(max(lexical_weight, 0.0), 1.0),
+            rerank=settings.rag_reranker != "none" if self.rerank is None else self.rerank,
+            window=max(settings.rag_chunk_window if self.window is None else self.window, 0),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ResolvedOptions(RetrievalOptions):
+    """``RetrievalOptions`` after ``resolve``: every setting except the filter is filled in."""
+
+    top_k: int = 0
+    score_threshold: float = 0.0
+    hybrid: bool = False
+    lexical_weight: float = 0.0
+    rerank: bool = False
+    window: int = 0
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[RetrievedChunk]],
+    weights: list[float],
+    k: int | None = None,
+) -> list[RetrievedChunk]:
+    """Merge ranked lists by weighted reciprocal rank: sum of ``w / (k + rank)``.
+
+    Chunks are matched by (document, chunk index) since dense hits carry Qdrant
+    point ids and lexical hits carry database ids. Scores are scaled so a chunk
+    ranked first by every list scores 1.0.
+    """
+    k = k or settings.rag_rrf_k
+    best = sum(weights) / (k + 1)
+    fused: dict[tuple[str, int], RetrievedChunk] = {}
+    scores: dict[tuple[str, int], float] = {}
+
+    for ranking, weight in zip(rankings, weights, strict=True):
+        for rank, chunk in enumerate(ranking, start=1):
+            key = (chunk.document_id, chunk.chunk_index)
+            fused.setdefault(key, chunk)
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+
+    ordered = sorted(fused, key=lambda key: scores[key], reverse=True)
+    return [replace(fused[key], relevance_score=scores[key] / best) for key in ordered]
 
 
 class DocumentRetriever:
-    def __init__(self, vector_store: VectorStore, embedder: DocumentEmbedder):
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        embedder: DocumentEmbedder,
+        lexical: LexicalSearcher | None = None,
+        reranker: RerankStage | None = None,
+        expander: ChunkWindowExpander | None = None,
+    ):
         self.vector_store = vector_store
         self.embedder = embedder
+        self.lexical = lexical
+        self.reranker = reranker
+        self.expander = expander
 
     def retrieve(
         self,
         query: str,
-        top_k: int | None = None,
-        score_threshold: float | None = None,
-        document_filter: list[str] | None = None,
+        options: RetrievalOptions | None = None,
+        query_vector: list[float] | None = None,
+        timings: dict[str, float] | None = None,
     ) -> list[RetrievedChunk]:
-        top_k = top_k or settings.rag_top_k
-        score_threshold = score_threshold or settings.rag_score_threshold
+        """Dense retrieval; hybrid search and window expansion need the async database
+        and only run in ``aretrieve``.
+
+        Stage durations in milliseconds are recorded into ``timings`` when given.
+        """
+        options = (options or RetrievalOptions()).resolve()
+        timings = {} if timings is None else timings
 
-        query_vector = self.embedder.embed_query(query)
+        if query_vector is None:
+            query_vector = self.embedder.embed_query(query)
 
+        start = time.perf_counter()
         results = self.vector_store.search(
             query_vector=query_vector,
-            top_k=top_k,
-            score_threshold=score_threshold,
-            document_filter=document_filter,
+            top_k=self._fetch_count(options),
+            score_threshold=options.score_threshold,
+            document_filter=options.document_filter,
         )
+        timings["search"] = (time.perf_counter() - start) * 1000
+
+        return self._rerank(query, self._to_chunks(query, results), options, timings)
+
+    async def aretrieve(
+        self,
+        query: str,
+        options: RetrievalOptions | None = None,
+        query_vector: list[float] | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> list[RetrievedChunk]:
+        options = (options or RetrievalOptions()).resolve()
+        timings = {} if timings is None else timings
+
+        if query_vector is None:
+            query_vector = await self.embedder.aembed_query(query)
+
+        start = time.perf_counter()
+        if options.hybrid and self.lexical is not None:
+            chunks = await self._ahybrid_search(self.lexical, query, query_vector, options)
+        else:
+            results = await self.vector_store.asearch(
+                query_vector=query_vector,
+                top_k=self._fetch_count(options),
+                score_threshold=options.score_threshold,
+                document_filter=options.document_filter,
+            )
+            chunks = self._to_chunks(query, results)
+        timings["search"] = (time.perf_counter() - start) * 1000
+
+        return await self._afinish(query, chunks, options, timings)
+
+    def retrieve_many(
+        self,
+        queries: list[str],
+        options: RetrievalOptions | None = None,
+    ) -> list[list[RetrievedChunk]]:
+        """``retrieve`` for many queries: one embedding batch and one Qdrant batch request."""
+        options = (options or RetrievalOptions()).resolve()
+        if not queries:
+            return []
+
+        query_vectors = self.embedder.embed_queries(queries)
+        results = self.vector_store.search_many(
+            query_vectors,
+            top_k=self._fetch_count(options),
+            score_threshold=options.score_threshold,
+            document_filter=options.document_filter,
+        )
+        return [
+            self._rerank(query, self._to_chunks(query, hits), options, {})
+            for query, hits in zip(queries, results, strict=True)
+        ]
+
+    async def aretrieve_many(
+        self,
+        queries: list[str],
+        options: RetrievalOptions | None = None,
+        query_vectors: list[list[float]] | None = None,
+    ) -> list[list[RetrievedChunk]]:
+        """``aretrieve`` for many queries, results in query order.
+
+        Queries are embedded in provider batches and searched with one Qdrant batch
+        request; lexical searches, reranking and window expansion still run per query.
+        """
+        options = (options or RetrievalOptions()).resolve()
+        if not queries:
+            return []
+
+        if query_vectors is None:
+            query_vectors = await self.embedder.aembed_queries(queries)
+
+        lexical = self.lexical if options.hybrid else None
+        candidates = self._fetch_count(options)
+        if lexical is not None:
+            candidates = max(candidates, settings.rag_hybrid_candidates)
+
+        dense = await self.vector_store.asearch_many(
+            query_vectors,
+            top_k=candidates,
+            score_threshold=options.score_threshold,
+            document_filter=options.document_filter,
+        )
+        if lexical is not None:
+            keyword_lists = await asyncio.gather(
+                *(lexical.asearch(q, candidates, options.document_filter) for q in queries)
+            )
+            chunk_lists = [
+                self._fuse(query, hits, keyword_hits, options)
+                for query, hits, keyword_hits in zip(queries, dense, keyword_lists, strict=True)
+            ]
+        else:
+            chunk_lists = [
+                self._to_chunks(query, hits) for query, hits in zip(queries, dense, strict=True)
+            ]
+
+        return list(
+            await asyncio.gather(
+                *(
+                    self._afinish(query, chunks, options, {})
+                    for query, chunks in zip(queries, chunk_lists, strict=True)
+                )
+            )
+        )
+
+    async def _afinish(
+        self,
+        query: str,
+        chunks: list[RetrievedChunk],
+        options: ResolvedOptions,
+        timings: dict[str, float],
+    ) -> list[RetrievedChunk]:
+        """Rerank or cut the candidates to ``top_k``, then expand them into windows."""
+        if self._reranking(options):
+            # Cross-encoder scoring is CPU-bound; keep it off the event loop
+            chunks = await asyncio.to_thread(self._rerank, query, chunks, options, timings)
+        else:
+            chunks = chunks[: options.top_k]
+
+        if options.window and self.expander is not None:
+            start = time.perf_counter()
+            chunks = await self.expander.aexpand(chunks, options.window)
+            timings["expand"] = (time.perf_counter() - start) * 1000
+        return chunks
+
+    async def _ahybrid_search(
+        self,
+        lexical: LexicalSearcher,
+        query: str,
+        query_vector: list[float],
+        options: ResolvedOptions,
+    ) -> list[RetrievedChunk]:
+        # Over-fetch both lists so fusion can promote chunks ranked lower by one of them
+        candidates = max(self._fetch_count(options), settings.rag_hybrid_candidates)
+        dense, keyword_hits = await asyncio.gather(
+            self.vector_store.asearch(
+                query_vector=query_vector,
+                top_k=candidates,
+                score_threshold=options.score_threshold,
+                document_filter=options.document_filter,
+            ),
+            lexical.asearch(query, candidates, options.document_filter),
+        )
+        return self._fuse(query, dense, keyword_hits, options)
+
+    def _fuse(
+        self,
+        query: str,
+        dense: list[dict[str, Any]],
+        lexical: list[dict[str, Any]],
+        options: ResolvedOptions,
+    ) -> list[RetrievedChunk]:
+        fused = reciprocal_rank_fusion(
+            [self._to_chunks(query, dense), self._to_chunks(query, lexical)],
+            weights=[1 - options.lexical_weight, options.lexical_weight],
+        )
+        logger.info(
+            f"Hybrid retrieval: {len(dense)} dense + {len(lexical)} lexical -> "
+            f"{len(fused)} fused chunks (lexical_weight={options.lexical_weight})"
+        )
+        return fused[: self._fetch_count(options)]
+
+    def _reranking(self, options: ResolvedOptions) -> bool:
+        return options.rerank and self.reranker is not None
+
+    def _fetch_count(self, options: ResolvedOptions) -> int:
+        """Candidates to retrieve: over-fetch when a reranker will pick the best ``top_k``."""
+        if self._reranking(options):
+            return max(options.top_k, settings.rag_rerank_candidates)
+        return options.top_k
+
+    def _rerank(
+        self,
+        query: str,
+        chunks: list[RetrievedChunk],
+        options: ResolvedOptions,
+        timings: dict[str, float],
+    ) -> list[RetrievedChunk]:
+        if self.reranker is None or not options.rerank or len(chunks) <= 1:
+            return chunks[: options.top_k]
+
+        start = time.perf_counter()
+        ranked = self.reranker.rerank(query, [c.content for c in chunks], options.top_k)
+        timings["rerank"] = (time.perf_counter() - start) * 1000
+        if ranked is None:
+            return chunks[: options.top_k]
+        return [replace(chunks[index], relevance_score=score) for index, score in ranked]
 
+    @staticmethod
+    def _to_chunks(query: str, results: list[dict[str, Any]]) -> list[RetrievedChunk]:
         chunks = [
             RetrievedChunk(
                 document_id=r["document_id"],
@@ -50,6 +338,8 @@ class DocumentRetriever:
                 page_number=r.get("page_number"),
                 content=r["content"],
                 relevance_score=r["score"],
+                chunk_id=r["id"],
+                page_end=r.get("page_end"),
             )
             for r in results
         ]
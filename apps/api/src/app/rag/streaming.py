@@ -0,0 +1,68 @@
+import queue
+import threading
+from collections.abc import Generator, Iterable, Iterator
+
+
+def batched[T](items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Group ``items`` into lists of ``size`` (the last one may be shorter)."""
+    batch: list[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def prefetch[T](items: Iterable[T], depth: int) -> Generator[T, None, None]:
+    """Produce ``items`` on a background thread, at most ``depth`` ahead of the consumer.
+
+    The bounded queue is the backpressure: the producer blocks while ``depth`` items
+    are waiting. A producer exception is re-raised to the consumer, and closing the
+    returned generator stops the producer.
+    """
+    if depth <= 0:
+        yield from items
+        return
+
+    # An item travels wrapped in a 1-tuple, an error as itself and the end as None
+    buffer: queue.Queue[tuple[T] | BaseException | None] = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry: tuple[T] | BaseException | None) -> None:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    break
+                put((item,))
+            put(None)
+        except BaseException as e:
+            put(e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            entry = buffer.get()
+            if entry is None:
+                return
+            if isinstance(entry, BaseException):
+                raise entry
+            yield entry[0]
+    finally:
+        stop.set()
+        producer.join()
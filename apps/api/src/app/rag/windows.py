@@ -0,0 +1,171 @@
+import logging
+import uuid
+from dataclasses import replace
+from functools import lru_cache
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models.chunk import DocumentChunk
+from app.rag.cache import LRUCache
+from app.rag.prompts import find_overlap
+
+if TYPE_CHECKING:
+    from app.rag.retriever import RetrievedChunk
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkWindowExpander:
+    """Widens each retrieved chunk with its ``window`` neighbours on either side.
+
+    Neighbour text comes from ``document_chunks`` in one query per retrieval, and
+    from ``cache`` when recently seen. Windows of one document that overlap or touch
+    are merged into a single chunk that keeps the best hit's score and id. Lookup
+    failures leave the retrieved chunks as they are.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+        cache: LRUCache | None = None,
+    ):
+        self.session_maker = session_maker
+        self.cache = cache
+
+    async def aexpand(
+        self, chunks: list["RetrievedChunk"], window: int
+    ) -> list["RetrievedChunk"]:
+        """Return one chunk per merged window, best window first."""
+        if window <= 0 or not chunks:
+            return chunks
+
+        texts: dict[tuple[str, int], tuple[str, int | None, int | None]] = {
+            (c.document_id, c.chunk_index): (c.content, c.page_number, c.page_end)
+            for c in chunks
+        }
+        missing: dict[str, set[int]] = {}
+        for chunk in chunks:
+            for index in range(max(chunk.chunk_index - window, 0), chunk.chunk_index + window + 1):
+                key = (chunk.document_id, index)
+                if key in texts:
+                    continue
+                cached = self.cache.get(self._cache_key(*key)) if self.cache is not None else None
+                if cached is not None:
+                    texts[key] = cached
+                else:
+                    missing.setdefault(chunk.document_id, set()).add(index)
+
+        if missing:
+            try:
+                texts.update(await self._afetch(missing))
+            except Exception as e:
+                logger.warning(f"Chunk window lookup failed, using retrieved chunks only: {e}")
+                return chunks
+
+        return self._merge(chunks, window, texts)
+
+    async def _afetch(
+        self, missing: dict[str, set[int]]
+    ) -> dict[tuple[str, int], tuple[str, int | None, int | None]]:
+        stmt = select(
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.content,
+            DocumentChunk.page_number,
+            DocumentChunk.page_end,
+        ).where(
+            or_(
+                *(
+                    and_(
+                        DocumentChunk.document_id == uuid.UUID(document_id),
+                        DocumentChunk.chunk_index.in_(sorted(indexes)),
+                    )
+                    for document_id, indexes in missing.items()
+                )
+            )
+        )
+        async with self.session_maker() as session:
+            rows = (await session.execute(stmt)).all()
+
+        fetched = {}
+        for row in rows:
+            key = (str(row.document_id), row.chunk_index)
+            fetched[key] = (row.content, row.page_number, row.page_end)
+            if self.cache is not None:
+                self.cache.set(self._cache_key(*key), fetched[key])
+        return fetched
+
+    @staticmethod
+    def _merge(
+        chunks: list["RetrievedChunk"],
+        window: int,
+        texts: dict[tuple[str, int], tuple[str, int | None, int | None]],
+    ) -> list["RetrievedChunk"]:
+        by_document: dict[str, list[RetrievedChunk]] = {}
+        for chunk in chunks:
+            by_document.setdefault(chunk.document_id, []).append(chunk)
+
+        merged = []
+        for document_id, hits in by_document.items():
+            hits.sort(key=lambda c: c.chunk_index)
+            groups = [[hits[0]]]
+            for hit in hits[1:]:
+                # Windows that overlap or touch become one
+                if hit.chunk_index - window <= groups[-1][-1].chunk_index + window + 1:
+                    groups[-1].append(hit)
+                else:
+                    groups.append([hit])
+
+            for group in groups:
+                first = max(group[0].chunk_index - window, 0)
+                last = group[-1].chunk_index + window
+                pieces = [
+                    texts[(document_id, index)]
+                    for index in range(first, last + 1)
+                    if (document_id, index) in texts
+                ]
+                content = pieces[0][0]
+                for previous, (text, _, _) in pairwise(pieces):
+                    overlap = find_overlap(previous[0], text)
+                    content += ("" if overlap else "\n") + text[overlap:]
+
+                best = max(group, key=lambda c: c.relevance_score)
+                page_number = pieces[0][1]
+                page_end = pieces[-1][2] or pieces[-1][1]
+                merged.append(
+                    replace(
+                        best,
+                        content=content,
+                        page_number=page_number,
+                        page_end=page_end if page_end != page_number else None,
+                    )
+                )
+
+        merged.sort(key=lambda c: c.relevance_score, reverse=True)
+        return merged
+
+    @staticmethod
+    def _cache_key(document_id: str, chunk_index: int) -> str:
+        return f"{document_id}:{chunk_index}"
+
+
+@lru_cache(maxsize=1)
+def get_chunk_text_cache() -> LRUCache | None:
+    if settings.rag_chunk_cache_max_entries <= 0:
+        return None
+    return LRUCache(
+        max_entries=settings.rag_chunk_cache_max_entries,
+        ttl_seconds=settings.rag_chunk_cache_ttl_seconds,
+    )
+
+
+def invalidate_chunk_text(document_id: str) -> None:
+    """Forget cached neighbour text of a re-ingested or deleted document."""
+    cache = get_chunk_text_cache()
+    if cache is not None:
+        cache.delete_prefix(f"{document_id}:")
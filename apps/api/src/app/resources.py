@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import threading
+
+from app.config import settings
+from app.db.vector_store import VectorStore
+from app.providers import get_embedding_provider, get_llm_provider
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.rag.chunker import DocumentChunker, shutdown_chunk_pools
+from app.rag.embedder import DocumentEmbedder
+from app.rag.embedding_cache import get_embedding_cache, get_query_embedding_cache
+from app.rag.extractors.pdf import shutdown_pdf_pools
+from app.rag.generator import AnswerGenerator
+from app.rag.pipeline import RAGPipeline
+from app.rag.reranker import RerankStage, build_reranker
+
+logger = logging.getLogger(__name__)
+
+Closeable = VectorStore | BaseLLMProvider | BaseEmbeddingProvider
+
+# Settings whose change invalidates a component built from them
+LLM_SETTINGS = {"llm_provider", "llm_model", "llm_api_key", "llm_base_url", "ollama_llm_model"}
+EMBEDDING_SETTINGS = {
+    "embedding_provider",
+    "embedding_model",
+    "embedding_dimensions",
+    "ollama_embed_model",
+}
+CHUNKER_SETTINGS = {
+    "rag_chunk_size",
+    "rag_chunk_overlap",
+    "rag_chunk_across_pages",
+    "rag_chunk_workers",
+    "rag_chunk_pages_per_task",
+}
+RERANK_SETTINGS = {
+    "rag_reranker",
+    "rag_rerank_batch_size",
+    "rag_rerank_budget_ms",
+    "rag_rerank_model_path",
+}
+VECTOR_STORE_SETTINGS = {"qdrant_host", "qdrant_port", "qdrant_collection"}
+
+
+class AppResources:
+    """Process-wide clients and pipeline components shared by all requests and tasks.
+
+    Created once per process (FastAPI lifespan, Celery ``worker_process_init``) so the
+    Qdrant connection pools, provider HTTP clients and tiktoken encoding are reused
+    instead of being recreated per request. Providers and the pipeline are built on
+    first use, so routes that only touch Qdrant don't need provider credentials.
+    ``reload`` drops only the components whose settings changed; requests already
+    holding the old pipeline finish on it, and the clients it replaced are closed
+    ``retire_grace_seconds`` later.
+    """
+
+    retire_grace_seconds = 60.0
+
+    def __init__(self) -> None:
+        self.vector_store = self._build_vector_store()
+        self._llm_provider: BaseLLMProvider | None = None
+        self._embedding_provider: BaseEmbeddingProvider | None = None
+        self._chunker: DocumentChunker | None = None
+        self._reranker: RerankStage | None = None
+        self._reranker_loaded = False
+        self._pipeline: RAGPipeline | None = None
+        self._retired: list[Closeable] = []
+        self._closing: set[asyncio.Task[None]] = set()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _build_vector_store() -> VectorStore:
+        return VectorStore(
+            host=settings.qdrant_host,
+            port=settings.qdrant_port,
+            collection_name=settings.qdrant_collection,
+        )
+
+    @property
+    def llm_provider(self) -> BaseLLMProvider:
+        with self._lock:
+            if self._llm_provider is None:
+                self._llm_provider = get_llm_provider()
+            return self._llm_provider
+
+    @property
+    def embedding_provider(self) -> BaseEmbeddingProvider:
+        with self._lock:
+            if self._embedding_provider is None:
+                self._embedding_provider = get_embedding_provider()
+            return self._embedding_provider
+
+    @property
+    def chunker(self) -> DocumentChunker:
+        with self._lock:
+            if self._chunker is None:
+                self._chunker = DocumentChunker()
+            return self._chunker
+
+    @property
+    def reranker(self) -> RerankStage | None:
+        """The configured rerank stage, or None when reranking is off."""
+        with self._lock:
+            if not self._reranker_loaded:
+                self._reranker = build_reranker()
+                self._reranker_loaded = True
+            return self._reranker
+
+    @property
+    def pipeline(self) -> RAGPipeline:
+        with self._lock:
+            if self._pipeline is None:
+                embedder = DocumentEmbedder(
+                    provider=self.embedding_provider,
+                    cache=get_embedding_cache(),
+                    query_cache=get_query_embedding_cache(),
+                )
+                self._pipeline = RAGPipeline(
+                    self.vector_store,
+                    chunker=self.chunker,
+                    embedder=embedder,
+                    generator=AnswerGenerator(provider=self.llm_provider),
+                    reranker=self.reranker,
+                )
+            return self._pipeline
+
+    def warm_up(self) -> None:
+        """Build the pipeline and the providers it uses ahead of the first request."""
+        _ = self.pipeline
+
+    def reload(self, changed: set[str]) -> None:
+        """Drop the components affected by the changed setting names."""
+        rebuilt = []
+        retired: list[Closeable] = []
+        with self._lock:
+            if changed & VECTOR_STORE_SETTINGS:
+                retired.append(self.vector_store)
+                self.vector_store = self._build_vector_store()
+                rebuilt.append("vector_store")
+            if changed & LLM_SETTINGS:
+                if self._llm_provider is not None:
+                    retired.append(self._llm_provider)
+                self._llm_provider = None
+                rebuilt.append("llm_provider")
+            if changed & EMBEDDING_SETTINGS:
+                if self._embedding_provider is not None:
+                    retired.append(self._embedding_provider)
+                self._embedding_provider = None
+                rebuilt.append("embedding_provider")
+            if changed & CHUNKER_SETTINGS:
+                self._chunker = None
+                rebuilt.append("chunker")
+            if changed & RERANK_SETTINGS:
+                self._reranker = None
+                self._reranker_loaded = False
+                rebuilt.append("reranker")
+            if rebuilt:
+                self._pipeline = None
+            self._retired.extend(retired)
+
+        if rebuilt:
+            logger.info(f"Reloading resources: {', '.join(rebuilt)}")
+        if retired:
+            self._retire(retired)
+
+    def _retire(self, components: list[Closeable]) -> None:
+        """Close replaced clients once the requests still holding them have finished."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to close them on: ``aclose`` closes them at shutdown
+            return
+        task = loop.create_task(self._close_later(components, self.retire_grace_seconds))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_later(self, components: list[Closeable], delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._close_retired(components)
+
+    async def _close_retired(self, components: list[Closeable]) -> None:
+        for component in components:
+            with self._lock:
+                if component not in self._retired:
+                    continue
+                self._retired.remove(component)
+            try:
+                await component.aclose()
+            except Exception as e:
+                logger.warning(f"Closing replaced {type(component).__name__} failed: {e}")
+
+    async def aclose(self) -> None:
+        for task in list(self._closing):
+            task.cancel()
+        await self._close_retired(list(self._retired))
+        await self.vector_store.aclose()
+        if self._llm_provider is not None:
+            await self._llm_provider.aclose()
+        if self._embedding_provider is not None:
+            await self._embedding_provider.aclose()
+
+
+_resources: AppResources | None = None
+_lock = threading.Lock()
+
+
+def get_resources() -> AppResources:
+    """Return this process's resources, building them on first use."""
+    global _resources
+    if _resources is None:
+        with _lock:
+            if _resources is None:
+                _resources = AppResources()
+    return _resources
+
+
+async def close_resources() -> None:
+    global _resources
+    with _lock:
+        resources, _resources = _resources, None
+    if resources is not None:
+        await resources.aclose()
+    shutdown_chunk_pools()
+    shutdown_pdf_pools()
@@ -9,13 +9,22 @@ from app.schemas.conversation import (
     ConversationResponse,
     ConversationListResponse,
     MessageResponse,
+    AskOptions,
     AskRequest,
     AskResponse,
     SourceResponse,
 )
+from app.schemas.batch import (
+    BatchAnswer,
+    BatchAskResponse,
+    BatchRequest,
+    BatchRetrieveResponse,
+    BatchRetrieveResult,
+)
 from app.schemas.config import (
     AppConfigResponse,
     AppConfigUpdate,
+    CacheStatsResponse,
     HealthResponse,
     StatsResponse,
 )
@@ -29,11 +38,18 @@ __all__ = [
     "ConversationResponse",
     "ConversationListResponse",
     "MessageResponse",
+    "AskOptions",
     "AskRequest",
     "AskResponse",
     "SourceResponse",
+    "BatchAnswer",
+    "BatchAskResponse",
+    "BatchRequest",
+    "BatchRetrieveResponse",
+    "BatchRetrieveResult",
     "AppConfigResponse",
     "AppConfigUpdate",
+    "CacheStatsResponse",
     "HealthResponse",
     "StatsResponse",
 ]
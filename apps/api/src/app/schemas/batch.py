@@ -0,0 +1,39 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from app.schemas.conversation import AskOptions, SourceResponse, TokenUsage
+
+BATCH_MAX_QUESTIONS = 500
+
+
+class BatchRequest(BaseModel):
+    questions: list[Annotated[str, Field(min_length=1, max_length=5000)]] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_QUESTIONS
+    )
+    options: AskOptions = Field(default_factory=AskOptions)
+
+
+class BatchRetrieveResult(BaseModel):
+    index: int
+    question: str
+    sources: list[SourceResponse]
+
+
+class BatchRetrieveResponse(BaseModel):
+    results: list[BatchRetrieveResult]
+
+
+class BatchAnswer(BaseModel):
+    index: int
+    question: str
+    answer: str | None = None
+    sources: list[SourceResponse] = []
+    model_used: str | None = None
+    tokens_used: TokenUsage | None = None
+    cached: bool = False
+    error: str | None = None
+
+
+class BatchAskResponse(BaseModel):
+    results: list[BatchAnswer]
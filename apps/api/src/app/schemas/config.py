@@ -59,3 +59,18 @@ class StatsResponse(BaseModel):
     conversation_count: int
     storage_used_bytes: int
     vector_count: int
+
+
+class CacheMetrics(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    max_entries: int
+    hit_rate: float
+
+
+class CacheStatsResponse(BaseModel):
+    embedding: CacheMetrics | None = None
+    query_embedding: CacheMetrics | None = None
+    answer: CacheMetrics | None = None
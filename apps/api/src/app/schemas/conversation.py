@@ -8,6 +8,7 @@ class SourceResponse(BaseModel):
     document_id: str
     document_name: str
     page_number: int | None = None
+    page_end: int | None = None
     chunk_text: str
     relevance_score: float
 
@@ -50,9 +51,22 @@ class ConversationListResponse(BaseModel):
     total: int
 
 
+class AskOptions(BaseModel):
+    """Per-request overrides; omitted retrieval options fall back to ``settings``."""
+
+    top_k: int | None = Field(None, ge=1, le=100)
+    score_threshold: float | None = Field(None, ge=0.0, le=1.0)
+    document_filter: list[str] | None = None
+    hybrid: bool | None = None
+    lexical_weight: float | None = Field(None, ge=0.0, le=1.0)
+    rerank: bool | None = None
+    window: int | None = Field(None, ge=0, le=10)
+    stream: bool = False
+
+
 class AskRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=5000)
-    options: dict = Field(default_factory=dict)
+    options: AskOptions = Field(default_factory=AskOptions)
 
 
 class AskResponse(BaseModel):
@@ -60,3 +74,4 @@ class AskResponse(BaseModel):
     sources: list[SourceResponse]
     model_used: str
     tokens_used: TokenUsage
+    cached: bool = False
@@ -42,6 +42,7 @@ class ChunkResponse(BaseModel):
     chunk_index: int
     content: str
     page_number: int | None = None
+    page_end: int | None = None
     token_count: int | None = None
     metadata: dict = Field(default={}, validation_alias="metadata_")
     created_at: datetime
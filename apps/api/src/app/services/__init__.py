@@ -1,5 +1,13 @@
 from app.services.document_service import DocumentService
 from app.services.conversation_service import ConversationService
 from app.services.stats_service import StatsService
+from app.services.ingestion_queue import IngestionJob, IngestionQueue, get_ingestion_queue
 
-__all__ = ["DocumentService", "ConversationService", "StatsService"]
+__all__ = [
+    "DocumentService",
+    "ConversationService",
+    "StatsService",
+    "IngestionJob",
+    "IngestionQueue",
+    "get_ingestion_queue",
+]
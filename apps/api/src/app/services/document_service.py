@@ -1,10 +1,13 @@
 import hashlib
+import json
 import logging
 import uuid
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any, cast
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Table, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
 from app.config import settings
 from app.models.chunk import DocumentChunk
@@ -97,26 +100,143 @@ class DocumentService:
         await self.db.refresh(doc)
         return doc
 
+    async def update_progress(self, document_id: uuid.UUID, progress: dict[str, Any]) -> None:
+        doc = await self.get_document(document_id)
+        if not doc:
+            return
+
+        # Reassigned rather than mutated so the JSON column is marked dirty
+        doc.metadata_ = {**(doc.metadata_ or {}), "processing": progress}
+        await self.db.commit()
+
     async def store_chunks(
         self,
         document_id: uuid.UUID,
         chunks: list[dict],
-    ) -> list[DocumentChunk]:
-        db_chunks = []
+    ) -> int:
+        """Insert chunk rows in bulk, bypassing the ORM unit of work.
+
+        On asyncpg this is one binary ``COPY``; other drivers get one executemany
+        ``INSERT`` per ``CHUNK_INSERT_BATCH_SIZE`` rows. A chunk's ``id`` is kept when
+        given (the pipeline passes its point ID). Returns the rows written.
+        """
+        if not chunks:
+            return 0
+
+        created_at = datetime.now(UTC)
+        rows = [
+            {
+                "id": chunk_data.get("id") or uuid.uuid4(),
+                "document_id": document_id,
+                "chunk_index": chunk_data["chunk_index"],
+                "content": chunk_data["content"],
+                "page_number": chunk_data.get("page_number"),
+                "page_end": chunk_data.get("page_end"),
+                "token_count": chunk_data.get("token_count"),
+                "metadata": chunk_data.get("metadata", {}),
+                "created_at": created_at,
+            }
+            for chunk_data in chunks
+        ]
+
+        connection = await self.db.connection()
+        if connection.dialect.driver == "asyncpg":
+            await self._copy_chunks(connection, rows)
+        else:
+            table = cast(Table, DocumentChunk.__table__)
+            batch_size = max(settings.chunk_insert_batch_size, 1)
+            for start in range(0, len(rows), batch_size):
+                await self.db.execute(insert(table), rows[start : start + batch_size])
+
+        await self.db.commit()
+        logger.info(f"Stored {len(rows)} chunks for document {document_id}")
+        return len(rows)
+
+    @staticmethod
+    async def _copy_chunks(connection: AsyncConnection, rows: list[dict[str, Any]]) -> None:
+        raw = await connection.get_raw_connection()
+        assert raw.driver_connection is not None
+        await raw.driver_connection.copy_records_to_table(
+            DocumentChunk.__tablename__,
+            columns=list(rows[0]),
+            # asyncpg takes JSONB as text; each row's metadata is serialized once here
+            records=[
+                tuple({**row, "metadata": json.dumps(row["metadata"])}.values()) for row in rows
+            ],
+        )
+
+    async def sync_chunks(
+        self,
+        document_id: uuid.UUID,
+        chunks: list[dict[str, Any]],
+        stored: dict[uuid.UUID, tuple[int, int | None, int | None]],
+    ) -> list[uuid.UUID]:
+        """Store a batch of a re-ingested document's rows against its previous rows.
+
+        Rows are matched by ``id``, the chunk's content-addressed point ID: new ones are
+        inserted, ones whose position changed are updated and the rest are left as
+        they are, so the document stays searchable throughout. Matched IDs are removed
+        from ``stored`` (see ``get_chunk_positions``); whatever is left after the last
+        batch is stale. Returns the IDs inserted.
+        """
+        fresh = []
+        moved = []
         for chunk_data in chunks:
-            chunk = DocumentChunk(
-                document_id=document_id,
-                chunk_index=chunk_data["chunk_index"],
-                content=chunk_data["content"],
-                page_number=chunk_data.get("page_number"),
-                token_count=chunk_data.get("token_count"),
-                metadata_=chunk_data.get("metadata", {}),
-            )
-            self.db.add(chunk)
-            db_chunks.append(chunk)
+            position = stored.pop(chunk_data["id"], None)
+            if position is None:
+                fresh.append(chunk_data)
+            elif position != (
+                chunk_data["chunk_index"],
+                chunk_data.get("page_number"),
+                chunk_data.get("page_end"),
+            ):
+                moved.append(
+                    {
+                        "id": chunk_data["id"],
+                        "chunk_index": chunk_data["chunk_index"],
+                        "page_number": chunk_data.get("page_number"),
+                        "page_end": chunk_data.get("page_end"),
+                    }
+                )
 
+        if moved:
+            await self.db.execute(update(DocumentChunk), moved)
+        await self.store_chunks(document_id, fresh)
+        await self.db.commit()
+        return [chunk_data["id"] for chunk_data in fresh]
+
+    async def get_chunk_positions(
+        self, document_id: uuid.UUID
+    ) -> dict[uuid.UUID, tuple[int, int | None, int | None]]:
+        """Row ID -> (chunk_index, page_number, page_end) of a document's stored chunks."""
+        result = await self.db.execute(
+            select(
+                DocumentChunk.id,
+                DocumentChunk.chunk_index,
+                DocumentChunk.page_number,
+                DocumentChunk.page_end,
+            ).where(DocumentChunk.document_id == document_id)
+        )
+        return {row.id: (row.chunk_index, row.page_number, row.page_end) for row in result}
+
+    async def delete_chunks(
+        self, document_id: uuid.UUID, chunk_ids: list[uuid.UUID] | None = None
+    ) -> None:
+        """Delete the document's rows, or only those in ``chunk_ids`` when given."""
+        if chunk_ids is None:
+            await self.db.execute(
+                delete(DocumentChunk).where(DocumentChunk.document_id == document_id)
+            )
+        else:
+            batch_size = max(settings.chunk_insert_batch_size, 1)
+            for start in range(0, len(chunk_ids), batch_size):
+                await self.db.execute(
+                    delete(DocumentChunk).where(
+                        DocumentChunk.document_id == document_id,
+                        DocumentChunk.id.in_(chunk_ids[start : start + batch_size]),
+                    )
+                )
         await self.db.commit()
-        return db_chunks
 
     async def get_chunks(self, document_id: uuid.UUID) -> list[DocumentChunk]:
         result = await self.db.execute(
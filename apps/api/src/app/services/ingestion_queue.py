@@ -0,0 +1,198 @@
+import asyncio
+import itertools
+import logging
+import traceback
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.api.websocket import send_processing_update
+from app.config import settings
+from app.db.session import async_session_maker
+from app.rag.pipeline import IngestedBatch
+from app.resources import get_resources
+from app.services.document_service import DocumentService
+
+logger = logging.getLogger(__name__)
+
+# Celery priorities (0 runs first with the Redis broker) by file size upper bound
+_CELERY_PRIORITY_BY_MB = ((1, 0), (5, 3), (20, 6))
+
+
+@dataclass(frozen=True)
+class IngestionJob:
+    document_id: uuid.UUID
+    file_path: Path
+    file_type: str
+    document_name: str
+    file_size: int
+
+
+async def process_document(job: IngestionJob) -> None:
+    """Run one document through the RAG pipeline, recording progress on the document."""
+    document_id, document_name = job.document_id, job.document_name
+    logger.info(f"[PROCESS] Starting processing for document {document_id} ({document_name})")
+
+    async with async_session_maker() as db:
+        service = DocumentService(db)
+        inserted: list[uuid.UUID] = []
+        try:
+            await service.update_status(document_id, "processing")
+            await report_progress(service, document_id, "processing", 0, "extracting")
+
+            pipeline = get_resources().pipeline
+            # Rows of the previous version (or an interrupted run) stay searchable
+            # until the new version has replaced them
+            stored = await service.get_chunk_positions(document_id)
+
+            async def store_batch(batch: IngestedBatch) -> None:
+                inserted.extend(await service.sync_chunks(document_id, batch.rows, stored))
+                await report_progress(
+                    service,
+                    document_id,
+                    "processing",
+                    95 * batch.pages_done // max(batch.total_pages, 1),
+                    "ingesting",
+                )
+
+            result = await pipeline.aingest_document(
+                file_path=job.file_path,
+                file_type=job.file_type,
+                document_id=str(document_id),
+                document_name=document_name,
+                store_batch=store_batch,
+            )
+            await service.delete_chunks(document_id, list(stored))
+
+            await service.update_status(
+                document_id,
+                status="ready",
+                chunk_count=result["chunk_count"],
+                page_count=result["page_count"],
+            )
+            await report_progress(service, document_id, "ready", 100, "done")
+            logger.info(
+                f"[PROCESS] Document {document_name} is ready: {result['chunk_count']} chunks, "
+                f"{result['page_count']} pages"
+            )
+
+        except Exception as e:
+            logger.error(f"[PROCESS] Failed to process {document_name}: {e}")
+            logger.error(f"[PROCESS] Traceback: {traceback.format_exc()}")
+            await db.rollback()
+            # Only this run's rows; the pipeline likewise drops only the vectors it added
+            await service.delete_chunks(document_id, inserted)
+            await service.update_status(
+                document_id,
+                status="failed",
+                error_message=str(e),
+            )
+            await report_progress(service, document_id, "failed", 0, "failed", str(e))
+
+
+async def report_progress(
+    service: DocumentService,
+    document_id: uuid.UUID,
+    status: str,
+    progress: int,
+    step: str,
+    error_message: str | None = None,
+) -> None:
+    """Store progress in the document's metadata and push it to ``/ws/processing``."""
+    await service.update_progress(document_id, {"progress": progress, "current_step": step})
+    message = {
+        "document_id": str(document_id),
+        "status": status,
+        "progress": progress,
+        "current_step": step,
+    }
+    if error_message:
+        message["error_message"] = error_message
+    await send_processing_update(str(document_id), message)
+
+
+class IngestionQueue:
+    """Schedules document ingestion off the request path, smallest files first.
+
+    With ``INGEST_BACKEND=local`` jobs wait in an in-process priority queue served by
+    ``INGEST_CONCURRENCY`` worker tasks; the pipeline runs its stages in threads, so
+    the event loop keeps serving requests. With ``celery`` jobs go to the
+    ``ingest_document`` task, prioritised by file size, and the Celery workers' own
+    concurrency (``INGEST_CONCURRENCY`` per worker) caps parallelism.
+    """
+
+    def __init__(
+        self,
+        backend: str | None = None,
+        concurrency: int | None = None,
+        process: Callable[[IngestionJob], Awaitable[None]] = process_document,
+    ):
+        self.backend = backend or settings.ingest_backend
+        self.concurrency = max(concurrency or settings.ingest_concurrency, 1)
+        self.process = process
+        self._queue: asyncio.PriorityQueue[tuple[int, int, IngestionJob]] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        # Keeps equal-sized files in upload order
+        self._sequence = itertools.count()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def enqueue(self, job: IngestionJob) -> None:
+        if self.backend == "celery":
+            self._send_to_celery(job)
+            return
+
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+            self._workers = [
+                asyncio.create_task(self._work(self._queue), name=f"ingestion-worker-{i}")
+                for i in range(self.concurrency)
+            ]
+        await self._queue.put((job.file_size, next(self._sequence), job))
+        logger.info(
+            f"[QUEUE] Queued {job.document_name} ({job.file_size} bytes), "
+            f"{self._queue.qsize()} waiting"
+        )
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def _work(self, queue: asyncio.PriorityQueue[tuple[int, int, IngestionJob]]) -> None:
+        while True:
+            _, _, job = await queue.get()
+            try:
+                await self.process(job)
+            except Exception as e:
+                logger.error(f"[QUEUE] Ingestion of {job.document_name} failed: {e}")
+            finally:
+                queue.task_done()
+
+    @staticmethod
+    def _send_to_celery(job: IngestionJob) -> None:
+        from app.workers.ingestion import ingest_document
+
+        size_mb = job.file_size / (1024 * 1024)
+        priority = next((p for limit, p in _CELERY_PRIORITY_BY_MB if size_mb <= limit), 9)
+        ingest_document.apply_async(
+            args=[str(job.document_id), str(job.file_path), job.file_type, job.document_name],
+            priority=priority,
+        )
+        logger.info(f"[QUEUE] Sent {job.document_name} to Celery (priority {priority})")
+
+
+@lru_cache(maxsize=1)
+def get_ingestion_queue() -> IngestionQueue:
+    return IngestionQueue()
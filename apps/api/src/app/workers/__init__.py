@@ -1,7 +1,14 @@
+import asyncio
+import logging
+from typing import Any
+
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 celery_app = Celery(
     "documind",
     broker=settings.redis_url,
@@ -17,6 +24,38 @@ celery_app.conf.update(
     task_track_started=True,
     task_acks_late=True,
     worker_prefetch_multiplier=1,
+    worker_concurrency=settings.ingest_concurrency,
+    # Lets the API schedule small documents ahead of large ones (0 runs first on Redis)
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+    },
 )
 
+
+@worker_process_init.connect
+def init_worker_resources(**kwargs: Any) -> None:
+    # Built after the fork so every worker process owns its own connection pools
+    from app.resources import get_resources
+
+    resources = get_resources()
+    try:
+        resources.warm_up()
+    except Exception as e:
+        logger.warning(f"Worker resource init failed, retrying on first task: {e}")
+
+    try:
+        resources.vector_store.ensure_collection()
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.warning(f"Qdrant collection check failed, retrying on first task: {e}")
+
+
+@worker_process_shutdown.connect
+def close_worker_resources(**kwargs: Any) -> None:
+    from app.resources import close_resources
+
+    asyncio.run(close_resources())
+
 from app.workers.ingestion import *  # noqa: E402, F401, F403
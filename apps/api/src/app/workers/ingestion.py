@@ -1,78 +1,91 @@
 import asyncio
 import logging
+import uuid
 from pathlib import Path
+from typing import Any
 
-from app.config import settings
 from app.db.session import async_session_maker
-from app.db.vector_store import VectorStore
-from app.rag.pipeline import RAGPipeline
+from app.rag.pipeline import IngestedBatch
+from app.resources import get_resources
 from app.services.document_service import DocumentService
 from app.workers import celery_app
 
 logger = logging.getLogger(__name__)
 
+# Document status -> ``current_step`` recorded in its processing progress
+_STEPS = {"processing": "extracting", "ready": "done"}
+
 
 @celery_app.task(bind=True, name="ingest_document")
 def ingest_document(self, document_id: str, file_path: str, file_type: str, document_name: str):
     logger.info(f"Starting ingestion task for document {document_id}")
 
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    inserted: list[uuid.UUID] = []
     try:
-        self.update_state(state="PROCESSING", meta={"progress": 10, "step": "extracting"})
-
-        vector_store = VectorStore(
-            host=settings.qdrant_host,
-            port=settings.qdrant_port,
-            collection_name=settings.qdrant_collection,
-        )
-        pipeline = RAGPipeline(vector_store)
-
-        self.update_state(state="PROCESSING", meta={"progress": 30, "step": "chunking"})
+        self.update_state(state="PROCESSING", meta={"progress": 0, "step": "ingesting"})
+
+        pipeline = get_resources().pipeline
+        loop.run_until_complete(_update_document_status(document_id, status="processing"))
+        # Rows of the previous version (or an interrupted run) stay searchable
+        # until the new version has replaced them
+        stored = loop.run_until_complete(_get_chunk_positions(document_id))
+
+        def store_batch(batch: IngestedBatch) -> None:
+            progress = 95 * batch.pages_done // max(batch.total_pages, 1)
+            inserted.extend(
+                loop.run_until_complete(_sync_chunks(document_id, batch.rows, stored, progress))
+            )
+            self.update_state(
+                state="PROCESSING",
+                meta={
+                    "progress": progress,
+                    "step": "ingesting",
+                    "pages_done": batch.pages_done,
+                    "total_pages": batch.total_pages,
+                },
+            )
 
         result = pipeline.ingest_document(
             file_path=Path(file_path),
             file_type=file_type,
             document_id=document_id,
             document_name=document_name,
+            store_batch=store_batch,
         )
-
-        self.update_state(state="PROCESSING", meta={"progress": 90, "step": "storing"})
-
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(
-                _update_document_status(
-                    document_id=document_id,
-                    status="completed",
-                    chunk_count=result["chunk_count"],
-                    page_count=result["page_count"],
-                    chunks=result["chunks"],
-                )
+        loop.run_until_complete(_delete_chunks(document_id, list(stored)))
+
+        loop.run_until_complete(
+            _update_document_status(
+                document_id=document_id,
+                status="ready",
+                chunk_count=result["chunk_count"],
+                page_count=result["page_count"],
             )
-        finally:
-            loop.close()
+        )
 
         logger.info(f"Ingestion complete for {document_id}: {result['chunk_count']} chunks")
-        return {"status": "completed", "chunk_count": result["chunk_count"]}
+        return {"status": "ready", "chunk_count": result["chunk_count"]}
 
     except Exception as e:
         logger.error(f"Ingestion failed for {document_id}: {e}")
 
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(
-                _update_document_status(
-                    document_id=document_id,
-                    status="failed",
-                    error_message=str(e),
-                )
+        # Only this run's rows; the pipeline likewise drops only the vectors it added
+        loop.run_until_complete(_delete_chunks(document_id, inserted))
+        loop.run_until_complete(
+            _update_document_status(
+                document_id=document_id,
+                status="failed",
+                error_message=str(e),
             )
-        finally:
-            loop.close()
+        )
 
         raise
 
+    finally:
+        loop.close()
+
 
 async def _update_document_status(
     document_id: str,
@@ -80,10 +93,7 @@ async def _update_document_status(
     chunk_count: int = 0,
     page_count: int = 0,
     error_message: str | None = None,
-    chunks: list[dict] | None = None,
 ):
-    import uuid
-
     async with async_session_maker() as db:
         service = DocumentService(db)
         await service.update_status(
@@ -93,9 +103,37 @@ async def _update_document_status(
             page_count=page_count,
             error_message=error_message,
         )
+        await service.update_progress(
+            uuid.UUID(document_id),
+            {
+                "progress": 100 if status == "ready" else 0,
+                "current_step": _STEPS.get(status, status),
+            },
+        )
 
-        if chunks:
-            await service.store_chunks(
-                document_id=uuid.UUID(document_id),
-                chunks=chunks,
-            )
+
+async def _get_chunk_positions(
+    document_id: str,
+) -> dict[uuid.UUID, tuple[int, int | None, int | None]]:
+    async with async_session_maker() as db:
+        return await DocumentService(db).get_chunk_positions(uuid.UUID(document_id))
+
+
+async def _sync_chunks(
+    document_id: str,
+    chunks: list[dict[str, Any]],
+    stored: dict[uuid.UUID, tuple[int, int | None, int | None]],
+    progress: int,
+) -> list[uuid.UUID]:
+    async with async_session_maker() as db:
+        service = DocumentService(db)
+        inserted = await service.sync_chunks(uuid.UUID(document_id), chunks, stored)
+        await service.update_progress(
+            uuid.UUID(document_id), {"progress": progress, "current_step": "ingesting"}
+        )
+        return inserted
+
+
+async def _delete_chunks(document_id: str, chunk_ids: list[uuid.UUID]) -> None:
+    async with async_session_maker() as db:
+        await DocumentService(db).delete_chunks(uuid.UUID(document_id), chunk_ids)
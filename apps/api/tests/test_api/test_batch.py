@@ -0,0 +1,139 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.dependencies import get_resources
+from app.main import app
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.rag import pipeline as pipeline_module
+from app.rag.embedder import DocumentEmbedder
+from app.rag.generator import AnswerGenerator
+from app.rag.pipeline import RAGPipeline
+
+
+class FakeEmbeddingProvider(BaseEmbeddingProvider):
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed(self, texts):
+        self.calls.append(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeLLMProvider(BaseLLMProvider):
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    def generate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        raise NotImplementedError
+
+    async def agenerate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if "fail" in user_prompt:
+            raise RuntimeError("provider error")
+        question = user_prompt.rsplit("## Question\n", 1)[1].split("\n", 1)[0]
+        return {"content": f"answer to {question}", "model": "fake", "usage": {}}
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.batches: list[int] = []
+
+    async def asearch_many(self, query_vectors, top_k=5, score_threshold=0.7, document_filter=None):
+        self.batches.append(len(query_vectors))
+        return [
+            [
+                {
+                    "id": f"point-{i}",
+                    "score": 0.9,
+                    "document_id": "doc-1",
+                    "document_name": "manual.pdf",
+                    "chunk_index": i,
+                    "page_number": 1,
+                    "content": f"chunk {i}",
+                }
+            ]
+            for i in range(len(query_vectors))
+        ]
+
+
+@pytest.fixture
+def batch_pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "rag_batch_concurrency", 2)
+    monkeypatch.setattr(pipeline_module, "get_answer_cache", lambda: None)
+    embedding_provider = FakeEmbeddingProvider()
+    llm_provider = FakeLLMProvider()
+    pipeline = RAGPipeline(
+        FakeVectorStore(),
+        embedder=DocumentEmbedder(provider=embedding_provider),
+        generator=AnswerGenerator(provider=llm_provider),
+    )
+    app.dependency_overrides[get_resources] = lambda: SimpleNamespace(pipeline=pipeline)
+    return SimpleNamespace(pipeline=pipeline, embedding=embedding_provider, llm=llm_provider)
+
+
+QUESTIONS = ["first question", "second", "please fail", "fourth question here"]
+
+
+@pytest.mark.asyncio
+async def test_batch_ask_returns_results_in_order(client: AsyncClient, batch_pipeline):
+    response = await client.post("/api/v1/batch/ask", json={"questions": QUESTIONS})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["answer"] == "answer to first question"
+    assert results[2]["error"] == "provider error"
+    assert results[3]["sources"][0]["document_name"] == "manual.pdf"
+    # One embedding call and one Qdrant batch for the whole set
+    assert batch_pipeline.embedding.calls == [QUESTIONS]
+    assert batch_pipeline.pipeline.vector_store.batches == [4]
+    assert batch_pipeline.llm.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_ask_stream(client: AsyncClient, batch_pipeline):
+    response = await client.post(
+        "/api/v1/batch/ask", json={"questions": QUESTIONS[:2], "options": {"stream": True}}
+    )
+
+    events = [
+        json.loads(line.removeprefix("data: "))
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert sorted(e["index"] for e in events[:-1]) == [0, 1]
+    assert events[-1] == {"type": "done"}
+
+
+@pytest.mark.asyncio
+async def test_batch_retrieve(client: AsyncClient, batch_pipeline):
+    response = await client.post("/api/v1/batch/retrieve", json={"questions": QUESTIONS[:3]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["question"] for r in results] == QUESTIONS[:3]
+    assert results[1]["sources"][0]["chunk_text"] == "chunk 1"
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_empty_question_list(client: AsyncClient):
+    response = await client.post("/api/v1/batch/ask", json={"questions": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", [{"window": "wide"}, {"lexical_weight": 2}, {"top_k": 0}])
+async def test_batch_rejects_invalid_options(client: AsyncClient, options):
+    response = await client.post(
+        "/api/v1/batch/retrieve", json={"questions": QUESTIONS[:1], "options": options}
+    )
+    assert response.status_code == 422
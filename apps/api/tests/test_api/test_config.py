@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+import app.resources as resources_module
+from app.config import settings
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.resources import AppResources
+
+
+class FakeLLMProvider(BaseLLMProvider):
+    def __init__(self):
+        self.closed = False
+
+    def generate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        return {"content": "answer", "model": "fake", "usage": {}}
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeEmbeddingProvider(BaseEmbeddingProvider):
+    def __init__(self):
+        self.closed = False
+
+    def embed(self, texts):
+        return [[0.1] for _ in texts]
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def resources(monkeypatch):
+    monkeypatch.setattr(resources_module, "get_llm_provider", FakeLLMProvider)
+    monkeypatch.setattr(resources_module, "get_embedding_provider", FakeEmbeddingProvider)
+    resources = AppResources()
+    monkeypatch.setattr(resources_module, "_resources", resources)
+    return resources
+
+
+def test_pipeline_is_reused(resources):
+    pipeline = resources.pipeline
+    assert resources.pipeline is pipeline
+    assert pipeline.embedder.provider is resources.embedding_provider
+    assert pipeline.generator.provider is resources.llm_provider
+
+
+def test_reload_rebuilds_only_affected_components(resources):
+    pipeline = resources.pipeline
+    embedding_provider = resources.embedding_provider
+    chunker = resources.chunker
+    llm_provider = resources.llm_provider
+
+    resources.reload({"rag_top_k"})
+    assert resources.pipeline is pipeline
+
+    resources.reload({"llm_model"})
+    assert resources.pipeline is not pipeline
+    assert resources.llm_provider is not llm_provider
+    assert resources.embedding_provider is embedding_provider
+    assert resources.chunker is chunker
+
+
+async def test_reload_closes_replaced_clients_after_grace(resources, monkeypatch):
+    monkeypatch.setattr(resources, "retire_grace_seconds", 0.05)
+    llm_provider = resources.llm_provider
+    embedding_provider = resources.embedding_provider
+
+    resources.reload({"llm_model"})
+    # Requests still holding the old provider can keep using it for the grace period
+    await asyncio.sleep(0)
+    assert not llm_provider.closed
+
+    await asyncio.gather(*resources._closing)
+    assert llm_provider.closed
+    assert not embedding_provider.closed
+    assert not resources.llm_provider.closed
+
+
+async def test_aclose_closes_clients_still_in_grace(resources):
+    embedding_provider = resources.embedding_provider
+    resources.reload({"embedding_model"})
+    assert not embedding_provider.closed
+
+    await resources.aclose()
+    assert embedding_provider.closed
+    assert not resources._retired
+
+
+@pytest.mark.asyncio
+async def test_update_config_reloads_resources(client: AsyncClient, resources, monkeypatch):
+    monkeypatch.setattr(settings, "rag_chunk_size", settings.rag_chunk_size)
+    chunker = resources.chunker
+
+    response = await client.put("/api/v1/config", json={"rag_chunk_size": 256})
+    assert response.status_code == 200
+    assert response.json()["rag"]["chunk_size"] == 256
+    assert resources.chunker is not chunker
+    assert resources.chunker.chunk_size == 256
@@ -1,6 +1,40 @@
+import json
+from types import SimpleNamespace
+
 import pytest
 from httpx import AsyncClient
 
+from app.api import conversations as conversations_module
+from app.dependencies import get_resources
+from app.main import app
+from tests.conftest import TestSessionLocal
+
+
+class FakePipeline:
+    """Streams a fixed answer the way ``RAGPipeline.astream_query`` does."""
+
+    async def astream_query(self, question, chat_history=None, options=None):
+        sources = [
+            {
+                "document_id": "doc-1",
+                "document_name": "manual.pdf",
+                "page_number": 3,
+                "chunk_text": "Two years.",
+                "relevance_score": 0.9,
+            }
+        ]
+        yield {"type": "sources", "sources": sources}
+        for delta in ["Two ", "years."]:
+            yield {"type": "chunk", "content": delta}
+        yield {
+            "type": "done",
+            "answer": "Two years.",
+            "sources": sources,
+            "model_used": "fake",
+            "tokens_used": {"prompt": 10, "completion": 2, "total": 12},
+            "cached": False,
+        }
+
 
 @pytest.mark.asyncio
 async def test_create_conversation(client: AsyncClient):
@@ -29,3 +63,45 @@ async def test_get_conversation_not_found(client: AsyncClient):
 async def test_delete_conversation_not_found(client: AsyncClient):
     response = await client.delete("/api/v1/conversations/00000000-0000-0000-0000-000000000000")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_conversation_not_found(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/conversations/00000000-0000-0000-0000-000000000000/ask/stream",
+        json={"question": "Hello?"},
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_sends_sse_and_saves_answer(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(conversations_module, "async_session_maker", TestSessionLocal)
+    app.dependency_overrides[get_resources] = lambda: SimpleNamespace(pipeline=FakePipeline())
+    conversation = (await client.post("/api/v1/conversations", json={"title": "T"})).json()
+
+    response = await client.post(
+        f"/api/v1/conversations/{conversation['id']}/ask/stream",
+        json={"question": "How long is the warranty?"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    events = []
+    for frame in frames:
+        name, data = frame.split("\n")
+        event = json.loads(data.removeprefix("data: "))
+        assert name == f"event: {event['type']}"
+        events.append(event)
+    assert [e["type"] for e in events] == ["sources", "chunk", "chunk", "done"]
+    assert "".join(e["content"] for e in events if e["type"] == "chunk") == "Two years."
+
+    saved = await client.get(f"/api/v1/conversations/{conversation['id']}")
+    messages = saved.json()["messages"]
+    assert [(m["role"], m["content"]) for m in messages] == [
+        ("user", "How long is the warranty?"),
+        ("assistant", "Two years."),
+    ]
+    assert messages[1]["model_used"] == "fake"
+    assert messages[1]["sources"][0]["document_name"] == "manual.pdf"
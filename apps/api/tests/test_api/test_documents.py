@@ -1,6 +1,11 @@
 import pytest
 from httpx import AsyncClient
 
+from app.config import settings
+from app.main import app
+from app.services.document_service import DocumentService
+from app.services.ingestion_queue import get_ingestion_queue
+
 
 @pytest.mark.asyncio
 async def test_list_documents_empty(client: AsyncClient):
@@ -21,3 +26,35 @@ async def test_get_document_not_found(client: AsyncClient):
 async def test_delete_document_not_found(client: AsyncClient):
     response = await client.delete("/api/v1/documents/00000000-0000-0000-0000-000000000000")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_process_ready_document_requires_force(
+    client: AsyncClient, db_session, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    service = DocumentService(db_session)
+    doc = await service.create_document(
+        name="notes.txt", original_name="notes.txt", file_type="txt", file_size=5, file_hash="h"
+    )
+    await service.update_status(doc.id, "ready", chunk_count=1, page_count=1)
+    (tmp_path / str(doc.id)).mkdir()
+    (tmp_path / str(doc.id) / "notes.txt").write_text("notes")
+
+    queued = []
+
+    class RecordingQueue:
+        async def enqueue(self, job):
+            queued.append(job)
+
+    app.dependency_overrides[get_ingestion_queue] = RecordingQueue
+
+    response = await client.post(f"/api/v1/documents/{doc.id}/process")
+    assert response.status_code == 200
+    assert response.json()["message"] == "Document is already processed"
+    assert queued == []
+
+    response = await client.post(f"/api/v1/documents/{doc.id}/process", params={"force": True})
+    assert response.status_code == 200
+    assert response.json()["message"] == "Processing queued"
+    assert [job.document_id for job in queued] == [doc.id]
@@ -0,0 +1,87 @@
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from app.config import settings
+from app.providers.anthropic import AnthropicLLMProvider
+from app.providers.base import BaseLLMProvider
+from app.providers.openai import OpenAILLMProvider
+
+USAGE = {"input_tokens": 12, "output_tokens": 3, "total_tokens": 15}
+RESULT_USAGE = {"prompt": 12, "completion": 3, "total": 15}
+
+
+class FakeChatModel:
+    """Stands in for a LangChain chat model's async API."""
+
+    def __init__(self, response_metadata: dict):
+        self.response_metadata = response_metadata
+        self.calls: list[dict] = []
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        return AIMessage(content="Two years.", response_metadata=self.response_metadata)
+
+    async def astream(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        yield AIMessageChunk(content="Two ")
+        yield AIMessageChunk(content="years.")
+        yield AIMessageChunk(content="", usage_metadata=USAGE)
+
+
+class FakeLLMProvider(BaseLLMProvider):
+    def generate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        return {"content": f"answer to {user_prompt}", "model": "fake", "usage": {}}
+
+
+@pytest.fixture(autouse=True)
+def llm_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_model", "test-model")
+    monkeypatch.setattr(settings, "llm_api_key", "test-key")
+
+
+@pytest.fixture(
+    params=[
+        (
+            OpenAILLMProvider,
+            {"token_usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15}},
+        ),
+        (AnthropicLLMProvider, {"usage": {"input_tokens": 12, "output_tokens": 3}}),
+    ],
+    ids=["openai", "anthropic"],
+)
+def provider(request):
+    provider_class, response_metadata = request.param
+    provider = provider_class()
+    provider.client = FakeChatModel(response_metadata)
+    return provider
+
+
+class TestLangChainProviders:
+    async def test_agenerate(self, provider):
+        result = await provider.agenerate("system", "question", temperature=0.3, max_tokens=50)
+
+        assert result == {
+            "content": "Two years.",
+            "model": "test-model",
+            "usage": RESULT_USAGE,
+        }
+        assert provider.client.calls[0] == {"temperature": 0.3, "max_tokens": 50}
+
+    async def test_astream_ends_with_usage(self, provider):
+        chunks = [chunk async for chunk in provider.astream("system", "question")]
+
+        assert chunks == [
+            {"content": "Two "},
+            {"content": "years."},
+            {"content": "", "model": "test-model", "usage": RESULT_USAGE},
+        ]
+
+
+class TestBaseProviderFallbacks:
+    async def test_agenerate_runs_generate(self):
+        result = await FakeLLMProvider().agenerate("system", "question")
+        assert result["content"] == "answer to question"
+
+    async def test_astream_yields_one_chunk(self):
+        chunks = [chunk async for chunk in FakeLLMProvider().astream("system", "question")]
+        assert [chunk["content"] for chunk in chunks] == ["answer to question"]
@@ -0,0 +1,139 @@
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.providers.ollama import OllamaEmbeddingProvider, OllamaLLMProvider
+
+# /api/chat with "stream": true answers one JSON object per line
+CHAT_STREAM = "\n".join(
+    [
+        json.dumps({"message": {"role": "assistant", "content": "Hello"}, "done": False}),
+        "",
+        json.dumps({"message": {"role": "assistant", "content": " world"}, "done": False}),
+        json.dumps(
+            {
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "prompt_eval_count": 12,
+                "eval_count": 3,
+            }
+        ),
+    ]
+)
+STREAM_CHUNKS = [
+    {"content": "Hello"},
+    {"content": " world"},
+    {"content": "", "model": "llama3", "usage": {"prompt": 12, "completion": 3, "total": 15}},
+]
+
+
+def embedding_handler(requests: list[httpx.Request]):
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = json.loads(request.content)
+        if request.url.path == "/api/embeddings":
+            return httpx.Response(200, json={"embedding": [float(len(body["prompt"]))]})
+        return httpx.Response(
+            200, json={"embeddings": [[float(len(text))] for text in body["input"]]}
+        )
+
+    return handle
+
+
+def chat_handler(requests: list[dict]):
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, text=CHAT_STREAM)
+
+    return handle
+
+
+@pytest.fixture
+def llm_provider(monkeypatch):
+    monkeypatch.setattr(settings, "ollama_llm_model", "llama3")
+    return OllamaLLMProvider()
+
+
+@pytest.fixture
+def embedding_provider(monkeypatch):
+    monkeypatch.setattr(settings, "embedding_dimensions", 1)
+    monkeypatch.setattr(settings, "ollama_embed_batch_size", 2)
+    requests: list[httpx.Request] = []
+    provider = OllamaEmbeddingProvider()
+    provider._async_client = httpx.AsyncClient(
+        base_url="http://ollama", transport=httpx.MockTransport(embedding_handler(requests))
+    )
+    return provider, requests
+
+
+class TestOllamaEmbeddingProvider:
+    async def test_aembed_batches_through_embed(self, embedding_provider):
+        provider, requests = embedding_provider
+
+        assert await provider.aembed(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+        assert [r.url.path for r in requests] == ["/api/embed", "/api/embed"]
+        await provider.aclose()
+
+    async def test_aembed_single_mode_uses_embeddings(self, embedding_provider):
+        provider, requests = embedding_provider
+        provider.mode = "single"
+
+        assert await provider.aembed(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+        assert [r.url.path for r in requests] == ["/api/embeddings"] * 3
+        assert sorted(json.loads(r.content)["prompt"] for r in requests) == ["a", "bb", "ccc"]
+        await provider.aclose()
+
+
+class TestOllamaLLMProvider:
+    async def test_agenerate(self, llm_provider):
+        requests: list[dict] = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(
+                200,
+                json={
+                    "message": {"role": "assistant", "content": "Hello world"},
+                    "prompt_eval_count": 12,
+                    "eval_count": 3,
+                },
+            )
+
+        llm_provider._async_client = httpx.AsyncClient(
+            base_url="http://ollama", transport=httpx.MockTransport(handle)
+        )
+
+        result = await llm_provider.agenerate("system", "question", max_tokens=50)
+
+        assert result["content"] == "Hello world"
+        assert result["usage"] == {"prompt": 12, "completion": 3, "total": 15}
+        assert requests[0]["stream"] is False
+        assert requests[0]["options"]["num_predict"] == 50
+        await llm_provider.aclose()
+
+    def test_stream_parses_ndjson(self, llm_provider, monkeypatch):
+        requests: list[dict] = []
+        client = httpx.Client(transport=httpx.MockTransport(chat_handler(requests)))
+        monkeypatch.setattr(
+            httpx, "stream", lambda method, url, **kwargs: client.stream(method, url, **kwargs)
+        )
+
+        chunks = list(llm_provider.stream("system", "question"))
+
+        assert chunks == STREAM_CHUNKS
+        assert requests[0]["stream"] is True
+        assert requests[0]["messages"][1] == {"role": "user", "content": "question"}
+
+    async def test_astream_parses_ndjson(self, llm_provider):
+        requests: list[dict] = []
+        llm_provider._async_client = httpx.AsyncClient(
+            base_url="http://ollama", transport=httpx.MockTransport(chat_handler(requests))
+        )
+
+        chunks = [chunk async for chunk in llm_provider.astream("system", "question")]
+
+        assert chunks == STREAM_CHUNKS
+        assert requests[0]["stream"] is True
+        await llm_provider.aclose()
@@ -0,0 +1,78 @@
+from app.rag.answer_cache import AnswerCache
+
+RESPONSE = {"answer": "42", "sources": [], "model_used": "m", "tokens_used": {}}
+
+
+def make_cache(**kwargs) -> AnswerCache:
+    return AnswerCache(
+        max_entries=kwargs.get("max_entries", 10),
+        ttl_seconds=60,
+        similarity_threshold=0.95,
+        similarity_enabled=kwargs.get("similarity_enabled", True),
+    )
+
+
+class TestAnswerCache:
+    def test_exact_hit(self):
+        cache = make_cache()
+        key = AnswerCache.key(["c1", "c2"], "prompt")
+        cache.put(key, RESPONSE, document_ids={"doc-1"}, scope="s")
+
+        assert cache.get(key) == RESPONSE
+        assert cache.get(AnswerCache.key(["c1"], "prompt")) is None
+
+    def test_similar_question_hit_within_scope(self):
+        cache = make_cache()
+        cache.put("k", RESPONSE, document_ids={"doc-1"}, scope="s", query_vector=[1.0, 0.0])
+
+        assert cache.find_similar([0.99, 0.05], scope="s") == RESPONSE
+        assert cache.find_similar([0.99, 0.05], scope="other") is None
+        assert cache.find_similar([0.5, 0.5], scope="s") is None
+
+    def test_similar_lookups_count_hits_and_misses(self):
+        cache = make_cache()
+        assert cache.find_similar([1.0, 0.0], scope="s") is None
+        cache.put("k", RESPONSE, document_ids={"doc-1"}, scope="s", query_vector=[1.0, 0.0])
+        assert cache.find_similar([0.5, 0.5], scope="s") is None
+        assert cache.find_similar([1.0, 0.0], scope="s") == RESPONSE
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (1, 2)
+
+    def test_similarity_matching_is_opt_in(self):
+        cache = make_cache(similarity_enabled=False)
+        key = AnswerCache.key(["c1"], "prompt")
+        cache.put(key, RESPONSE, document_ids={"doc-1"}, scope="s", query_vector=[1.0, 0.0])
+
+        assert cache.find_similar([1.0, 0.0], scope="s") is None
+        assert cache.get(key) == RESPONSE
+
+    def test_similar_lookups_follow_evictions_and_invalidations(self):
+        cache = make_cache(max_entries=40)
+        for i in range(40):
+            vector = [1.0, float(i)]
+            cache.put(f"k{i}", {"answer": str(i)}, {f"doc-{i}"}, scope="s", query_vector=vector)
+        cache.put("k40", {"answer": "40"}, {"doc-40"}, scope="s", query_vector=[1.0, 40.0])
+
+        assert cache.find_similar([1.0, 0.0], scope="s") is None
+        assert cache.find_similar([1.0, 1.0], scope="s") == {"answer": "1"}
+        cache.invalidate_document("doc-40")
+        assert cache.find_similar([1.0, 40.0], scope="s") == {"answer": "39"}
+
+    def test_invalidate_document_drops_entries(self):
+        cache = make_cache()
+        cache.put("k1", RESPONSE, document_ids={"doc-1", "doc-2"}, scope="s")
+        cache.put("k2", RESPONSE, document_ids={"doc-3"}, scope="s")
+
+        cache.invalidate_document("doc-2")
+
+        assert cache.get("k1") is None
+        assert cache.get("k2") == RESPONSE
+
+    def test_evicts_oldest(self):
+        cache = make_cache(max_entries=1)
+        cache.put("k1", RESPONSE, document_ids={"doc-1"}, scope="s")
+        cache.put("k2", RESPONSE, document_ids={"doc-1"}, scope="s")
+
+        assert cache.get("k1") is None
+        assert cache.stats().evictions == 1
@@ -1,5 +1,5 @@
 import pytest
-from app.rag.chunker import DocumentChunker
+from app.rag.chunker import DocumentChunker, get_chunk_pool, shutdown_chunk_pools
 
 
 class TestDocumentChunker:
@@ -39,3 +39,109 @@ class TestDocumentChunker:
         )
         assert len(chunks) > 2
         assert chunks[-1].chunk_index == len(chunks) - 1
+
+    def test_matches_recursive_character_splitter(self):
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        chunker = DocumentChunker(chunk_size=60, chunk_overlap=15)
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=60,
+            chunk_overlap=15,
+            separators=["\n\n", "\n", ". ", " "],
+            length_function=lambda text: len(chunker.encoding.encode(text)),
+        )
+        paragraph = "The supplier shall deliver the goods within thirty days. " * 6
+        text = "\n\n".join([paragraph, "Short heading\n" + paragraph, "Termination " * 80])
+
+        chunks = chunker.chunk_text(text, document_id="test-id", document_name="test.txt")
+
+        expected = splitter.split_text(text)
+        # Pieces are measured within the page, so a token spanning a piece boundary
+        # can move a cut by one word
+        assert len(chunks) == len(expected)
+        assert sum(c.content == e for c, e in zip(chunks, expected, strict=True)) >= 7
+        for chunk in chunks:
+            assert abs(chunk.token_count - len(chunker.encoding.encode(chunk.content))) <= 1
+
+    def test_chunks_overlap_and_fit(self):
+        chunker = DocumentChunker(chunk_size=50, chunk_overlap=10)
+        text = " ".join(f"word{i}" for i in range(400))
+
+        chunks = chunker.chunk_text(text, document_id="test-id", document_name="test.txt")
+
+        assert len(chunks) > 5
+        assert all(c.token_count <= 50 for c in chunks)
+        for previous, chunk in zip(chunks, chunks[1:], strict=False):
+            assert chunk.content.split()[0] in previous.content.split()
+
+    def test_non_ascii_text(self):
+        chunker = DocumentChunker(chunk_size=40, chunk_overlap=5)
+        text = "Kündigung des Vertrags — 契約の解除. " * 30
+
+        chunks = chunker.chunk_text(text, document_id="test-id", document_name="test.txt")
+
+        assert len(chunks) > 1
+        assert all(c.content.startswith(". Kündigung") for c in chunks[1:])
+        for chunk in chunks:
+            assert abs(chunk.token_count - len(chunker.encoding.encode(chunk.content))) <= 1
+
+    def test_chunks_flow_across_pages(self):
+        pages = [
+            {"content": f"Page {n} says the supplier shall deliver goods. " * 30, "page_number": n}
+            for n in range(1, 11)
+        ]
+        per_page = DocumentChunker(chunk_size=1000, chunk_overlap=200, across_pages=False)
+        spanning = DocumentChunker(chunk_size=1000, chunk_overlap=200, across_pages=True)
+
+        page_chunks = per_page.chunk_pages(pages, document_id="test-id", document_name="t.pdf")
+        chunks = list(spanning.iter_chunks(pages, document_id="test-id", document_name="t.pdf"))
+
+        assert len(page_chunks) == 10
+        assert len(chunks) == 4
+        assert [c.chunk_index for c in chunks] == [0, 1, 2, 3]
+        assert (chunks[0].page_number, chunks[0].page_end) == (1, 4)
+        assert all(c.token_count <= 1000 for c in chunks)
+        # Consecutive chunks overlap, also where they meet inside a page
+        assert chunks[1].page_number <= chunks[0].page_end
+        assert chunks[1].content[:200] in chunks[0].content
+        assert "Page 1 says" in chunks[0].content and "Page 4 says" in chunks[0].content
+
+    def test_single_page_chunk_has_no_page_end(self):
+        chunker = DocumentChunker(chunk_size=1000, chunk_overlap=200, across_pages=True)
+        pages = [{"content": "Short page.", "page_number": 1}, {"content": " ", "page_number": 2}]
+
+        chunks = list(chunker.iter_chunks(pages, document_id="test-id", document_name="t.pdf"))
+
+        assert [(c.content, c.page_number, c.page_end) for c in chunks] == [
+            ("Short page.", 1, None)
+        ]
+
+
+class TestChunkPool:
+    @pytest.fixture(autouse=True)
+    def cleanup(self):
+        yield
+        shutdown_chunk_pools()
+
+    @pytest.mark.parametrize("across_pages", [False, True])
+    def test_pool_matches_serial_in_page_order(self, across_pages):
+        pages = [
+            {"content": f"Page {n}. " + "The supplier delivers. " * (n * 9), "page_number": n}
+            for n in range(1, 26)
+        ]
+        serial = DocumentChunker(100, 20, across_pages=across_pages, workers=1)
+        pooled = DocumentChunker(100, 20, across_pages=across_pages, workers=2, pages_per_task=4)
+
+        expected = list(serial.iter_chunks(pages, "doc-1", "doc.pdf"))
+        chunks = list(pooled.iter_chunks(iter(pages), "doc-1", "doc.pdf"))
+
+        assert chunks == expected
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+
+    def test_pool_is_shared_until_shutdown(self):
+        pool = get_chunk_pool(2)
+        assert get_chunk_pool(2) is pool
+
+        shutdown_chunk_pools()
+
+        assert get_chunk_pool(2) is not pool
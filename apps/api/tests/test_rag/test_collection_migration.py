@@ -0,0 +1,102 @@
+import math
+import uuid
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointIdsList, PointStruct, VectorParams
+
+from app.config import settings
+from app.db.collection_migration import CollectionMigration
+from app.db.vector_store import VectorStore
+
+pytestmark = pytest.mark.filterwarnings("ignore:Payload indexes have no effect")
+
+
+def make_points(count: int) -> list[PointStruct]:
+    return [
+        PointStruct(
+            id=str(uuid.uuid4()),
+            vector=[1.0, 1.0, 1.0, 1.0, 0.5, 0.5, 0.5, float(i)],
+            payload={"document_id": f"doc-{i}", "content": f"chunk {i}"},
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(settings, "embedding_dimensions", 8)
+    store = VectorStore("localhost", 6333, "chunks", client=QdrantClient(":memory:"))
+    store.ensure_collection()
+    store.client.upsert("chunks", points=make_points(5))
+    return store
+
+
+@pytest.fixture
+def legacy_store(monkeypatch):
+    """A collection created under the bare name, before aliases were used."""
+    monkeypatch.setattr(settings, "embedding_dimensions", 8)
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "chunks", vectors_config=VectorParams(size=8, distance=Distance.COSINE)
+    )
+    client.upsert("chunks", points=make_points(5))
+    return VectorStore("localhost", 6333, "chunks", client=client)
+
+
+def test_truncate_migration_switches_alias(store):
+    target = CollectionMigration(store, dimensions=4, batch_size=2).run()
+
+    client = store.client
+    assert client.get_aliases().aliases[0].collection_name == target
+    assert client.count(target).count == 5
+    point = client.scroll(target, limit=1, with_vectors=True)[0][0]
+    assert len(point.vector) == 4
+    assert math.isclose(sum(x * x for x in point.vector), 1.0, rel_tol=1e-5)
+
+    # A process still embedding at 8 dimensions keeps answering through the alias
+    results = store.search([1.0] * 8, top_k=5, score_threshold=0.0)
+    assert len(results) == 5
+    assert store.dimensions == 4
+
+
+def test_second_migration_replaces_aliased_collection(store):
+    first = CollectionMigration(store, dimensions=4).run()
+    second = CollectionMigration(store, dimensions=2).run()
+
+    collections = {c.name for c in store.client.get_collections().collections}
+    assert collections == {second}
+    assert first != second
+    assert CollectionMigration(store, dimensions=2).resolve() == (second, True)
+
+
+def test_sync_carries_over_deletes_and_payload_updates(store):
+    migration = CollectionMigration(store, dimensions=4, batch_size=2)
+    client = store.client
+    client.create_collection("target", **store.collection_config(4))
+    synced: dict[str, bytes] = {}
+    assert migration.sync("chunks_v1", "target", synced) == 5
+
+    points = client.scroll("chunks_v1", limit=5)[0]
+    client.delete("chunks_v1", points_selector=PointIdsList(points=[points[0].id]))
+    client.set_payload("chunks_v1", payload={"tags": ["new"]}, points=[points[1].id])
+
+    assert migration.sync("chunks_v1", "target", synced) == 2
+    assert client.count("target").count == 4
+    assert client.retrieve("target", ids=[points[1].id])[0].payload["tags"] == ["new"]
+    assert migration.sync("chunks_v1", "target", synced) == 0
+
+
+def test_legacy_collection_needs_offline_migration(legacy_store):
+    with pytest.raises(ValueError, match="--offline"):
+        CollectionMigration(legacy_store, dimensions=4).run()
+
+    target = CollectionMigration(legacy_store, dimensions=4, offline=True).run()
+
+    assert CollectionMigration(legacy_store, dimensions=4).resolve() == (target, True)
+    assert legacy_store.client.count("chunks").count == 5
+
+
+def test_truncate_requires_smaller_dimensions(store):
+    with pytest.raises(ValueError, match="Cannot truncate"):
+        CollectionMigration(store, dimensions=8).run()
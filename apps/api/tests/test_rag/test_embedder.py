@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from app.providers.base import BaseEmbeddingProvider
+from app.rag.embedder import DocumentEmbedder
+from app.rag.embedding_cache import QueryEmbeddingCache
+
+
+class FakeEmbeddingProvider(BaseEmbeddingProvider):
+    def __init__(self, fail_times: int = 0):
+        self.calls: list[list[str]] = []
+        self.fail_times = fail_times
+        self._lock = threading.Lock()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        with self._lock:
+            self.calls.append(texts)
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise ConnectionError("provider unavailable")
+        return [[float(text.split("-")[1])] for text in texts]
+
+
+class TestDocumentEmbedder:
+    def test_plan_batches_by_tokens(self):
+        embedder = DocumentEmbedder(
+            provider=FakeEmbeddingProvider(), batch_size=100, batch_tokens=250
+        )
+        assert embedder.plan_batches([100, 100, 100, 300, 50]) == [(0, 2), (2, 3), (3, 4), (4, 5)]
+
+    def test_plan_batches_by_items(self):
+        embedder = DocumentEmbedder(
+            provider=FakeEmbeddingProvider(), batch_size=2, batch_tokens=10_000
+        )
+        assert embedder.plan_batches([1, 1, 1, 1, 1]) == [(0, 2), (2, 4), (4, 5)]
+
+    def test_embed_texts_concurrent_preserves_order(self):
+        provider = FakeEmbeddingProvider()
+        embedder = DocumentEmbedder(provider=provider, batch_size=3, concurrency=4)
+        texts = [f"text-{i}" for i in range(20)]
+
+        embeddings = embedder.embed_texts(texts, token_counts=[10] * 20)
+
+        assert embeddings == [[float(i)] for i in range(20)]
+        assert len(provider.calls) == 7
+
+    def test_embed_texts_retries_failed_batch(self):
+        provider = FakeEmbeddingProvider(fail_times=2)
+        embedder = DocumentEmbedder(
+            provider=provider, batch_size=5, concurrency=2, max_retries=3, retry_backoff=0
+        )
+        texts = [f"text-{i}" for i in range(10)]
+
+        embeddings = embedder.embed_texts(texts)
+
+        assert embeddings == [[float(i)] for i in range(10)]
+        assert len(provider.calls) == 4
+
+    def test_embed_texts_gives_up_after_retries(self):
+        provider = FakeEmbeddingProvider(fail_times=10)
+        embedder = DocumentEmbedder(provider=provider, max_retries=1, retry_backoff=0)
+
+        with pytest.raises(ConnectionError):
+            embedder.embed_texts(["text-1"])
+
+
+class TestAsyncQueryEmbedding:
+    async def test_aembed_query(self):
+        provider = FakeEmbeddingProvider()
+        embedder = DocumentEmbedder(provider=provider)
+
+        assert await embedder.aembed_query("text-7") == [7.0]
+        assert provider.calls == [["text-7"]]
+
+    async def test_aembed_query_uses_query_cache(self):
+        provider = FakeEmbeddingProvider()
+        embedder = DocumentEmbedder(
+            provider=provider, query_cache=QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+        )
+
+        assert await embedder.aembed_query("text-7") == [7.0]
+        assert await embedder.aembed_query("  TEXT-7 ") == [7.0]
+        assert provider.calls == [["text-7"]]
@@ -0,0 +1,61 @@
+import time
+
+from app.providers.base import BaseEmbeddingProvider
+from app.rag.embedder import DocumentEmbedder
+from app.rag.embedding_cache import MemoryEmbeddingCache, QueryEmbeddingCache
+
+
+class FakeEmbeddingProvider(BaseEmbeddingProvider):
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(texts)
+        return [[float(text.split("-")[1])] for text in texts]
+
+
+class TestMemoryEmbeddingCache:
+    def test_only_misses_reach_provider(self):
+        provider = FakeEmbeddingProvider()
+        cache = MemoryEmbeddingCache(max_entries=100)
+        embedder = DocumentEmbedder(provider=provider, cache=cache)
+
+        embedder.embed_texts(["text-1", "text-2"])
+        embeddings = embedder.embed_texts(["text-1", "text-3", "text-2"])
+
+        assert embeddings == [[1.0], [3.0], [2.0]]
+        assert provider.calls == [["text-1", "text-2"], ["text-3"]]
+        stats = cache.stats()
+        assert stats.hits == 2
+        assert stats.misses == 3
+
+    def test_evicts_least_recently_used(self):
+        cache = MemoryEmbeddingCache(max_entries=2)
+        cache.set_many(["a", "b"], [[1.0], [2.0]])
+        cache.get_many(["a"])
+        cache.set_many(["c"], [[3.0]])
+
+        assert cache.get_many(["a", "b", "c"]) == {0: [1.0], 2: [3.0]}
+        assert cache.stats().evictions == 1
+
+
+class TestQueryEmbeddingCache:
+    def test_repeat_question_skips_provider(self):
+        provider = FakeEmbeddingProvider()
+        cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+        embedder = DocumentEmbedder(provider=provider, query_cache=cache)
+
+        first = embedder.embed_query("text-7")
+        second = embedder.embed_query("  TEXT-7 ")
+
+        assert first == second == [7.0]
+        assert len(provider.calls) == 1
+        assert cache.stats().hits == 1
+
+    def test_expired_entry_is_a_miss(self, monkeypatch):
+        cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+        cache.set("question", [1.0])
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+        assert cache.get("question") is None
@@ -1,10 +1,12 @@
 import tempfile
 from pathlib import Path
 
+import fitz
 import pytest
 
-from app.rag.extractors.text import TextExtractor
 from app.rag.extractors.markdown import MarkdownExtractor
+from app.rag.extractors.pdf import PDFExtractor, get_pdf_pool, shutdown_pdf_pools
+from app.rag.extractors.text import TextExtractor
 
 
 class TestTextExtractor:
@@ -39,3 +41,46 @@ class TestMarkdownExtractor:
 
         assert result.total_pages == 1
         assert "Title" in result.pages[0].content
+
+
+def write_pdf(path: Path, label: str = "Page") -> None:
+    with fitz.open() as doc:
+        for number in range(1, 41):
+            page = doc.new_page()
+            # Every fifth page is blank and must be skipped by both modes
+            if number % 5:
+                page.insert_text((72, 72), f"{label} {number}\n\n\n   body text")
+        doc.save(str(path))
+
+
+class TestPDFExtractor:
+    @pytest.fixture(autouse=True)
+    def cleanup(self):
+        yield
+        shutdown_pdf_pools()
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        path = tmp_path / "report.pdf"
+        write_pdf(path)
+        return path
+
+    def test_parallel_matches_serial_in_page_order(self, pdf_path):
+        serial = PDFExtractor(workers=1).extract(pdf_path)
+        parallel = PDFExtractor(workers=2, pages_per_task=8).extract(pdf_path)
+
+        assert parallel == serial
+        assert parallel.total_pages == 40
+        assert [p.page_number for p in parallel.pages] == [n for n in range(1, 41) if n % 5]
+        assert parallel.pages[0].content == "Page 1\nbody text"
+
+    def test_pool_is_reused_and_rereads_replaced_files(self, pdf_path):
+        extractor = PDFExtractor(workers=2, pages_per_task=8)
+        extractor.extract(pdf_path)
+        pool = get_pdf_pool(2)
+
+        write_pdf(pdf_path, label="Revised")
+        result = extractor.extract(pdf_path)
+
+        assert get_pdf_pool(2) is pool
+        assert result.pages[0].content == "Revised 1\nbody text"
@@ -0,0 +1,271 @@
+import threading
+
+import pytest
+
+from app.config import settings
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.rag import pipeline as pipeline_module
+from app.rag.chunker import DocumentChunker
+from app.rag.embedder import DocumentEmbedder
+from app.rag.extractors.base import BaseExtractor, ExtractedPage
+from app.rag.generator import AnswerGenerator
+from app.rag.pipeline import RAGPipeline
+from app.rag.streaming import batched, prefetch
+
+PAGES = 20
+
+
+class FakeExtractor(BaseExtractor):
+    """One short page at a time, recording how far extraction has got."""
+
+    def __init__(self):
+        self.texts = [f"Page {number} text." for number in range(1, PAGES + 1)]
+        self.pages_read = 0
+        self.closed = False
+
+    def extract(self, file_path):
+        raise NotImplementedError
+
+    def iter_pages(self, file_path):
+        try:
+            for number, text in enumerate(self.texts, start=1):
+                self.pages_read = number
+                yield ExtractedPage(page_number=number, content=text)
+        finally:
+            self.closed = True
+
+    def count_pages(self, file_path):
+        return len(self.texts)
+
+
+class FakeEmbeddingProvider(BaseEmbeddingProvider):
+    def __init__(self, fail_after: int | None = None):
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def embed(self, texts):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise RuntimeError("provider down")
+        return [[1.0, 0.0] for _ in texts]
+
+
+class FakeLLMProvider(BaseLLMProvider):
+    def generate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        raise NotImplementedError
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.points: dict[str, dict] = {}
+        self.upserts: list[list[int]] = []
+        self.deletes = 0
+
+    def upsert_vectors(self, ids, vectors, payloads):
+        self.upserts.append([p["chunk_index"] for p in payloads])
+        self.points.update(zip(ids, payloads, strict=True))
+
+    def document_points(self, document_id, fields):
+        return {
+            id_: {field: payload[field] for field in fields}
+            for id_, payload in self.points.items()
+            if payload["document_id"] == document_id
+        }
+
+    def set_payloads(self, payloads):
+        for id_, payload in payloads.items():
+            self.points[id_].update(payload)
+
+    def delete_points(self, ids):
+        for id_ in ids:
+            self.points.pop(id_, None)
+
+    def delete_by_document(self, document_id):
+        self.deletes += 1
+        self.points = {
+            id_: payload
+            for id_, payload in self.points.items()
+            if payload["document_id"] != document_id
+        }
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    extractor = FakeExtractor()
+    monkeypatch.setattr(pipeline_module, "get_extractor", lambda file_type: extractor)
+    monkeypatch.setattr(settings, "ingest_batch_size", 2)
+    monkeypatch.setattr(settings, "ingest_queue_batches", 1)
+    return extractor
+
+
+def make_pipeline(provider: FakeEmbeddingProvider | None = None) -> RAGPipeline:
+    return RAGPipeline(
+        FakeVectorStore(),
+        chunker=DocumentChunker(chunk_size=100, chunk_overlap=10),
+        embedder=DocumentEmbedder(provider=provider or FakeEmbeddingProvider(), max_retries=0),
+        generator=AnswerGenerator(provider=FakeLLMProvider()),
+    )
+
+
+def test_batches_are_stored_before_extraction_finishes(extractor):
+    pipeline = make_pipeline()
+    stored = []
+
+    def store_batch(batch):
+        stored.append((extractor.pages_read, [row["chunk_index"] for row in batch.rows]))
+
+    result = pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf", store_batch)
+
+    assert result == {"chunk_count": PAGES, "page_count": PAGES, "embedded_count": PAGES}
+    assert pipeline.vector_store.upserts == [[i, i + 1] for i in range(0, PAGES, 2)]
+    assert [indexes for _, indexes in stored] == pipeline.vector_store.upserts
+    # Extraction runs at most the queued batch plus the one being built ahead
+    first_pages_read = stored[0][0]
+    assert first_pages_read <= 6 < PAGES
+    assert extractor.closed
+
+
+def test_failure_discards_vectors_and_stops_extraction(extractor):
+    pipeline = make_pipeline(FakeEmbeddingProvider(fail_after=2))
+    stored = []
+
+    with pytest.raises(RuntimeError, match="provider down"):
+        pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf", stored.append)
+
+    assert len(stored) == 2
+    # The vectors this run added are removed again
+    assert pipeline.vector_store.deletes == 0
+    assert pipeline.vector_store.points == {}
+    assert extractor.closed
+    assert extractor.pages_read < PAGES
+
+
+def test_failed_reingest_keeps_unchanged_vectors(extractor):
+    pipeline = make_pipeline()
+    pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf")
+    first_points = dict(pipeline.vector_store.points)
+    pipeline.vector_store.upserts.clear()
+
+    extractor.texts[0] = "Page 1 was rewritten."
+    extractor.texts[10] = "Page 11 was rewritten."
+    provider = pipeline.embedder.provider
+    # The rewritten first page is embedded and upserted, the eleventh fails
+    provider.fail_after = provider.calls + 1
+    with pytest.raises(RuntimeError, match="provider down"):
+        pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf")
+
+    assert pipeline.vector_store.upserts == [[0]]
+    assert pipeline.vector_store.deletes == 0
+    assert pipeline.vector_store.points == first_points
+
+
+async def test_async_ingest_awaits_store_batch(extractor):
+    pipeline = make_pipeline()
+    rows = []
+
+    async def store_batch(batch):
+        rows.extend(batch.rows)
+
+    result = await pipeline.aingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf", store_batch)
+
+    assert result["chunk_count"] == PAGES
+    assert [row["chunk_index"] for row in rows] == list(range(PAGES))
+    assert "total_chunks" not in rows[0]["metadata"]
+
+
+async def test_async_ingest_closes_batches_off_the_loop(extractor, monkeypatch):
+    pipeline = make_pipeline()
+    start_ingest = pipeline._start_ingest
+    closed_in = []
+
+    def tracking_start(*args):
+        total_pages, batches = start_ingest(*args)
+
+        def tracked():
+            try:
+                yield from batches
+            finally:
+                # Closing joins the prefetch producer thread
+                closed_in.append(threading.get_ident())
+                batches.close()
+
+        return total_pages, tracked()
+
+    monkeypatch.setattr(pipeline, "_start_ingest", tracking_start)
+
+    async def store_batch(batch):
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError, match="database down"):
+        await pipeline.aingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf", store_batch)
+
+    assert closed_in and closed_in[0] != threading.get_ident()
+
+
+def test_reingest_embeds_only_changed_chunks(extractor):
+    pipeline = make_pipeline()
+    pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf")
+    first_ids = set(pipeline.vector_store.points)
+    pipeline.vector_store.upserts.clear()
+
+    extractor.texts[4] = "Page 5 was rewritten."
+    del extractor.texts[10]
+    result = pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf")
+
+    points = pipeline.vector_store.points
+    assert result["embedded_count"] == 1
+    assert pipeline.vector_store.upserts == [[4]]
+    assert len(first_ids - set(points)) == 2
+    # Chunks after the removed page keep their vectors but move up one position
+    assert sorted(p["chunk_index"] for p in points.values()) == list(range(PAGES - 1))
+    assert {p["content"]: p["page_number"] for p in points.values()} == {
+        text: number for number, text in enumerate(extractor.texts, start=1)
+    }
+
+
+def test_repeated_text_keeps_a_point_per_chunk(extractor, monkeypatch):
+    extractor.texts = ["Confidential."] * 3
+    pipeline = make_pipeline()
+
+    pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf")
+    first_ids = set(pipeline.vector_store.points)
+    monkeypatch.setattr(settings, "ingest_incremental", False)
+    result = pipeline.ingest_document("doc.pdf", "pdf", "doc-1", "doc.pdf")
+
+    assert result["embedded_count"] == 3
+    assert set(pipeline.vector_store.points) == first_ids
+    assert len(first_ids) == 3
+
+
+class TestStreaming:
+    def test_batched(self):
+        assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_prefetch_reraises_producer_error(self):
+        def items():
+            yield 1
+            raise ValueError("broken page")
+
+        stream = prefetch(items(), depth=2)
+        assert next(stream) == 1
+        with pytest.raises(ValueError, match="broken page"):
+            next(stream)
+
+    def test_prefetch_stays_bounded_and_stops_on_close(self):
+        produced = []
+        done = threading.Event()
+
+        def items():
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    yield i
+            finally:
+                done.set()
+
+        stream = prefetch(items(), depth=2)
+        assert next(stream) == 0
+        stream.close()
+
+        assert done.wait(1)
+        assert len(produced) <= 4
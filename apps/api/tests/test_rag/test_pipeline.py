@@ -0,0 +1,117 @@
+import pytest
+
+from app.providers.base import BaseEmbeddingProvider, BaseLLMProvider
+from app.rag import pipeline as pipeline_module
+from app.rag.embedder import DocumentEmbedder
+from app.rag.generator import AnswerGenerator
+from app.rag.pipeline import RAGPipeline
+
+HIT = {
+    "id": "point-1",
+    "score": 0.9,
+    "document_id": "doc-1",
+    "document_name": "manual.pdf",
+    "chunk_index": 0,
+    "page_number": 3,
+    "content": "The warranty lasts two years.",
+}
+DELTAS = ["The warranty ", "lasts two years."]
+USAGE = {"prompt": 40, "completion": 6, "total": 46}
+
+
+class FakeEmbeddingProvider(BaseEmbeddingProvider):
+    def __init__(self):
+        self.async_calls: list[list[str]] = []
+
+    def embed(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+    async def aembed(self, texts):
+        self.async_calls.append(texts)
+        return self.embed(texts)
+
+
+class FakeLLMProvider(BaseLLMProvider):
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    def generate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        raise NotImplementedError
+
+    async def agenerate(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        self.prompts.append(user_prompt)
+        return {"content": "".join(DELTAS), "model": "fake", "usage": USAGE}
+
+    def stream(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        for delta in DELTAS:
+            yield {"content": delta}
+        yield {"content": "", "model": "fake", "usage": USAGE}
+
+    async def astream(self, system_prompt, user_prompt, temperature=0.1, max_tokens=2000):
+        for chunk in self.stream(system_prompt, user_prompt, temperature, max_tokens):
+            yield chunk
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.async_searches = 0
+
+    def search(self, query_vector, top_k=5, score_threshold=0.7, document_filter=None):
+        return [HIT]
+
+    async def asearch(self, query_vector, top_k=5, score_threshold=0.7, document_filter=None):
+        self.async_searches += 1
+        return [HIT]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(pipeline_module, "get_answer_cache", lambda: None)
+    return RAGPipeline(
+        FakeVectorStore(),
+        embedder=DocumentEmbedder(provider=FakeEmbeddingProvider()),
+        generator=AnswerGenerator(provider=FakeLLMProvider()),
+    )
+
+
+def check_events(events: list[dict]) -> None:
+    assert [e["type"] for e in events] == ["sources", "chunk", "chunk", "done"]
+    assert events[0]["sources"][0]["document_name"] == "manual.pdf"
+    assert [e["content"] for e in events[1:3]] == DELTAS
+    done = events[-1]
+    assert done["answer"] == "".join(DELTAS)
+    assert done["sources"] == events[0]["sources"]
+    assert done["model_used"] == "fake"
+    assert done["tokens_used"] == USAGE
+    assert done["cached"] is False
+
+
+class TestStreamQuery:
+    def test_stream_query_event_order(self, pipeline):
+        check_events(list(pipeline.stream_query("How long is the warranty?")))
+
+    async def test_astream_query_event_order(self, pipeline):
+        check_events([e async for e in pipeline.astream_query("How long is the warranty?")])
+
+
+class TestAsyncQuery:
+    async def test_aquery_uses_async_providers(self, pipeline):
+        response = await pipeline.aquery("How long is the warranty?")
+
+        assert response["answer"] == "".join(DELTAS)
+        assert response["sources"][0]["page_number"] == 3
+        assert response["tokens_used"] == USAGE
+        assert response["cached"] is False
+        assert pipeline.embedder.provider.async_calls == [["How long is the warranty?"]]
+        assert pipeline.vector_store.async_searches == 1
+        assert HIT["content"] in pipeline.generator.provider.prompts[0]
+
+    async def test_aquery_without_matches_skips_generation(self, pipeline, monkeypatch):
+        async def no_hits(*args, **kwargs):
+            return []
+
+        monkeypatch.setattr(pipeline.vector_store, "asearch", no_hits)
+        response = await pipeline.aquery("Who won the match?")
+
+        assert response["sources"] == []
+        assert pipeline.generator.provider.prompts == []
@@ -0,0 +1,91 @@
+from app.rag.prompts import (
+    build_chat_history,
+    build_context,
+    count_tokens,
+    find_overlap,
+    pack_context,
+)
+
+
+def make_chunk(index: int, content: str, score: float, page: int = 1, doc: str = "doc-1") -> dict:
+    return {
+        "document_id": doc,
+        "document_name": f"{doc}.pdf",
+        "chunk_index": index,
+        "page_number": page,
+        "content": content,
+        "relevance_score": score,
+    }
+
+
+WORDS = [f"word{i}" for i in range(300)]
+FIRST = " ".join(WORDS[:150])
+SECOND = " ".join(WORDS[100:250])
+
+
+def test_find_overlap():
+    assert find_overlap(FIRST, SECOND) == len(" ".join(WORDS[100:150]))
+    assert find_overlap("alpha beta", "gamma delta") == 0
+
+
+def test_adjacent_chunks_merge_without_repeating_overlap():
+    packed = pack_context(
+        [make_chunk(4, SECOND, 0.9, page=2), make_chunk(3, FIRST, 0.8, page=1)],
+        budget_tokens=10_000,
+    )
+
+    assert len(packed) == 1
+    assert packed[0]["content"] == " ".join(WORDS[:250])
+    assert "pages 1-2" in build_context(packed)
+
+
+def test_spanning_chunk_cites_its_page_range():
+    chunk = {**make_chunk(0, FIRST, 0.9, page=3), "page_end": 5}
+
+    packed = pack_context([chunk], budget_tokens=10_000)
+
+    assert packed[0]["page_end"] == 5
+    assert "[Source: doc-1.pdf, pages 3-5]" in build_context(packed)
+
+
+def test_duplicate_chunks_are_dropped():
+    packed = pack_context(
+        [
+            make_chunk(1, FIRST, 0.9),
+            make_chunk(7, " ".join(WORDS[10:40]), 0.8),
+            make_chunk(1, FIRST, 0.7, doc="doc-2"),
+        ],
+        budget_tokens=10_000,
+    )
+
+    assert [p["document_id"] for p in packed] == ["doc-1", "doc-2"]
+
+
+def test_lowest_scoring_chunks_dropped_first():
+    chunks = [make_chunk(i * 10, f"passage {i} " * 50, score=i / 10) for i in range(5)]
+    one_chunk = count_tokens(build_context(pack_context(chunks[:1], 10_000)))
+
+    packed = pack_context(chunks, budget_tokens=one_chunk * 2 + 20)
+
+    assert [p["content"].split()[1] for p in packed] == ["4", "3"]
+
+
+def test_oversized_best_chunk_is_truncated():
+    packed = pack_context([make_chunk(0, "token " * 1000, 0.9)], budget_tokens=50)
+
+    assert len(packed) == 1
+    assert count_tokens(packed[0]["content"]) < 50
+
+
+def test_chat_history_keeps_most_recent_messages_within_budget():
+    messages = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " * 20}
+        for i in range(6)
+    ]
+
+    history = build_chat_history(messages, budget_tokens=100)
+
+    assert "message 5" in history
+    assert "message 0" not in history
+    assert count_tokens(history) <= 100
+    assert build_chat_history([], budget_tokens=100) == "No previous conversation."
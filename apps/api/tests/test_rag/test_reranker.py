@@ -0,0 +1,87 @@
+import time
+
+from app.config import settings
+from app.rag.reranker import BaseReranker, LexicalOverlapReranker, RerankStage
+from app.rag.retriever import DocumentRetriever, RetrievalOptions
+from tests.test_rag.test_retriever import FakeEmbedder, FakeVectorStore, hit
+
+
+class SlowReranker(BaseReranker):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.batches: list[int] = []
+
+    def score(self, query, texts):
+        self.batches.append(len(texts))
+        time.sleep(self.delay)
+        return [float(len(text)) for text in texts]
+
+
+class FailingReranker(BaseReranker):
+    def score(self, query, texts):
+        raise RuntimeError("model crashed")
+
+
+class TestLexicalOverlapReranker:
+    def test_scores_term_and_phrase_coverage(self):
+        scores = LexicalOverlapReranker().score(
+            "What does error ERR-4012 mean?",
+            [
+                "Error ERR-4012 means the disk is full.",
+                "ERR 4012 is listed in the appendix.",
+                "The weather was pleasant.",
+            ],
+        )
+
+        assert scores[0] > scores[1] > scores[2] == 0.0
+
+
+class TestRerankStage:
+    def test_scores_in_batches_and_returns_best(self):
+        reranker = SlowReranker(delay=0)
+        stage = RerankStage(reranker, batch_size=2, budget_ms=1000)
+
+        ranked = stage.rerank("q", ["a", "ccc", "bb", "dddd", "e"], top_k=2)
+
+        assert reranker.batches == [2, 2, 1]
+        assert ranked == [(3, 4.0), (1, 3.0)]
+
+    def test_budget_exhausted_falls_back(self):
+        reranker = SlowReranker(delay=0.02)
+        stage = RerankStage(reranker, batch_size=1, budget_ms=10)
+
+        assert stage.rerank("q", ["a", "b", "c"], top_k=2) is None
+        assert reranker.batches == [1]
+
+    def test_failure_falls_back(self):
+        stage = RerankStage(FailingReranker(), batch_size=4, budget_ms=1000)
+        assert stage.rerank("q", ["a", "b"], top_k=1) is None
+
+
+class TestRetrieverReranking:
+    async def test_over_fetches_and_keeps_best(self, monkeypatch):
+        monkeypatch.setattr(settings, "rag_rerank_candidates", 6)
+        store = FakeVectorStore([hit(i, score=1 - i / 10) for i in range(10)])
+        store.results[4]["content"] = "disk quota exceeded"
+        stage = RerankStage(LexicalOverlapReranker(), batch_size=4, budget_ms=1000)
+        retriever = DocumentRetriever(store, FakeEmbedder(), reranker=stage)
+        timings = {}
+
+        chunks = await retriever.aretrieve(
+            "disk quota", RetrievalOptions(top_k=2, rerank=True), timings=timings
+        )
+
+        assert store.calls[0]["top_k"] == 6
+        assert chunks[0].chunk_index == 4
+        assert chunks[0].relevance_score == 1.0
+        assert len(chunks) == 2
+        assert set(timings) == {"search", "rerank"}
+
+    async def test_fallback_keeps_dense_order(self):
+        store = FakeVectorStore([hit(i, score=1 - i / 10) for i in range(5)])
+        stage = RerankStage(FailingReranker(), batch_size=4, budget_ms=1000)
+        retriever = DocumentRetriever(store, FakeEmbedder(), reranker=stage)
+
+        chunks = await retriever.aretrieve("q", RetrievalOptions(top_k=2, rerank=True))
+
+        assert [c.chunk_index for c in chunks] == [0, 1]
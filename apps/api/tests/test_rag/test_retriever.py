@@ -0,0 +1,128 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import settings
+from app.rag.lexical import LexicalSearcher
+from app.rag.retriever import (
+    DocumentRetriever,
+    RetrievalOptions,
+    RetrievedChunk,
+    reciprocal_rank_fusion,
+)
+from app.schemas.conversation import AskOptions
+from tests.conftest import TestSessionLocal
+
+
+def hit(chunk_index: int, score: float = 0.5, document_id: str = "doc-1") -> dict:
+    return {
+        "id": f"{document_id}-{chunk_index}",
+        "score": score,
+        "document_id": document_id,
+        "document_name": "doc.pdf",
+        "chunk_index": chunk_index,
+        "page_number": 1,
+        "content": f"chunk {chunk_index}",
+    }
+
+
+def chunk(chunk_index: int) -> RetrievedChunk:
+    return DocumentRetriever._to_chunks("q", [hit(chunk_index)])[0]
+
+
+class FakeVectorStore:
+    def __init__(self, results: list[dict]):
+        self.results = results
+        self.calls: list[dict] = []
+
+    async def asearch(self, query_vector, top_k=5, score_threshold=0.7, document_filter=None):
+        self.calls.append({"top_k": top_k, "document_filter": document_filter})
+        return self.results[:top_k]
+
+
+class FakeLexicalSearcher:
+    def __init__(self, results: list[dict]):
+        self.results = results
+        self.calls: list[tuple] = []
+
+    async def asearch(self, query, top_k, document_filter=None):
+        self.calls.append((query, top_k, document_filter))
+        return self.results[:top_k]
+
+
+class FakeEmbedder:
+    async def aembed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+class TestReciprocalRankFusion:
+    def test_chunk_ranked_by_both_lists_wins(self):
+        dense = [chunk(1), chunk(2), chunk(3)]
+        lexical = [chunk(3), chunk(4)]
+
+        fused = reciprocal_rank_fusion([dense, lexical], weights=[0.5, 0.5], k=60)
+
+        assert [c.chunk_index for c in fused] == [3, 1, 2, 4]
+        assert fused[0].relevance_score <= 1.0
+
+    def test_weights_favour_one_list(self):
+        dense = [chunk(1), chunk(2)]
+        lexical = [chunk(2), chunk(1)]
+
+        assert reciprocal_rank_fusion([dense, lexical], [0.8, 0.2])[0].chunk_index == 1
+        assert reciprocal_rank_fusion([dense, lexical], [0.2, 0.8])[0].chunk_index == 2
+
+
+class TestRetrievalOptions:
+    def test_from_request_ignores_other_keys(self):
+        options = RetrievalOptions.from_request(AskOptions(top_k=3, hybrid=True, stream=True))
+        assert options == RetrievalOptions(top_k=3, hybrid=True)
+
+    def test_request_options_are_typed(self):
+        options = AskOptions.model_validate({"window": "2", "hybrid": "false"})
+        assert (options.window, options.hybrid) == (2, False)
+
+        with pytest.raises(ValidationError):
+            AskOptions.model_validate({"lexical_weight": 1.5})
+
+    def test_resolve_fills_defaults_and_clamps_weight(self, monkeypatch):
+        monkeypatch.setattr(settings, "rag_hybrid_enabled", True)
+        options = RetrievalOptions(document_filter=["b", "a"], lexical_weight=1.5).resolve()
+
+        assert options.top_k == settings.rag_top_k
+        assert options.score_threshold == settings.rag_score_threshold
+        assert options.document_filter == ["a", "b"]
+        assert options.hybrid is True
+        assert options.lexical_weight == 1.0
+
+
+class TestDocumentRetriever:
+    async def test_dense_only_when_hybrid_disabled(self):
+        lexical = FakeLexicalSearcher([hit(9)])
+        retriever = DocumentRetriever(FakeVectorStore([hit(1)]), FakeEmbedder(), lexical)
+
+        chunks = await retriever.aretrieve("q", RetrievalOptions(top_k=5, hybrid=False))
+
+        assert [c.chunk_index for c in chunks] == [1]
+        assert lexical.calls == []
+
+    async def test_hybrid_fuses_over_fetched_candidates(self, monkeypatch):
+        monkeypatch.setattr(settings, "rag_hybrid_candidates", 10)
+        store = FakeVectorStore([hit(i, score=1 - i / 100) for i in range(10)])
+        lexical = FakeLexicalSearcher([hit(7, score=3.0), hit(42, score=2.0)])
+        retriever = DocumentRetriever(store, FakeEmbedder(), lexical)
+
+        chunks = await retriever.aretrieve(
+            "ERR-4012", RetrievalOptions(top_k=3, hybrid=True, document_filter=["doc-1"])
+        )
+
+        assert store.calls == [{"top_k": 10, "document_filter": ["doc-1"]}]
+        assert lexical.calls == [("ERR-4012", 10, ["doc-1"])]
+        assert [c.chunk_index for c in chunks] == [7, 0, 1]
+
+    async def test_lexical_search_is_empty_outside_postgres(self):
+        searcher = LexicalSearcher(session_maker=TestSessionLocal)
+        assert await searcher.asearch("anything", top_k=5) == []
+
+    async def test_lexical_search_tolerates_non_uuid_filter(self):
+        searcher = LexicalSearcher(session_maker=TestSessionLocal)
+        assert await searcher.asearch("anything", top_k=5, document_filter=["doc-1"]) == []
@@ -0,0 +1,144 @@
+import uuid
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, VectorParams
+
+from app.config import settings
+from app.db.vector_store import VectorStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(settings, "embedding_dimensions", 4)
+    return VectorStore(
+        host="localhost",
+        port=6333,
+        collection_name="chunks",
+        client=QdrantClient(":memory:"),
+    )
+
+
+def _upsert(store: VectorStore, document_id: str = "doc-1"):
+    store.upsert_vectors(
+        ids=[str(uuid.uuid4())],
+        vectors=[[1.0, 0.0, 0.0, 0.0]],
+        payloads=[{"document_id": document_id, "content": "hello"}],
+    )
+
+
+@pytest.mark.filterwarnings("ignore:Payload indexes have no effect")
+class TestVectorStore:
+    def test_collection_checked_once(self, store, monkeypatch):
+        calls = []
+        exists = store.client.collection_exists
+        monkeypatch.setattr(
+            store.client, "collection_exists", lambda name: calls.append(name) or exists(name)
+        )
+
+        _upsert(store)
+        store.search([1.0, 0.0, 0.0, 0.0], score_threshold=0.0)
+        store.search([1.0, 0.0, 0.0, 0.0], score_threshold=0.0)
+
+        assert calls == ["chunks"]
+
+    def test_collection_created_behind_alias(self, store):
+        store.ensure_collection()
+
+        aliases = store.client.get_aliases().aliases
+        assert [(a.alias_name, a.collection_name) for a in aliases] == [("chunks", "chunks_v1")]
+
+    def test_recovers_from_deleted_collection(self, store):
+        _upsert(store)
+        store.client.delete_collection("chunks_v1")
+
+        assert store.search([1.0, 0.0, 0.0, 0.0], score_threshold=0.0) == []
+        _upsert(store)
+        assert len(store.search([1.0, 0.0, 0.0, 0.0], score_threshold=0.0)) == 1
+
+    def test_document_points_payloads_and_deletes(self, store, monkeypatch):
+        monkeypatch.setattr("app.db.vector_store._SCROLL_PAGE_SIZE", 2)
+        ids = [str(uuid.uuid4()) for _ in range(3)]
+        store.upsert_vectors(
+            ids=ids,
+            vectors=[[1.0, 0.0, 0.0, 0.0]] * 3,
+            payloads=[
+                {"document_id": "doc-1", "chunk_index": i, "content": f"chunk {i}"}
+                for i in range(3)
+            ],
+        )
+        _upsert(store, "doc-2")
+
+        store.set_payloads({ids[2]: {"chunk_index": 5}})
+        store.delete_points([ids[0]])
+
+        assert store.document_points("doc-1", ["chunk_index"]) == {
+            ids[1]: {"chunk_index": 1},
+            ids[2]: {"chunk_index": 5},
+        }
+
+    def test_dimension_mismatch(self, store):
+        store.client.create_collection(
+            "chunks", vectors_config=VectorParams(size=8, distance=Distance.COSINE)
+        )
+
+        with pytest.raises(ValueError, match="8-dimensional"):
+            store.ensure_collection()
+
+    def test_document_filter_uses_match_any(self, store):
+        for document_id in ("doc-1", "doc-2", "doc-3"):
+            _upsert(store, document_id)
+
+        results = store.search(
+            [1.0, 0.0, 0.0, 0.0], score_threshold=0.0, document_filter=["doc-1", "doc-3"]
+        )
+
+        assert sorted(r["document_id"] for r in results) == ["doc-1", "doc-3"]
+        condition = store._document_filter(["doc-1", "doc-3"]).must[0]
+        assert condition.match.any == ["doc-1", "doc-3"]
+
+    def test_payload_indexes_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "qdrant_payload_indexes", "document_id:keyword, tags")
+
+        indexes = VectorStore.payload_indexes()
+
+        assert {name: schema.value for name, schema in indexes.items()} == {
+            "document_id": "keyword",
+            "tags": "keyword",
+        }
+
+    def test_search_params_rescore_quantized(self, monkeypatch):
+        monkeypatch.setattr(settings, "qdrant_quantization", "scalar")
+        monkeypatch.setattr(settings, "qdrant_oversampling", 3.0)
+
+        params = VectorStore._search_params()
+
+        assert params.hnsw_ef == settings.qdrant_search_ef
+        assert params.quantization.rescore is True
+        assert params.quantization.oversampling == 3.0
+
+    def test_config_update_for_changed_settings(self, store, monkeypatch):
+        store.ensure_collection()
+        info = store.client.get_collection("chunks")
+        assert "hnsw_config" not in store._config_update(info)
+
+        monkeypatch.setattr(settings, "qdrant_hnsw_m", 32)
+        monkeypatch.setattr(settings, "qdrant_quantization", "binary")
+        update = store._config_update(info)
+
+        assert update["hnsw_config"].m == 32
+        assert update["quantization_config"].binary is not None
+
+    def test_config_update_compares_quantization_fields(self, store, monkeypatch):
+        monkeypatch.setattr(settings, "qdrant_quantization", "scalar")
+        monkeypatch.setattr(settings, "qdrant_quantization_always_ram", True)
+        store.ensure_collection()
+        info = store.client.get_collection("chunks")
+        # The embedded client doesn't report quantization; fill in what a server returns
+        info.config.quantization_config = store._quantization_config()
+        assert "quantization_config" not in store._config_update(info)
+
+        monkeypatch.setattr(settings, "qdrant_quantization_always_ram", False)
+        update = store._config_update(info)
+
+        assert update["quantization_config"].scalar.always_ram is False
@@ -0,0 +1,86 @@
+import uuid
+
+import pytest
+
+from app.models.chunk import DocumentChunk
+from app.rag.cache import LRUCache
+from app.rag.retriever import RetrievedChunk
+from app.rag.windows import ChunkWindowExpander
+from tests.conftest import TestSessionLocal
+
+DOCUMENT_ID = uuid.uuid4()
+
+
+def text(index: int) -> str:
+    # Consecutive chunks share one sentence, like the chunker overlap
+    return f"Sentence {index}. Sentence {index + 1}."
+
+
+def hit(index: int, score: float) -> RetrievedChunk:
+    return RetrievedChunk(
+        document_id=str(DOCUMENT_ID),
+        document_name="manual.pdf",
+        chunk_index=index,
+        page_number=index // 4 + 1,
+        content=text(index),
+        relevance_score=score,
+        chunk_id=f"point-{index}",
+    )
+
+
+@pytest.fixture
+async def stored_chunks(db_session):
+    for index in range(12):
+        db_session.add(
+            DocumentChunk(
+                document_id=DOCUMENT_ID,
+                chunk_index=index,
+                content=text(index),
+                page_number=index // 4 + 1,
+                metadata_={},
+            )
+        )
+    await db_session.commit()
+
+
+class CountingSessionMaker:
+    def __init__(self):
+        self.sessions = 0
+
+    def __call__(self):
+        self.sessions += 1
+        return TestSessionLocal()
+
+
+async def test_expands_and_merges_touching_windows(stored_chunks):
+    sessions = CountingSessionMaker()
+    expander = ChunkWindowExpander(session_maker=sessions, cache=LRUCache(max_entries=100))
+
+    chunks = await expander.aexpand([hit(5, 0.6), hit(3, 0.9), hit(10, 0.5)], window=1)
+
+    assert sessions.sessions == 1
+    assert [c.chunk_id for c in chunks] == ["point-3", "point-10"]
+    assert chunks[0].content == " ".join(f"Sentence {i}." for i in range(2, 8))
+    assert chunks[0].page_number == 1
+    assert chunks[1].content == " ".join(f"Sentence {i}." for i in range(9, 13))
+
+
+async def test_neighbours_served_from_cache(stored_chunks):
+    sessions = CountingSessionMaker()
+    expander = ChunkWindowExpander(session_maker=sessions, cache=LRUCache(max_entries=100))
+
+    first = await expander.aexpand([hit(4, 0.9)], window=2)
+    second = await expander.aexpand([hit(4, 0.9)], window=2)
+
+    assert sessions.sessions == 1
+    assert first == second
+
+
+async def test_lookup_failure_keeps_retrieved_chunks():
+    def broken_session():
+        raise ConnectionError("database unavailable")
+
+    expander = ChunkWindowExpander(session_maker=broken_session)
+    chunks = [hit(4, 0.9)]
+
+    assert await expander.aexpand(chunks, window=1) == chunks
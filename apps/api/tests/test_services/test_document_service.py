@@ -1,8 +1,10 @@
 import tempfile
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
+from app.config import settings
 from app.services.document_service import DocumentService
 
 
@@ -31,3 +33,52 @@ class TestDocumentValidation:
 
         assert hash1 == hash2
         assert len(hash1) == 64
+
+
+def chunk_rows(count: int) -> list[dict]:
+    return [
+        {
+            "chunk_index": i,
+            "content": f"chunk {i}",
+            "page_number": i // 2 + 1,
+            "token_count": 3,
+            "metadata": {"document_name": "report.pdf", "chunk_index": i},
+        }
+        for i in range(count)
+    ]
+
+
+class TestStoreChunks:
+    async def test_inserts_rows_in_batches(self, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "chunk_insert_batch_size", 2)
+        service = DocumentService(db_session)
+        doc = await service.create_document(
+            name="report.pdf", original_name="report.pdf", file_type="pdf",
+            file_size=1, file_hash="hash",
+        )
+
+        assert await service.store_chunks(doc.id, chunk_rows(5)) == 5
+
+        chunks = await service.get_chunks(doc.id)
+        assert [c.chunk_index for c in chunks] == [0, 1, 2, 3, 4]
+        assert chunks[3].page_number == 2
+        assert chunks[3].metadata_ == {"document_name": "report.pdf", "chunk_index": 3}
+
+    async def test_copy_sends_metadata_as_json_text(self):
+        class FakeDriverConnection:
+            async def copy_records_to_table(self, table, columns, records):
+                self.copied = (table, columns, records)
+
+        driver = FakeDriverConnection()
+
+        class FakeConnection:
+            async def get_raw_connection(self):
+                return SimpleNamespace(driver_connection=driver)
+
+        rows = [{"id": 1, "chunk_index": 0, "metadata": {"page": 1}, "created_at": "now"}]
+        await DocumentService._copy_chunks(FakeConnection(), rows)
+
+        table, columns, records = driver.copied
+        assert table == "document_chunks"
+        assert columns == ["id", "chunk_index", "metadata", "created_at"]
+        assert records == [(1, 0, '{"page": 1}', "now")]
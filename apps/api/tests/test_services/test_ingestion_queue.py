@@ -0,0 +1,198 @@
+import asyncio
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+from httpx import AsyncClient
+
+from app.config import settings
+from app.main import app
+from app.rag.pipeline import IngestedBatch
+from app.services import ingestion_queue as queue_module
+from app.services.document_service import DocumentService
+from app.services.ingestion_queue import IngestionJob, IngestionQueue, get_ingestion_queue
+from tests.conftest import TestSessionLocal
+
+
+def job(size: int, name: str | None = None) -> IngestionJob:
+    return IngestionJob(
+        document_id=uuid.uuid4(),
+        file_path=Path("/tmp/none"),
+        file_type="txt",
+        document_name=name or f"{size}.txt",
+        file_size=size,
+    )
+
+
+class RecordingProcess:
+    def __init__(self):
+        self.started: list[int] = []
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, job: IngestionJob) -> None:
+        self.started.append(job.file_size)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if job.file_size == 300:
+            raise RuntimeError("worker keeps going")
+
+
+async def test_local_queue_runs_small_files_first_within_cap():
+    process = RecordingProcess()
+    queue = IngestionQueue(backend="local", concurrency=2, process=process)
+
+    for size in (500, 100, 400, 300, 200, 600):
+        await queue.enqueue(job(size))
+    await queue.join()
+    await queue.aclose()
+
+    assert process.started == [100, 200, 300, 400, 500, 600]
+    assert process.peak == 2
+
+
+async def test_celery_queue_prioritises_small_files(monkeypatch):
+    from app.workers import ingestion
+
+    sent = []
+    monkeypatch.setattr(
+        ingestion.ingest_document,
+        "apply_async",
+        lambda args, priority: sent.append((args[3], priority)),
+    )
+    queue = IngestionQueue(backend="celery")
+
+    await queue.enqueue(job(200 * 1024, "small.pdf"))
+    await queue.enqueue(job(30 * 1024 * 1024, "large.pdf"))
+
+    assert sent == [("small.pdf", 0), ("large.pdf", 9)]
+    assert queue.pending == 0
+
+
+async def test_bulk_upload_schedules_every_document(client: AsyncClient, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    queued: list[IngestionJob] = []
+
+    class RecordingQueue:
+        async def enqueue(self, job):
+            queued.append(job)
+
+    app.dependency_overrides[get_ingestion_queue] = RecordingQueue
+    files = [
+        ("files", (f"notes-{i}.txt", f"note {i} " * (i + 1), "text/plain")) for i in range(3)
+    ]
+
+    response = await client.post("/api/v1/documents/bulk-upload", files=files)
+
+    assert response.status_code == 200
+    assert sorted(j.document_name for j in queued) == ["notes-0.txt", "notes-1.txt", "notes-2.txt"]
+    listed = (await client.get("/api/v1/documents")).json()["documents"]
+    assert {d["metadata"]["processing"]["current_step"] for d in listed} == {"queued"}
+
+
+class FakePipeline:
+    """Stores one batch per entry of ``batches``, raising ``error`` after the last one."""
+
+    def __init__(self, batches: list[list[dict]], error: Exception | None = None):
+        self.batches = batches
+        self.error = error
+
+    async def aingest_document(self, file_path, file_type, document_id, document_name, store_batch):
+        for page, rows in enumerate(self.batches, start=1):
+            await store_batch(
+                IngestedBatch(rows=rows, pages_done=page, total_pages=len(self.batches))
+            )
+        if self.error is not None:
+            raise self.error
+        return {"chunk_count": sum(map(len, self.batches)), "page_count": len(self.batches)}
+
+
+def row(content: str, chunk_index: int, page_number: int = 1) -> dict:
+    return {
+        "id": uuid.uuid5(uuid.NAMESPACE_OID, content),
+        "content": content,
+        "chunk_index": chunk_index,
+        "page_number": page_number,
+    }
+
+
+async def run_pipeline(monkeypatch, document, pipeline: FakePipeline, updates=None):
+    async def record_update(document_id, message):
+        if updates is not None:
+            updates.append(message["progress"])
+
+    monkeypatch.setattr(queue_module, "async_session_maker", TestSessionLocal)
+    resources = SimpleNamespace(pipeline=pipeline)
+    monkeypatch.setattr(queue_module, "get_resources", lambda: resources)
+    monkeypatch.setattr(queue_module, "send_processing_update", record_update)
+
+    await queue_module.process_document(
+        IngestionJob(document.id, Path("report.pdf"), "pdf", "report.pdf", 10)
+    )
+
+    async with TestSessionLocal() as session:
+        service = DocumentService(session)
+        return await service.get_document(document.id), await service.get_chunks(document.id)
+
+
+async def test_process_document_records_progress(db_session, monkeypatch):
+    service = DocumentService(db_session)
+    doc = await service.create_document(
+        name="report.pdf", original_name="report.pdf", file_type="pdf", file_size=10, file_hash="h"
+    )
+    updates = []
+
+    stored, chunks = await run_pipeline(
+        monkeypatch, doc, FakePipeline([[row("page 1", 0)], [row("page 2", 1)]]), updates
+    )
+
+    assert stored.status == "ready"
+    assert stored.chunk_count == 2
+    assert stored.metadata_["processing"] == {"progress": 100, "current_step": "done"}
+    assert [c.content for c in chunks] == ["page 1", "page 2"]
+    assert updates == [0, 47, 95, 100]
+
+
+async def test_reprocess_diffs_chunk_rows(db_session, monkeypatch):
+    service = DocumentService(db_session)
+    doc = await service.create_document(
+        name="report.pdf", original_name="report.pdf", file_type="pdf", file_size=10, file_hash="h"
+    )
+    _, first = await run_pipeline(
+        monkeypatch, doc, FakePipeline([[row("intro", 0), row("terms", 1)], [row("annex", 2, 2)]])
+    )
+    kept = {c.content: c.id for c in first}
+
+    # "intro" was removed, so "terms" and "annex" move up and "summary" is new
+    stored, chunks = await run_pipeline(
+        monkeypatch,
+        doc,
+        FakePipeline([[row("terms", 0), row("annex", 1, 2)], [row("summary", 2, 2)]]),
+    )
+
+    assert stored.status == "ready"
+    assert [(c.content, c.chunk_index) for c in chunks] == [
+        ("terms", 0),
+        ("annex", 1),
+        ("summary", 2),
+    ]
+    assert {c.id for c in chunks[:2]} == {kept["terms"], kept["annex"]}
+
+
+async def test_failed_reprocess_keeps_previous_rows(db_session, monkeypatch):
+    service = DocumentService(db_session)
+    doc = await service.create_document(
+        name="report.pdf", original_name="report.pdf", file_type="pdf", file_size=10, file_hash="h"
+    )
+    await run_pipeline(monkeypatch, doc, FakePipeline([[row("intro", 0), row("terms", 1)]]))
+
+    stored, chunks = await run_pipeline(
+        monkeypatch,
+        doc,
+        FakePipeline([[row("intro", 0), row("new terms", 1)]], RuntimeError("provider down")),
+    )
+
+    assert stored.status == "failed"
+    assert [c.content for c in chunks] == ["intro", "terms"]